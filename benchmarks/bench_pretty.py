@@ -0,0 +1,77 @@
+"""
+Benchmark for Program.pretty() / write_pretty() on deep and wide trees.
+
+Trees are built directly from AST classes (the recursive-descent parser
+cannot produce nesting this deep).  Indentation makes the output of a
+depth-n chain itself O(n^2) characters, so the number to watch is time
+per output character: for a linear printer it stays flat as trees double.
+
+Usage:
+  python -m benchmarks.bench_pretty [--max-deep N] [--max-wide N]
+"""
+import sys
+import time
+
+from parser.ast import Program, Block, Assign, ExprStmt, PrintStmt, BinOp, Ident, Literal, OpKind
+
+
+def deep_blocks(n: int) -> Program:
+    # { { { ... print(x); ... } } }
+    node = PrintStmt(expr=Ident(name="x"))
+    for _ in range(n):
+        node = Block(stmts=[node])
+    return Program(stmts=[node])
+
+
+def deep_expr(n: int) -> Program:
+    # x = 1 + 1 + ... + 1 (левоассоциативная цепочка глубины n)
+    e = Literal(value=1)
+    for _ in range(n):
+        e = BinOp(op=OpKind.ADD, left=e, right=Literal(value=1))
+    return Program(stmts=[Assign(lvalue=Ident(name="x"), expr=e)])
+
+
+def wide(n: int) -> Program:
+    return Program(stmts=[ExprStmt(expr=BinOp(op=OpKind.MUL, left=Ident(name="a"), right=Literal(value=i)))
+                          for i in range(n)])
+
+
+class _CountingSink:
+    """Поток, который только считает символы (вывод не хранится)."""
+    def __init__(self) -> None:
+        self.chars = 0
+
+    def write(self, text: str) -> int:
+        self.chars += len(text)
+        return len(text)
+
+
+def measure(prog: Program):
+    sink = _CountingSink()
+    t0 = time.perf_counter()
+    prog.write_pretty(sink)
+    return time.perf_counter() - t0, sink.chars
+
+
+def _opt(argv, name, default):
+    return int(argv[argv.index(name) + 1]) if name in argv else default
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    max_deep = _opt(argv, "--max-deep", 8000)
+    max_wide = _opt(argv, "--max-wide", 128000)
+    print(f"{'shape':<12}{'size':>9}{'MB out':>10}{'ms':>10}{'ns/char':>10}")
+    for name, build, top in (("deep_blocks", deep_blocks, max_deep),
+                             ("deep_expr", deep_expr, max_deep),
+                             ("wide", wide, max_wide)):
+        n = 1000
+        while n <= top:
+            dt, chars = measure(build(n))
+            print(f"{name:<12}{n:>9}{chars / 1e6:>10.1f}{dt * 1e3:>10.1f}{dt * 1e9 / chars:>10.2f}")
+            n *= 2
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,75 @@
+"""
+Size and speed of AST serialization: --json text versus the binary format.
+
+The program is built by repeating the valid examples until it reaches the
+requested number of source lines.
+
+Usage:
+  python -m benchmarks.bench_serialize [--lines N] [--repeat R]
+"""
+import io
+import json
+import pathlib
+import sys
+import time
+
+from lexer import scan_all
+from parser import parse, dump_json, dumps_binary, loads_binary
+
+EXAMPLES = pathlib.Path(__file__).resolve().parents[1] / "examples"
+
+
+def build_source(lines: int) -> str:
+    chunks = [p.read_text(encoding="utf-8") for p in sorted(EXAMPLES.glob("valid*.txt"))]
+    unit = "\n".join(chunks) + "\n"
+    per_unit = unit.count("\n")
+    return unit * max(1, lines // per_unit)
+
+
+def best_of(repeat: int, fn):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    lines = int(argv[argv.index("--lines") + 1]) if "--lines" in argv else 20000
+    repeat = int(argv[argv.index("--repeat") + 1]) if "--repeat" in argv else 3
+    prog = parse(scan_all(build_source(lines)))
+
+    def json_indented():
+        buf = io.StringIO()
+        dump_json(prog, buf, indent=2)
+        return buf.getvalue()
+
+    def json_compact():
+        buf = io.StringIO()
+        dump_json(prog, buf, indent=None, separators=(",", ":"))
+        return buf.getvalue()
+
+    rows = []
+    t, text = best_of(repeat, json_indented)
+    tl, _ = best_of(repeat, lambda: json.loads(text))
+    rows.append(("json --json (indent=2)", len(text.encode("utf-8")), t, tl))
+    t, text = best_of(repeat, json_compact)
+    tl, _ = best_of(repeat, lambda: json.loads(text))
+    rows.append(("json compact", len(text.encode("utf-8")), t, tl))
+    t, data = best_of(repeat, lambda: dumps_binary(prog))
+    tl, _ = best_of(repeat, lambda: loads_binary(data))
+    rows.append(("binary v1", len(data), t, tl))
+
+    print(f"source lines: {lines}")
+    print(f"{'format':<24}{'bytes':>12}{'write ms':>10}{'load ms':>10}")
+    for name, size, tw, tl in rows:
+        print(f"{name:<24}{size:>12}{tw * 1e3:>10.1f}{tl * 1e3:>10.1f}")
+    print("(json load = json.loads to dicts only; binary load rebuilds AST nodes)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,104 @@
+"""
+Cold-start cost of the CLI: wall-clock time per invocation over examples/
+and the import breakdown from `python -X importtime`.
+
+For short files almost all of an invocation is interpreter start-up plus
+imports, so the number reported is the overhead over a bare `python -c pass`
+(median of --runs runs per file).  Budget, on a warm disk cache:
+
+  default mode (pretty AST)   <= 80 ms over bare interpreter start-up
+  --json                      a few ms more (json is imported only here)
+
+Timings are taken with a warm bytecode cache (one unmeasured run first,
+PYTHONDONTWRITEBYTECODE dropped).  The run fails (exit 1) if the median overhead of the default mode is over
+--budget-ms.  With --pyz the same measurement is done for the zipapp built
+by scripts/build_zipapp.py.
+
+Usage:
+  python -m benchmarks.bench_startup [--runs N] [--budget-ms MS] [--pyz dist/minilang.pyz]
+"""
+import os
+import pathlib
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+EXAMPLES = ROOT / "examples"
+DEFAULT_BUDGET_MS = 80.0
+# меряем с тёплым кэшем байткода: без __pycache__ каждый запуск ещё и компилирует
+ENV = {k: v for k, v in os.environ.items() if k != "PYTHONDONTWRITEBYTECODE"}
+# модули, которых не должно быть в режиме по умолчанию
+HEAVY = ("json", "decimal", "struct", "hashlib", "multiprocessing", "concurrent.futures", "pathlib")
+
+
+def wall_ms(cmd, runs):
+    subprocess.run(cmd, cwd=ROOT, env=ENV, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    times = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        subprocess.run(cmd, cwd=ROOT, env=ENV, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        times.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(times)
+
+
+def import_profile(cmd):
+    """[(модуль, собственное время us, накопленное us, глубина)] из -X importtime."""
+    proc = subprocess.run(cmd[:1] + ["-X", "importtime"] + cmd[1:], cwd=ROOT, env=ENV,
+                          stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cum_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cum_us), depth))
+    return rows
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    runs = int(argv[argv.index("--runs") + 1]) if "--runs" in argv else 10
+    budget = float(argv[argv.index("--budget-ms") + 1]) if "--budget-ms" in argv else DEFAULT_BUDGET_MS
+    pyz = argv[argv.index("--pyz") + 1] if "--pyz" in argv else None
+    files = sorted(EXAMPLES.glob("valid*.txt"))
+
+    py = sys.executable
+    bare = wall_ms([py, "-c", "pass"], runs)
+    print(f"bare interpreter: {bare:.1f} ms (median of {runs})")
+
+    targets = [("python -m main.main", [py, "-m", "main.main"])]
+    if pyz:
+        targets.append((f"python {pyz}", [py, pyz]))
+    over_budget = False
+    for label, cmd in targets:
+        for mode in ([], ["--json"]):
+            per_file = [wall_ms(cmd + [str(f.relative_to(ROOT))] + mode, runs) for f in files]
+            med = statistics.median(per_file)
+            print(f"{label} {' '.join(mode) or '(pretty)':8s} median {med:6.1f} ms, "
+                  f"overhead {med - bare:5.1f} ms, worst file {max(per_file) - bare:5.1f} ms")
+            if not mode and med - bare > budget:
+                over_budget = True
+
+    rows = import_profile([py, "-m", "main.main", str(files[0].relative_to(ROOT))])
+    ours = [r for r in rows if r[3] == 0 and r[0].split(".")[0] in ("lexer", "parser", "main")]
+    print(f"\nimports for the default mode (top level, cumulative): "
+          f"{sum(r[2] for r in ours) / 1000:.1f} ms")
+    for name, _, cum, _ in sorted(ours, key=lambda r: -r[2]):
+        print(f"  {cum / 1000:6.1f} ms  {name}")
+    print("  slowest modules by own time:")
+    for name, self_us, _, _ in sorted(rows, key=lambda r: -r[1])[:8]:
+        print(f"  {self_us / 1000:6.1f} ms  {name}")
+    loaded = sorted({r[0] for r in rows} & set(HEAVY))
+    print(f"  heavy modules loaded: {', '.join(loaded) or 'none'}")
+
+    if over_budget:
+        print(f"\nFAIL: default-mode overhead is over the {budget:.0f} ms budget")
+        return 1
+    print(f"\nOK: within the {budget:.0f} ms budget")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
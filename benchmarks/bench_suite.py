@@ -0,0 +1,210 @@
+"""
+Throughput of every stage on generated programs (benchmarks/generate.py).
+
+For each size the source is generated once and then, separately:
+
+  lex       Lexer(src).scan_all()          tokens/s, source MB/s
+  parse     Parser(tokens).parse()         tokens/s, nodes/s
+  to_json   dump_json(program, indent=2)   nodes/s, output MB/s
+  pretty    program.write_pretty()         nodes/s, output MB/s
+
+Time is the best of --repeat runs.  Peak memory is measured in one more
+run under tracemalloc (slower, so not timed): it is the peak of Python
+allocations made by the stage itself, including what it returns (the token
+list, the tree) but not its input.  JSON and pretty output go to a sink
+that only counts characters.
+
+--output saves the results with the configuration and the interpreter
+version; --compare prints the speed ratio against an earlier results file
+(> 1.00 means faster now).  The whole program is held in memory here; for
+GB-sized inputs write a file with `python -m benchmarks.generate` and run
+the CLI on it.
+
+Usage:
+  python -m benchmarks.bench_suite [--sizes 64K,256K,1M] [--depth D] [--width W]
+        [--call-density P] [--seed S] [--repeat R] [--phases lex,parse,to_json,pretty]
+        [--output results.json] [--compare baseline.json]
+"""
+import datetime
+import gc
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+from benchmarks.bench_pretty import _CountingSink
+from benchmarks.generate import GenConfig, format_size, generate, parse_size
+from lexer import Lexer
+from parser.ast import _reset_ids
+from parser.json_io import dump_json
+from parser.parser import Parser
+
+ROOT = Path(__file__).resolve().parents[1]
+PHASES = ("lex", "parse", "to_json", "pretty")
+DEFAULT_SIZES = "64K,256K,1M"
+MB = 1 << 20
+
+
+def count_nodes(program) -> int:
+    n = 0
+    stack = [program]
+    while stack:
+        node = stack.pop()
+        n += 1
+        stack.extend(node.children())
+    return n
+
+
+def _parse(tokens):
+    _reset_ids()
+    return Parser(tokens).parse()
+
+
+def _sink_run(write):
+    def run():
+        sink = _CountingSink()
+        write(sink)
+        return sink.chars
+    return run
+
+
+def best_time(fn, repeat):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        gc.collect()
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def peak_bytes(fn) -> int:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_size(cfg: GenConfig, phases, repeat):
+    src = generate(cfg)
+    tokens = Lexer(src).scan_all()
+    program = _parse(tokens)
+    nodes = count_nodes(program)
+    jobs = {
+        "lex": lambda: Lexer(src).scan_all(),
+        "parse": lambda: _parse(tokens),
+        "to_json": _sink_run(lambda sink: dump_json(program, sink, indent=2)),
+        "pretty": _sink_run(program.write_pretty),
+    }
+    rows = []
+    for phase in phases:
+        seconds, result = best_time(jobs[phase], repeat)
+        row = {"size": format_size(cfg.size), "bytes": len(src), "phase": phase,
+               "seconds": seconds, "tokens": len(tokens), "nodes": nodes,
+               "peak_mb": peak_bytes(jobs[phase]) / MB}
+        if phase in ("lex", "parse"):
+            row["tokens_per_s"] = len(tokens) / seconds
+        if phase != "lex":
+            row["nodes_per_s"] = nodes / seconds
+        if phase == "lex":
+            row["mb_per_s"] = len(src) / MB / seconds
+        elif phase != "parse":
+            row["out_bytes"] = result
+            row["mb_per_s"] = result / MB / seconds
+        rows.append(row)
+    return rows
+
+
+def _git_commit():
+    try:
+        proc = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return proc.stdout.strip() or None
+
+
+def _rate(row, key, scale=1.0):
+    return f"{row[key] / scale:>10.2f}" if key in row else f"{'-':>10}"
+
+
+def print_rows(rows):
+    print(f"{'size':>6} {'phase':<8}{'ms':>10}{'Mtok/s':>10}{'Mnode/s':>10}{'MB/s':>10}{'peak MB':>10}")
+    for r in rows:
+        print(f"{r['size']:>6} {r['phase']:<8}{r['seconds'] * 1e3:>10.1f}{_rate(r, 'tokens_per_s', 1e6)}"
+              f"{_rate(r, 'nodes_per_s', 1e6)}{_rate(r, 'mb_per_s')}{r['peak_mb']:>10.1f}")
+
+
+def _shape(config):
+    return {k: config.get(k) for k in ("depth", "width", "call_density", "seed")}
+
+
+def print_comparison(rows, config, baseline_path):
+    with open(baseline_path, encoding="utf-8") as f:
+        doc = json.load(f)
+    old = {(r["size"], r["phase"]): r for r in doc["results"]}
+    print(f"\nvs {baseline_path} (speed ratio, > 1.00 is faster; peak memory ratio)")
+    if _shape(doc["config"]) != _shape(config):
+        print(f"  note: generated with {_shape(doc['config'])}, now {_shape(config)}")
+    for r in rows:
+        o = old.get((r["size"], r["phase"]))
+        if o is None:
+            continue
+        mem = r["peak_mb"] / o["peak_mb"] if o["peak_mb"] else float("nan")
+        print(f"{r['size']:>6} {r['phase']:<8}{o['seconds'] / r['seconds']:>8.2f}x{mem:>10.2f}")
+
+
+def _opt(argv, name, default, conv=str):
+    return conv(argv[argv.index(name) + 1]) if name in argv else default
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    sizes = [parse_size(s) for s in _opt(argv, "--sizes", DEFAULT_SIZES).split(",")]
+    phases = _opt(argv, "--phases", ",".join(PHASES)).split(",")
+    unknown = [p for p in phases if p not in PHASES]
+    if unknown:
+        print(f"unknown phase(s): {', '.join(unknown)}; expected {', '.join(PHASES)}", file=sys.stderr)
+        return 2
+    repeat = _opt(argv, "--repeat", 3, int)
+    base = GenConfig(depth=_opt(argv, "--depth", GenConfig.depth, int),
+                     width=_opt(argv, "--width", GenConfig.width, int),
+                     call_density=_opt(argv, "--call-density", GenConfig.call_density, float),
+                     seed=_opt(argv, "--seed", GenConfig.seed, int))
+
+    rows = []
+    for size in sizes:
+        cfg = GenConfig(size, base.depth, base.width, base.call_density, base.seed)
+        rows.extend(run_size(cfg, phases, repeat))
+    print_rows(rows)
+
+    config = {"sizes": [format_size(s) for s in sizes], "depth": base.depth, "width": base.width,
+              "call_density": base.call_density, "seed": base.seed, "repeat": repeat}
+    output = _opt(argv, "--output", None)
+    if output:
+        doc = {
+            "meta": {"python": platform.python_version(), "implementation": platform.python_implementation(),
+                     "platform": platform.platform(), "commit": _git_commit(),
+                     "time": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds")},
+            "config": config,
+            "results": rows,
+        }
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(doc, f, indent=2)
+            f.write("\n")
+        print(f"\n[OK] results saved to {output}")
+    baseline = _opt(argv, "--compare", None)
+    if baseline:
+        print_comparison(rows, config, baseline)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,222 @@
+"""
+Seeded generator of valid MiniLang programs for benchmarks.
+
+A program is a sequence of independent units; every unit declares its own
+enum, struct, globals (int, bool, int[], struct), a function and a
+procedure, then uses them in a chain of nested statements.  Knobs:
+
+  size           target size in bytes; units are added until it is reached
+  depth          nesting of blocks / if-else / for inside every function and
+                 at top level (the parser is recursive, keep it below ~150)
+  width          operands per expression
+  call_density   probability that an operand is a call of a function from
+                 this or an earlier unit
+
+The same GenConfig always gives the same text.  `iter_program` yields the
+program unit by unit, so `write_program` (and the command line below) can
+produce files of any size, GBs included, in constant memory.
+
+Usage:
+  python -m benchmarks.generate --size 64M [--depth D] [--width W]
+                                [--call-density P] [--seed S] [-o FILE]
+"""
+import random
+import sys
+from dataclasses import dataclass
+from typing import Iterator, List, TextIO
+
+_SUFFIXES = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+
+
+@dataclass(frozen=True)
+class GenConfig:
+    size: int = 64 * 1024
+    depth: int = 4
+    width: int = 4
+    call_density: float = 0.2
+    seed: int = 0
+
+
+def parse_size(text: str) -> int:
+    """'64K', '1M', '2G' или просто число байт."""
+    text = text.strip().upper().rstrip("B")
+    if text and text[-1] in _SUFFIXES:
+        return int(float(text[:-1]) * _SUFFIXES[text[-1]])
+    return int(text)
+
+
+def format_size(size: int) -> str:
+    for suffix in ("G", "M", "K"):
+        if size >= _SUFFIXES[suffix] and size % _SUFFIXES[suffix] == 0:
+            return f"{size // _SUFFIXES[suffix]}{suffix}"
+    return str(size)
+
+
+class _Unit:
+    """Один блок программы с собственными именами (суффикс _u<n>)."""
+
+    def __init__(self, rng: random.Random, cfg: GenConfig, n: int, callees: List[str]) -> None:
+        self.rng = rng
+        self.cfg = cfg
+        self.n = n
+        self.callees = callees
+        self.lines: List[str] = []
+
+    def name(self, base: str) -> str:
+        return f"{base}_u{self.n}"
+
+    # --- выражения ---
+
+    def atom(self, scalars: List[str]) -> str:
+        r = self.rng.random()
+        if r < 0.3:
+            return str(self.rng.randint(0, 999))
+        if r < 0.75:
+            return self.rng.choice(scalars)
+        if r < 0.9:
+            return f"{self.name('arr')}[{self.rng.randint(0, 15)}]"
+        return f"{self.name('s')}.{self.rng.choice('xy')}"
+
+    def operand(self, scalars: List[str]) -> str:
+        if self.callees and self.rng.random() < self.cfg.call_density:
+            fn = self.rng.choice(self.callees)
+            return f"{fn}({self.atom(scalars)}, {self.atom(scalars)})"
+        return self.atom(scalars)
+
+    def expr(self, scalars: List[str]) -> str:
+        parts = [self.operand(scalars)]
+        for _ in range(self.cfg.width - 1):
+            parts.append(self.rng.choice(("+", "-", "*")))
+            parts.append(self.operand(scalars))
+        # иногда скобки вокруг первой пары: разнообразит форму дерева
+        if len(parts) >= 5 and self.rng.random() < 0.3:
+            parts[0] = "(" + parts[0]
+            parts[2] = parts[2] + ")"
+        return " ".join(parts)
+
+    def cond(self, scalars: List[str]) -> str:
+        op = self.rng.choice(("<", "<=", ">", ">=", "==", "!="))
+        c = f"{self.expr(scalars)} {op} {self.atom(scalars)}"
+        if self.rng.random() < 0.3:
+            c = f"{self.name('ok')} && {c}" if self.rng.random() < 0.5 else f"!({c}) || {self.name('ok')}"
+        return c
+
+    # --- операторы ---
+
+    def simple(self, scalars: List[str], assignable: List[str], indent: str) -> None:
+        r = self.rng.random()
+        if r < 0.5:
+            target = self.rng.choice(assignable + [f"{self.name('arr')}[{self.rng.randint(0, 15)}]",
+                                                   f"{self.name('s')}.x"])
+            self.lines.append(f"{indent}{target} = {self.expr(scalars)};")
+        elif r < 0.7:
+            self.lines.append(f"{indent}print({self.expr(scalars)});")
+        elif r < 0.8:
+            self.lines.append(f"{indent}read({self.name('g')});")
+        elif r < 0.9:
+            self.lines.append(f"{indent}{self.name('p')}({self.name('s')});")
+        else:
+            s = self.name("s")
+            self.lines.append(f"{indent}{s}.w = {s}.w * 0.5 + {self.rng.randint(1, 9)}.25;")
+
+    def nest(self, level: int, scalars: List[str], assignable: List[str], indent: str) -> None:
+        """1–2 простых оператора и один вложенный, пока не достигнута глубина."""
+        for _ in range(self.rng.randint(1, 2)):
+            self.simple(scalars, assignable, indent)
+        if level >= self.cfg.depth:
+            return
+        inner = indent + "  "
+        kind = self.rng.random()
+        if kind < 0.4:
+            self.lines.append(f"{indent}if ({self.cond(scalars)}) {{")
+            self.nest(level + 1, scalars, assignable, inner)
+            self.lines.append(f"{indent}}} else {{")
+            self.simple(scalars, assignable, inner)
+            self.lines.append(f"{indent}}}")
+        elif kind < 0.8:
+            i = f"i{level}"
+            self.lines.append(f"{indent}for (int {i} = 0; {i} < {self.rng.randint(2, 100)}; {i} = {i} + 1) {{")
+            self.nest(level + 1, scalars + [i], assignable, inner)
+            self.lines.append(f"{indent}}}")
+        else:
+            self.lines.append(f"{indent}{{")
+            self.nest(level + 1, scalars, assignable, inner)
+            self.lines.append(f"{indent}}}")
+
+    def build(self) -> str:
+        e, st, f, p = self.name("E"), self.name("S"), self.name("f"), self.name("p")
+        g, ok, arr, s = self.name("g"), self.name("ok"), self.name("arr"), self.name("s")
+        members = ", ".join(f"{e}_{k}" for k in range(self.rng.randint(2, 6)))
+        self.lines += [
+            f"// unit {self.n}",
+            f"enum {e} {{ {members} }}",
+            f"struct {st} {{ int x; int y; real w; }}",
+            f"int {g} = {self.rng.randint(0, 99)};",
+            f"bool {ok} = {self.rng.choice(('true', 'false'))};",
+            f"int[] {arr};",
+            f"struct {st} {s};",
+            f"proc {p}(struct {st} v) {{",
+            "  v.x = v.x + 1;",
+            "}",
+            f"func int {f}(int a, int b) {{",
+        ]
+        local = ["a", "b", "t", g]
+        self.lines.append(f"  int t = {self.expr(['a', 'b'])};")
+        self.nest(0, local, ["t", g], "  ")
+        self.lines.append("  return t + a * b;")
+        self.lines.append("}")
+        self.callees.append(f)
+        self.nest(0, [g], [g], "")
+        return "\n".join(self.lines) + "\n\n"
+
+
+def iter_program(cfg: GenConfig) -> Iterator[str]:
+    rng = random.Random(cfg.seed)
+    callees: List[str] = []
+    written = 0
+    n = 0
+    while written < cfg.size:
+        unit = _Unit(rng, cfg, n, callees).build()
+        written += len(unit)
+        n += 1
+        yield unit
+
+
+def generate(cfg: GenConfig) -> str:
+    return "".join(iter_program(cfg))
+
+
+def write_program(fp: TextIO, cfg: GenConfig) -> int:
+    """Пишет программу в поток по частям; возвращает число символов."""
+    total = 0
+    for unit in iter_program(cfg):
+        fp.write(unit)
+        total += len(unit)
+    return total
+
+
+def _opt(argv, name, default, conv):
+    return conv(argv[argv.index(name) + 1]) if name in argv else default
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    cfg = GenConfig(
+        size=_opt(argv, "--size", GenConfig.size, parse_size),
+        depth=_opt(argv, "--depth", GenConfig.depth, int),
+        width=_opt(argv, "--width", GenConfig.width, int),
+        call_density=_opt(argv, "--call-density", GenConfig.call_density, float),
+        seed=_opt(argv, "--seed", GenConfig.seed, int),
+    )
+    out = _opt(argv, "-o", None, str)
+    if out is None:
+        write_program(sys.stdout, cfg)
+        return 0
+    with open(out, "w", encoding="utf-8") as fp:
+        total = write_program(fp, cfg)
+    print(f"[OK] {out}: {total} bytes", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,16 +1,19 @@
 from __future__ import annotations
-from typing import List
-from .tokens import Token, TokenKind, KEYWORDS
+from typing import Iterator, List
+from .tokens import Token, TokenKind, KEYWORDS, Comment
 from .errors import LexError
 
 
 class Lexer:
-    def __init__(self, source: str) -> None:
+    def __init__(self, source: str, keep_comments: bool = False) -> None:
         self.src = source
         self.n = len(source)
         self.i = 0
         self.line = 1
         self.col = 1
+        # keep_comments=True: комментарии не теряются, а складываются сюда (для форматтера)
+        self.keep_comments = keep_comments
+        self.comments: List[Comment] = []
 
     # ------------- core scanning helpers -------------
     def at_end(self) -> bool:
@@ -41,8 +44,8 @@ class Lexer:
         self.advance()
         return True
 
-    def make(self, kind: TokenKind, lexeme: str, line: int, col: int, value=None) -> Token:
-        return Token(kind, lexeme, line, col, value)
+    def make(self, kind: TokenKind, lexeme: str, line: int, col: int, value=None, offset: int = -1) -> Token:
+        return Token(kind, lexeme, line, col, value, offset)
 
     # ------------- skipping -------------
     def skip_ws_and_comments(self) -> None:
@@ -54,23 +57,30 @@ class Lexer:
                 continue
             # line comment // ... EOL
             if ch == "/" and self.peek_next() == "/":
+                start_i, start_line, start_col = self.i, self.line, self.col
                 while self.peek() not in ("\n", "\0"):
                     self.advance()
+                if self.keep_comments:
+                    self.comments.append(Comment(self.src[start_i:self.i].rstrip("\r"), start_line, start_col, start_i))
                 continue
             # block comment /* ... */
             if ch == "/" and self.peek_next() == "*":
-                start_line, start_col = self.line, self.col
-                self.advance()  # '/'
-                self.advance()  # '*'
-                while True:
-                    if self.at_end():
-                        raise LexError("Unterminated block comment (expected '*/')", start_line, start_col)
-                    if self.peek() == "*" and self.peek_next() == "/":
-                        self.advance()  # '*'
-                        self.advance()  # '/'
-                        break
-                    else:
-                        self.advance()
+                start_i, start_line, start_col = self.i, self.line, self.col
+                # конец комментария ищем str.find, а не посимвольно: длинные комментарии
+                # (и закомментированный хвост файла) не стоят вызова advance() на символ
+                end = self.src.find("*/", start_i + 2)
+                if end == -1:
+                    raise LexError("Unterminated block comment (expected '*/')", start_line, start_col)
+                end += 2
+                newlines = self.src.count("\n", start_i, end)
+                if newlines:
+                    self.line += newlines
+                    self.col = end - self.src.rfind("\n", start_i, end)
+                else:
+                    self.col += end - start_i
+                self.i = end
+                if self.keep_comments:
+                    self.comments.append(Comment(self.src[start_i:self.i], start_line, start_col, start_i))
                 continue
             break
 
@@ -87,12 +97,12 @@ class Lexer:
         lexeme = self.src[start_i:self.i]
         kind = KEYWORDS.get(lexeme)
         if kind is None:
-            return self.make(TokenKind.IDENT, lexeme, start_line, start_col)
+            return self.make(TokenKind.IDENT, lexeme, start_line, start_col, offset=start_i)
         # handle bool literals
         if kind == TokenKind.BOOL:
             val = (lexeme == "true")
-            return self.make(TokenKind.BOOL, lexeme, start_line, start_col, val)
-        return self.make(kind, lexeme, start_line, start_col)
+            return self.make(TokenKind.BOOL, lexeme, start_line, start_col, val, start_i)
+        return self.make(kind, lexeme, start_line, start_col, offset=start_i)
 
     def scan_number(self) -> Token:
         start_i, start_line, start_col = self.i, self.line, self.col
@@ -106,55 +116,58 @@ class Lexer:
                 self.advance()
         lexeme = self.src[start_i:self.i]
         if is_real:
-            return self.make(TokenKind.REAL, lexeme, start_line, start_col, float(lexeme))
+            return self.make(TokenKind.REAL, lexeme, start_line, start_col, float(lexeme), start_i)
         else:
-            return self.make(TokenKind.INT, lexeme, start_line, start_col, int(lexeme))
+            return self.make(TokenKind.INT, lexeme, start_line, start_col, int(lexeme), start_i)
 
     # ------------- public API -------------
     def scan_all(self) -> List[Token]:
-        tokens: List[Token] = []
+        return list(self.tokens())
+
+    def tokens(self) -> Iterator[Token]:
+        """Токены по одному, по мере сканирования (последний — EOF)."""
         while True:
             self.skip_ws_and_comments()
-            start_line, start_col = self.line, self.col
+            start_i, start_line, start_col = self.i, self.line, self.col
             ch = self.peek()
             if ch == "\0":
-                tokens.append(self.make(TokenKind.EOF, "", start_line, start_col))
-                return tokens
+                yield self.make(TokenKind.EOF, "", start_line, start_col, offset=start_i)
+                return
 
             # identifiers / keywords
             if ch.isalpha() or ch == "_":
-                tokens.append(self.scan_identifier_or_keyword())
+                yield self.scan_identifier_or_keyword()
                 continue
 
             # numbers
             if ch.isdigit():
-                tokens.append(self.scan_number())
+                yield self.scan_number()
                 continue
 
             # two-char operators
             if ch == "=" and self.peek_next() == "=":
                 self.advance(); self.advance()
-                tokens.append(self.make(TokenKind.EQ, "==", start_line, start_col))
+                yield self.make(TokenKind.EQ, "==", start_line, start_col, offset=start_i)
                 continue
             if ch == "!" and self.peek_next() == "=":
                 self.advance(); self.advance()
-                tokens.append(self.make(TokenKind.NEQ, "!=", start_line, start_col))
+                yield self.make(TokenKind.NEQ, "!=", start_line, start_col, offset=start_i)
                 continue
             if ch == "<" and self.peek_next() == "=":
                 self.advance(); self.advance()
-                tokens.append(self.make(TokenKind.LE, "<=", start_line, start_col))
+                yield self.make(TokenKind.LE, "<=", start_line, start_col, offset=start_i)
                 continue
             if ch == ">" and self.peek_next() == "=":
                 self.advance(); self.advance()
-                tokens.append(self.make(TokenKind.GE, ">=", start_line, start_col))
+                yield self.make(TokenKind.GE, ">=", start_line, start_col, offset=start_i)
                 continue
             if ch == "&" and self.peek_next() == "&":
                 self.advance(); self.advance()
-                tokens.append(self.make(TokenKind.AND, "&&", start_line, start_col))
+                yield self.make(TokenKind.AND, "&&", start_line, start_col, offset=start_i)
                 continue
             if ch == "|" and self.peek_next() == "|":
                 self.advance(); self.advance()
-                tokens.append(self.make(TokenKind.OR, "||", start_line, start_col))
+                yield self.make(TokenKind.OR, "||", start_line, start_col, offset=start_i)
                 continue
 
             # single-char tokens
@@ -185,7 +198,7 @@ class Lexer:
                     if self.peek().isdigit():
                         raise LexError("Unexpected '.' (reals must be like d+.d+)", start_line, start_col)
                     # Иначе это токен точки для доступа к полю
-                    tokens.append(self.make(TokenKind.DOT, ch, start_line, start_col))
+                    yield self.make(TokenKind.DOT, ch, start_line, start_col, offset=start_i)
                     continue
                 raise LexError(f"Unknown character '{ch}'", start_line, start_col)
-            tokens.append(self.make(kind, ch, start_line, start_col))
+            yield self.make(kind, ch, start_line, start_col, offset=start_i)
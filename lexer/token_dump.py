@@ -0,0 +1,88 @@
+"""
+Token output for lexer-only pipelines (highlighting, token metrics).
+
+All writers take any iterable of tokens, normally `Lexer(src).tokens()`,
+and write as they go, so no token list is built.
+
+NDJSON: one object per token
+    {"kind":"IDENT","lexeme":"x","line":1,"col":1,"offset":0,"length":1}
+with an extra "value" key for INT/REAL/BOOL literals.
+
+Binary: the header b"MLTOK" plus a version byte (1), then fixed 22-byte
+little-endian records (struct "<HQIII"):
+    kind id (TokenKind.value), offset, length, line, col
+"""
+from __future__ import annotations
+import json
+import struct
+from collections import Counter
+from typing import BinaryIO, Dict, Iterable, TextIO
+
+from .tokens import Token, TokenKind
+
+BINARY_MAGIC = b"MLTOK"
+BINARY_VERSION = 1
+RECORD = struct.Struct("<HQIII")
+
+_FLUSH_AT = 1 << 16
+
+
+def dump_tokens_ndjson(tokens: Iterable[Token], fp: TextIO) -> int:
+    """Write tokens as NDJSON; returns the number of tokens written."""
+    encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+    buf = []
+    size = n = 0
+    for tok in tokens:
+        obj = {"kind": tok.kind.name, "lexeme": tok.lexeme, "line": tok.line, "col": tok.col,
+               "offset": tok.offset, "length": len(tok.lexeme)}
+        if tok.value is not None:
+            obj["value"] = tok.value
+        line = encode(obj) + "\n"
+        buf.append(line)
+        size += len(line)
+        n += 1
+        if size >= _FLUSH_AT:
+            fp.write("".join(buf))
+            buf.clear()
+            size = 0
+    fp.write("".join(buf))
+    return n
+
+
+def dump_tokens_binary(tokens: Iterable[Token], fp: BinaryIO) -> int:
+    """Write the binary record stream; returns the number of tokens written."""
+    out = bytearray(BINARY_MAGIC)
+    out.append(BINARY_VERSION)
+    pack = RECORD.pack
+    n = 0
+    for tok in tokens:
+        out += pack(tok.kind.value, tok.offset, len(tok.lexeme), tok.line, tok.col)
+        n += 1
+        if len(out) >= _FLUSH_AT:
+            fp.write(out)
+            out = bytearray()
+    fp.write(out)
+    return n
+
+
+def read_tokens_binary(data: bytes):
+    """Decode a binary stream back into (kind, offset, length, line, col) tuples."""
+    if data[:len(BINARY_MAGIC)] != BINARY_MAGIC or data[len(BINARY_MAGIC):len(BINARY_MAGIC) + 1] != bytes([BINARY_VERSION]):
+        raise ValueError("not a MiniLang token stream (bad header)")
+    start = len(BINARY_MAGIC) + 1
+    if (len(data) - start) % RECORD.size:
+        raise ValueError("truncated token stream")
+    for kind, offset, length, line, col in RECORD.iter_unpack(data[start:]):
+        yield TokenKind(kind), offset, length, line, col
+
+
+def token_stats(tokens: Iterable[Token]) -> Dict[TokenKind, int]:
+    """Per-kind counts (EOF included)."""
+    return dict(Counter(tok.kind for tok in tokens))
+
+
+def write_token_stats(stats: Dict[TokenKind, int], fp: TextIO) -> None:
+    total = sum(stats.values())
+    for kind, count in sorted(stats.items(), key=lambda kv: (-kv[1], kv[0].name)):
+        fp.write(f"{kind.name:<12}{count:>10}\n")
+    fp.write(f"{'TOTAL':<12}{total:>10}\n")
@@ -82,9 +82,21 @@ class Token:
     line: int
     col: int
     value: Optional[Any] = None # parsed literal value if any
+    offset: int = -1 # index of the first character in the source (-1 if unknown)
 
     def __repr__(self) -> str:
         base = f"{self.kind.name}('{self.lexeme}')@{self.line}:{self.col}"
         if self.value is not None:
             return base + f"={self.value!r}"
-        return base
\ No newline at end of file
+        return base
+
+@dataclass(frozen=True)
+class Comment:
+    text: str  # весь комментарий, включая // или /* */
+    line: int
+    col: int
+    offset: int
+
+    @property
+    def end_line(self) -> int:
+        return self.line + self.text.count("\n")
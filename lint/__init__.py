@@ -0,0 +1,7 @@
+from .engine import RULES, Binding, Finding, LintContext, Linter, Rule, lint_program, lint_source, register
+from . import rules as _rules  # noqa: F401  (регистрирует встроенные правила)
+
+__all__ = [
+    "RULES", "Binding", "Finding", "LintContext", "Linter", "Rule",
+    "lint_program", "lint_source", "register",
+]
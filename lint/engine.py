@@ -0,0 +1,221 @@
+"""
+Lint engine: every rule runs in one traversal of the Program.
+
+A rule is a class with a `name` (used in reports) and handlers named after
+the AST classes it cares about:
+
+    @register
+    class EmptyEnum(Rule):
+        name = "empty-enum"
+        description = "enum without members"
+
+        def enter_EnumDecl(self, node, ctx):
+            if not node.members:
+                ctx.report(self, node, f"enum {node.name} has no members")
+
+`enter_<Class>(node, ctx)` runs before the node's children are visited,
+`exit_<Class>(node, ctx)` after them; `enter_Program`/`exit_Program` see
+the start and the end of a file.  The engine collects the handlers of all
+rules into one table per class once, walks the tree once with an explicit
+stack and calls only the handlers registered for the class at hand, so a
+new rule costs its handlers, not another walk.  Rules are instantiated for
+every file and may keep per-file state in attributes.
+
+The context keeps what several rules need, updated by the engine during the
+same walk: scopes as in the semantic checker (a FuncDef shares its scope
+with its body), a Binding per declaration (variables, parameters,
+functions, enum members) with counts of reads and writes of its name, and
+the chain of ancestors.  Handlers see the scopes as they are at that point:
+a Decl is declared after `exit_Decl` (its initializer still sees the outer
+names), the parameters of a FuncDef after `enter_FuncDef`.
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Type
+
+from parser import ast as _ast
+from parser.ast import Node, Program, Block, Decl, Assign, For, FuncDef, EnumDecl, ReadStmt, Ident, CallExpr, CallStmt
+from semantic.scope import ScopedTable
+
+Positions = Dict[int, Tuple[int, int, int, int]]
+Handler = Callable[[Node, "LintContext"], None]
+
+RULES: Dict[str, Type["Rule"]] = {}
+
+
+@dataclass(frozen=True)
+class Finding:
+    rule: str
+    message: str
+    line: int = 0
+    col: int = 0
+    node_id: int = 0
+
+    def __str__(self) -> str:
+        return f"{self.line}:{self.col}: {self.rule}: {self.message}"
+
+
+@dataclass
+class Binding:
+    name: str
+    kind: str                   # var, param, func, enum_member
+    node: Node                  # Decl, Param, FuncDef, EnumDecl
+    reads: int = 0
+    writes: int = 0             # `x = ...` и read(x); инициализатор Decl не считается
+
+
+class Rule:
+    name = ""
+    description = ""
+
+
+def register(cls: Type[Rule]) -> Type[Rule]:
+    """Декоратор: правило попадает в набор по умолчанию."""
+    RULES[cls.name] = cls
+    return cls
+
+
+class LintContext:
+    def __init__(self, positions: Optional[Positions] = None) -> None:
+        self.positions: Positions = positions if positions is not None else {}
+        self.scopes: ScopedTable[Binding] = ScopedTable()
+        self.bindings: List[Binding] = []
+        self.parents: List[Node] = []
+        self.findings: List[Finding] = []
+
+    @property
+    def parent(self) -> Optional[Node]:
+        return self.parents[-1] if self.parents else None
+
+    def resolve(self, name: str) -> Optional[Binding]:
+        return self.scopes.lookup(name)
+
+    def declare(self, name: str, kind: str, node: Node) -> Binding:
+        binding = Binding(name, kind, node)
+        self.scopes.declare(name, binding)
+        self.bindings.append(binding)
+        return binding
+
+    def report(self, rule: Rule, node: Node, message: str) -> None:
+        pos = self.positions.get(node.id)
+        # у выражений позиции нет: берём ближайшего предка, у которого она есть
+        for parent in reversed(self.parents):
+            if pos is not None:
+                break
+            pos = self.positions.get(parent.id)
+        line, col = (pos[0], pos[1]) if pos is not None else (0, 0)
+        self.findings.append(Finding(rule.name, message, line, col, node.id))
+
+
+def _handlers(rule_cls: Type[Rule]) -> Tuple[Dict[type, str], Dict[type, str]]:
+    enter: Dict[type, str] = {}
+    exit_: Dict[type, str] = {}
+    for attr in dir(rule_cls):
+        for prefix, table in (("enter_", enter), ("exit_", exit_)):
+            if attr.startswith(prefix):
+                cls = getattr(_ast, attr[len(prefix):], None)
+                if not (isinstance(cls, type) and issubclass(cls, Node)):
+                    raise TypeError(f"{rule_cls.__name__}.{attr}: no AST class {attr[len(prefix):]!r}")
+                table[cls] = attr
+    return enter, exit_
+
+
+class Linter:
+    def __init__(self, rules: Optional[Sequence[Type[Rule]]] = None) -> None:
+        self.rules = list(RULES.values()) if rules is None else list(rules)
+        # класс узла -> [(индекс правила, имя метода)], строится один раз
+        self._enter: Dict[type, List[Tuple[int, str]]] = {}
+        self._exit: Dict[type, List[Tuple[int, str]]] = {}
+        for i, rule_cls in enumerate(self.rules):
+            enter, exit_ = _handlers(rule_cls)
+            for cls, attr in enter.items():
+                self._enter.setdefault(cls, []).append((i, attr))
+            for cls, attr in exit_.items():
+                self._exit.setdefault(cls, []).append((i, attr))
+
+    def _bind(self, table: Dict[type, List[Tuple[int, str]]], rules: List[Rule]) -> Dict[type, List[Handler]]:
+        return {cls: [getattr(rules[i], attr) for i, attr in entries] for cls, entries in table.items()}
+
+    def lint(self, program: Program, positions: Optional[Positions] = None) -> List[Finding]:
+        rules = [cls() for cls in self.rules]
+        enter, exit_ = self._bind(self._enter, rules), self._bind(self._exit, rules)
+        ctx = LintContext(positions)
+        parents = ctx.parents
+        none: List[Handler] = []
+        stack: List[Tuple[Node, bool]] = [(program, False)]
+        while stack:
+            node, leaving = stack.pop()
+            cls = type(node)
+            if leaving:
+                parents.pop()
+                for handler in exit_.get(cls, none):
+                    handler(node, ctx)
+                _leave(node, cls, ctx)
+                continue
+            _arrive(node, cls, ctx)
+            for handler in enter.get(cls, none):
+                handler(node, ctx)
+            _open(node, cls, ctx)
+            parents.append(node)
+            stack.append((node, True))
+            kids = list(node.children())
+            for k in range(len(kids) - 1, -1, -1):
+                stack.append((kids[k], False))
+        ctx.findings.sort(key=lambda f: (f.line, f.col))
+        return ctx.findings
+
+
+# --- области и привязки: общая часть, до и после обработчиков правил ---
+
+def _arrive(node: Node, cls: type, ctx: LintContext) -> None:
+    if cls is Ident:
+        binding = ctx.resolve(node.name)
+        if binding is not None:
+            parent = ctx.parent
+            if type(parent) is Assign and parent.lvalue is node:
+                binding.writes += 1
+            else:
+                binding.reads += 1
+    elif cls is ReadStmt:
+        binding = ctx.resolve(node.name)
+        if binding is not None:
+            binding.writes += 1
+    elif cls is CallExpr or cls is CallStmt:
+        binding = ctx.resolve(node.callee if cls is CallExpr else node.name)
+        if binding is not None:
+            binding.reads += 1
+    elif cls is FuncDef:
+        ctx.declare(node.name, "func", node)
+    elif cls is EnumDecl:
+        for member in node.members:
+            ctx.declare(member, "enum_member", node)
+
+
+def _open(node: Node, cls: type, ctx: LintContext) -> None:
+    if cls is FuncDef:
+        ctx.scopes.push()
+        for p in node.params:
+            ctx.declare(p.name, "param", p)
+    elif cls is For or (cls is Block and type(ctx.parent) is not FuncDef):
+        ctx.scopes.push()
+
+
+def _leave(node: Node, cls: type, ctx: LintContext) -> None:
+    if cls is Decl:
+        ctx.declare(node.name, "var", node)
+    elif cls is FuncDef or cls is For or (cls is Block and type(ctx.parent) is not FuncDef):
+        ctx.scopes.pop()
+
+
+def lint_program(program: Program, positions: Optional[Positions] = None,
+                 rules: Optional[Sequence[Type[Rule]]] = None) -> List[Finding]:
+    return Linter(rules).lint(program, positions)
+
+
+def lint_source(src: str, rules: Optional[Sequence[Type[Rule]]] = None) -> List[Finding]:
+    """Разбор с позициями и проверка всеми правилами; LexError/ParseError пробрасываются."""
+    from lexer import Lexer
+    from parser.parser import Parser
+    parser = Parser(Lexer(src).scan_all(), track_positions=True)
+    program = parser.parse()
+    return lint_program(program, parser.positions, rules)
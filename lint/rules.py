@@ -0,0 +1,97 @@
+"""
+Built-in lint rules (see engine.py for how a rule is written).
+
+  unused-param        a parameter of a func/proc that the body never reads
+  print-in-loop       print inside a for loop (I/O on every iteration)
+  shadowed-name       a declaration or parameter hiding a name of an outer scope
+  empty-enum          an enum without members
+  unread-assignment   a variable that is assigned (`x = ...`, read(x)) but never read
+"""
+from __future__ import annotations
+
+from parser.ast import Decl, EnumDecl, For, FuncDef, PrintStmt, Program
+from lint.engine import Binding, LintContext, Rule, register
+
+_KIND_TEXT = {"var": "variable", "param": "parameter", "func": "function", "enum_member": "enum member"}
+
+
+def _where(binding: Binding, ctx: LintContext) -> str:
+    pos = ctx.positions.get(binding.node.id)
+    return f" (line {pos[0]})" if pos is not None else ""
+
+
+@register
+class UnusedParam(Rule):
+    name = "unused-param"
+    description = "parameter never read in the function body"
+
+    def exit_FuncDef(self, node: FuncDef, ctx: LintContext) -> None:
+        # параметры объявлены в области функции, она ещё открыта
+        for p in node.params:
+            binding = ctx.scopes.lookup_local(p.name)
+            if binding is not None and binding.node is p and binding.reads == 0:
+                ctx.report(self, node, f"parameter '{p.name}' of '{node.name}' is never used")
+
+
+@register
+class PrintInLoop(Rule):
+    name = "print-in-loop"
+    description = "print inside a for loop"
+
+    def __init__(self) -> None:
+        self.depth = 0
+
+    def enter_For(self, node: For, ctx: LintContext) -> None:
+        self.depth += 1
+
+    def exit_For(self, node: For, ctx: LintContext) -> None:
+        self.depth -= 1
+
+    def enter_PrintStmt(self, node: PrintStmt, ctx: LintContext) -> None:
+        if self.depth:
+            ctx.report(self, node, "print inside a loop runs on every iteration")
+
+
+@register
+class ShadowedName(Rule):
+    name = "shadowed-name"
+    description = "declaration hiding a name from an outer scope"
+
+    def check(self, name: str, node, ctx: LintContext, what: str) -> None:
+        outer = ctx.resolve(name)
+        if outer is not None and ctx.scopes.lookup_local(name) is None:
+            ctx.report(self, node, f"{what} '{name}' shadows the {_KIND_TEXT[outer.kind]} "
+                                   f"declared in an outer scope{_where(outer, ctx)}")
+
+    def enter_Decl(self, node: Decl, ctx: LintContext) -> None:
+        self.check(node.name, node, ctx, "variable")
+
+    def enter_FuncDef(self, node: FuncDef, ctx: LintContext) -> None:
+        # область функции ещё не открыта: видны только внешние имена (и сама функция)
+        for p in node.params:
+            outer = ctx.resolve(p.name)
+            if outer is not None:
+                ctx.report(self, node, f"parameter '{p.name}' of '{node.name}' shadows the "
+                                       f"{_KIND_TEXT[outer.kind]} declared in an outer scope{_where(outer, ctx)}")
+
+
+@register
+class EmptyEnum(Rule):
+    name = "empty-enum"
+    description = "enum without members"
+
+    def enter_EnumDecl(self, node: EnumDecl, ctx: LintContext) -> None:
+        if not node.members:
+            ctx.report(self, node, f"enum {node.name} has no members")
+
+
+@register
+class UnreadAssignment(Rule):
+    name = "unread-assignment"
+    description = "variable assigned but never read"
+
+    def exit_Program(self, node: Program, ctx: LintContext) -> None:
+        for binding in ctx.bindings:
+            # параметры без чтений — забота unused-param
+            if binding.kind == "var" and binding.writes and not binding.reads:
+                ctx.report(self, binding.node, f"variable '{binding.name}' is assigned but never read")
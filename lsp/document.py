@@ -0,0 +1,363 @@
+"""
+Incrementally re-analysed text document for the language server.
+
+The token stream is cut into chunks, one per top-level statement: a chunk
+ends after a `;` or `}` at bracket depth 0 unless the next token is `else`.
+For valid code this is exactly how `Parser.parse()` splits the program, and
+a top-level statement never looks past the token that follows it, so every
+chunk can be lexed and parsed on its own.
+
+After an edit only the chunk in front of the edit is re-lexed; lexing
+continues until a chunk starts at the (shifted) offset where an old chunk
+started behind the edit, and from there the old chunks, their tokens and
+their parse results are reused.  Reused chunks are moved, not rebuilt:
+tokens keep the coordinates they were lexed with and each chunk maps them
+to its current position.  Chunks are parsed lazily, when diagnostics or
+symbols are asked for, so a keystroke costs one or two statements of work
+plus a few linear passes over lists of integers.
+
+Diagnostics follow the CLI: a lexical error anywhere wins, otherwise the
+first parse error in document order, with the same message and position as
+`parse(scan_all(text))` would give.
+
+Line/column values in this module are 1-based code points like the lexer's;
+conversion to LSP positions (0-based, UTF-16) happens in `lsp_position`.
+"""
+from __future__ import annotations
+import bisect
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from lexer import Lexer, LexError, Token, TokenKind
+from parser.ast import Node, Program, Stmt, FuncDef, StructDecl, EnumDecl, FieldDecl
+from parser.errors import ParseError
+from parser.formatter import type_text
+from parser.parser import Parser
+
+_OPEN = (TokenKind.LPAREN, TokenKind.LBRACKET, TokenKind.LBRACE)
+_CLOSE = (TokenKind.RPAREN, TokenKind.RBRACKET, TokenKind.RBRACE)
+
+# LSP SymbolKind
+SYMBOL_ENUM = 10
+SYMBOL_FUNCTION = 12
+SYMBOL_FIELD = 8
+SYMBOL_STRUCT = 23
+SYMBOL_ENUM_MEMBER = 22
+
+_SENTINEL = Token(TokenKind.EOF, "", 0, 0)
+
+
+class _Chunk:
+    """Токены одного оператора верхнего уровня и (лениво) результат его разбора."""
+    __slots__ = ("tokens", "lex_off", "lex_line", "lex_col", "off", "line", "col", "parsed")
+
+    def __init__(self, tokens: List[Token]) -> None:
+        first = tokens[0]
+        self.tokens = tokens
+        # координаты первого токена на момент лексинга и сейчас
+        self.lex_off, self.lex_line, self.lex_col = first.offset, first.line, first.col
+        self.off, self.line, self.col = first.offset, first.line, first.col
+        self.parsed: Optional[Tuple[List[Node], Dict[int, Tuple[int, int, int, int]], Optional[ParseError], bool]] = None
+
+    def pos(self, line: int, col: int) -> Tuple[int, int]:
+        """Координаты из токенов/positions этого куска -> текущие координаты в документе."""
+        if line == self.lex_line:
+            return self.line, col - self.lex_col + self.col
+        return line - self.lex_line + self.line, col
+
+
+class Document:
+    def __init__(self, text: str, version: int = 0) -> None:
+        self.version = version
+        self.set_text(text)
+
+    # --- текст и координаты ---
+
+    def set_text(self, text: str) -> None:
+        self.text = text
+        self.line_starts = _line_starts(text)
+        self.chunks: List[_Chunk] = []
+        self.lex_error: Optional[LexError] = None
+        self._relex(-1, None)
+
+    def offset_at(self, line: int, character: int) -> int:
+        """LSP-позиция (0-based строка, UTF-16 символ) -> смещение в тексте."""
+        if line >= len(self.line_starts):
+            return len(self.text)
+        start = self.line_starts[line]
+        end = self.line_starts[line + 1] - 1 if line + 1 < len(self.line_starts) else len(self.text)
+        return start + _utf16_to_index(self.text[start:end], character)
+
+    def lsp_position(self, line: int, col: int) -> Dict[str, int]:
+        """1-based (строка, столбец в кодовых точках) -> LSP Position."""
+        li = min(max(line - 1, 0), len(self.line_starts) - 1)
+        start = self.line_starts[li]
+        end = self.line_starts[li + 1] - 1 if li + 1 < len(self.line_starts) else len(self.text)
+        return {"line": li, "character": _index_to_utf16(self.text[start:end], col - 1)}
+
+    def lsp_range(self, line: int, col: int, end_line: int, end_col: int) -> Dict[str, Any]:
+        return {"start": self.lsp_position(line, col), "end": self.lsp_position(end_line, end_col)}
+
+    def eof_position(self) -> Tuple[int, int]:
+        return len(self.line_starts), len(self.text) - self.line_starts[-1] + 1
+
+    # --- правки ---
+
+    def apply_change(self, change: Dict[str, Any]) -> None:
+        """Одна запись из contentChanges в didChange (с "range" или весь текст)."""
+        rng = change.get("range")
+        if rng is None:
+            self.set_text(change["text"])
+            return
+        start = self.offset_at(rng["start"]["line"], rng["start"]["character"])
+        end = self.offset_at(rng["end"]["line"], rng["end"]["character"])
+        self.replace(start, end, change["text"])
+
+    def replace(self, start: int, end: int, new: str) -> None:
+        old = self.text
+        if end < start:
+            start, end = end, start
+        self.text = old[:start] + new + old[end:]
+        delta = len(new) - (end - start)
+        ls = self.line_starts
+        first_line = bisect.bisect_right(ls, start) - 1          # 0-based строка начала правки
+        last_line = bisect.bisect_right(ls, end) - 1              # и её конца (в старом тексте)
+        added = [start + i + 1 for i, ch in enumerate(new) if ch == "\n"]
+        self.line_starts = ls[:first_line + 1] + added + [x + delta for x in ls[last_line + 1:]]
+        line_delta = len(added) - (last_line - first_line)
+
+        offs = [c.off for c in self.chunks]
+        j = bisect.bisect_left(offs, start) - 1                   # последний кусок, начатый до правки
+        k = bisect.bisect_left(offs, end, lo=max(j + 1, 0))        # первый кусок целиком за правкой
+        resync = {offs[i] + delta: i for i in range(k, len(offs))}
+        had_lex_error = self.lex_error is not None
+        reused = self._relex(j, (resync, start + len(new), delta, line_delta, last_line + 1))
+        if had_lex_error and reused:
+            # за последним куском лежал нелексированный хвост с ошибкой: лексим его (до ошибки)
+            self._relex(len(self.chunks) - 1, None)
+
+    def _relex(self, j: int, sync: Optional[tuple]) -> bool:
+        """Перелексировать с начала куска j (или с начала текста при j < 0);
+        True, если хвост старых кусков удалось переиспользовать."""
+        old = self.chunks
+        lexer = Lexer(self.text)
+        if j >= 0:
+            c = old[j]
+            lexer.i, lexer.line, lexer.col = c.off, c.line, c.col
+        region: List[_Chunk] = []
+        cur: List[Token] = []
+        depth = 0
+        pending = False
+        reuse_from = None
+        self.lex_error = None
+        try:
+            for tok in lexer.tokens():
+                if pending:
+                    pending = False
+                    if tok.kind is not TokenKind.KW_ELSE:
+                        region.append(_Chunk(cur))
+                        cur = []
+                        if sync is not None and tok.offset >= sync[1] and tok.offset in sync[0]:
+                            reuse_from = sync[0][tok.offset]
+                            break
+                if tok.kind is TokenKind.EOF:
+                    break
+                cur.append(tok)
+                kind = tok.kind
+                if kind in _OPEN:
+                    depth += 1
+                elif kind in _CLOSE:
+                    depth -= 1
+                if depth <= 0 and (kind is TokenKind.SEMI or kind is TokenKind.RBRACE):
+                    depth = 0
+                    pending = True
+        except LexError as e:
+            self.lex_error = e
+            cur = []
+        if cur and self.lex_error is None:
+            region.append(_Chunk(cur))
+
+        head = old[:j] if j >= 0 else []
+        if head:
+            head[-1].parsed = None       # его разбор смотрел на первый токен перелексированного куска
+        if reuse_from is None:
+            self.chunks = head + region
+            return False
+        _, _, delta, line_delta, old_end_line = sync
+        tail = old[reuse_from:]
+        ls = self.line_starts
+        for c in tail:
+            on_edit_line = c.line == old_end_line
+            c.off += delta
+            c.line += line_delta
+            if on_edit_line:
+                c.col = c.off - ls[c.line - 1] + 1
+        self.chunks = head + region + tail
+        return True
+
+    # --- разбор ---
+
+    def _parse_chunk(self, k: int) -> tuple:
+        c = self.chunks[k]
+        if c.parsed is None:
+            term = self.chunks[k + 1].tokens[0] if k + 1 < len(self.chunks) else _SENTINEL
+            n = len(c.tokens)
+            p = Parser(c.tokens + [term, _SENTINEL], track_positions=True)
+            stmts: List[Node] = []
+            err = None
+            try:
+                while p.ts.i < n:
+                    if p.ts.match(TokenKind.SEMI):
+                        continue
+                    stmts.append(p.parse_stmt())
+            except ParseError as e:
+                err = e
+            # разбор зашёл за следующий токен — изолированный результат не надёжен
+            spilled = p.ts.i > n or (err is not None and err.at is _SENTINEL and k + 1 < len(self.chunks))
+            c.parsed = (stmts, p.positions, err, spilled)
+        return c.parsed
+
+    def _error_pos(self, k: int, tok: Token) -> Tuple[int, int]:
+        if tok is _SENTINEL or tok.kind is TokenKind.EOF:
+            return self.eof_position()
+        c = self.chunks[k]
+        if k + 1 < len(self.chunks) and tok is self.chunks[k + 1].tokens[0]:
+            c = self.chunks[k + 1]             # ошибка на первом токене следующего куска
+        return c.pos(tok.line, tok.col)
+
+    def _tail_error(self, k: int) -> Optional[Tuple[ParseError, Tuple[int, int]]]:
+        """Запасной путь: один разбор от куска k до конца документа."""
+        toks: List[Token] = []
+        owner: List[int] = []
+        for i in range(k, len(self.chunks)):
+            toks.extend(self.chunks[i].tokens)
+            owner.extend([i] * len(self.chunks[i].tokens))
+        try:
+            Parser(toks + [_SENTINEL]).parse()
+        except ParseError as e:
+            if e.at is _SENTINEL:
+                return e, self.eof_position()
+            i = next(n for n, t in enumerate(toks) if t is e.at)
+            return e, self.chunks[owner[i]].pos(e.at.line, e.at.col)
+        return None
+
+    def first_error(self) -> Optional[Tuple[str, str, int, int, int]]:
+        """(source, message, line, col, length) первой ошибки, как у CLI, или None."""
+        if self.lex_error is not None:
+            e = self.lex_error
+            return "lex", e.message, e.line, e.col, 1
+        for k in range(len(self.chunks)):
+            _, _, err, spilled = self._parse_chunk(k)
+            if spilled:
+                found = self._tail_error(k)
+                if found is None:
+                    return None
+                err, (line, col) = found
+                return "parse", err.message, line, col, max(len(err.at.lexeme), 1)
+            if err is not None:
+                line, col = self._error_pos(k, err.at)
+                return "parse", err.message, line, col, max(len(err.at.lexeme), 1)
+        return None
+
+    def diagnostics(self) -> List[Dict[str, Any]]:
+        found = self.first_error()
+        if found is None:
+            return []
+        source, message, line, col, length = found
+        return [{
+            "range": self.lsp_range(line, col, line, col + length),
+            "severity": 1,
+            "source": f"minilang-{source}",
+            "message": message,
+        }]
+
+    def program(self) -> Optional[Program]:
+        """AST всего документа из кэшированных кусков (None, если есть ошибки)."""
+        if self.first_error() is not None:
+            return None
+        stmts: List[Node] = []
+        for k in range(len(self.chunks)):
+            stmts.extend(self._parse_chunk(k)[0])
+        return Program(stmts=stmts)
+
+    def tokens(self) -> Iterator[Tuple[Token, int, int]]:
+        """(токен, строка, столбец) в текущих координатах документа."""
+        for c in self.chunks:
+            for t in c.tokens:
+                line, col = c.pos(t.line, t.col)
+                yield t, line, col
+
+    # --- символы ---
+
+    def symbols(self) -> List[Dict[str, Any]]:
+        """DocumentSymbol[] для func/proc, struct (с полями) и enum (с членами)."""
+        out: List[Dict[str, Any]] = []
+        for k in range(len(self.chunks)):
+            stmts, positions, _, _ = self._parse_chunk(k)
+            c = self.chunks[k]
+            stack: List[Tuple[Node, List[Dict[str, Any]]]] = [(s, out) for s in reversed(stmts)]
+            while stack:
+                node, into = stack.pop()
+                sym = self._symbol(node, c, positions)
+                if sym is not None:
+                    into.append(sym)
+                    into = sym["children"]
+                kids = [n for n in node.children() if isinstance(n, Stmt)]
+                for child in reversed(kids):
+                    stack.append((child, into))
+        return out
+
+    def _symbol(self, node: Node, c: _Chunk, positions) -> Optional[Dict[str, Any]]:
+        pos = positions.get(node.id)
+        if pos is None:
+            return None
+        line, col = c.pos(pos[0], pos[1])
+        end_line, end_col = c.pos(pos[2], pos[3])
+        rng = self.lsp_range(line, col, end_line, end_col)
+        children: List[Dict[str, Any]] = []
+        if isinstance(node, FuncDef):
+            params = ", ".join(f"{type_text(p.type_spec)} {p.name}" for p in node.params)
+            detail = f"proc ({params})" if node.is_proc else f"func {type_text(node.ret_type)} ({params})"
+            kind = SYMBOL_FUNCTION
+        elif isinstance(node, StructDecl):
+            detail, kind = "struct", SYMBOL_STRUCT
+            for f in node.fields:
+                fsym = self._symbol(f, c, positions)
+                if fsym is not None:
+                    children.append(fsym)
+        elif isinstance(node, EnumDecl):
+            detail, kind = "enum", SYMBOL_ENUM
+            children = [{"name": m, "kind": SYMBOL_ENUM_MEMBER, "range": rng, "selectionRange": rng,
+                         "children": []} for m in node.members]
+        elif isinstance(node, FieldDecl):
+            detail, kind = type_text(node.type_spec), SYMBOL_FIELD
+        else:
+            return None
+        return {"name": node.name, "detail": detail, "kind": kind, "range": rng,
+                "selectionRange": rng, "children": children}
+
+
+def _line_starts(text: str) -> List[int]:
+    starts = [0]
+    i = text.find("\n")
+    while i != -1:
+        starts.append(i + 1)
+        i = text.find("\n", i + 1)
+    return starts
+
+
+def _utf16_to_index(line: str, units: int) -> int:
+    if line.isascii():
+        return min(units, len(line))
+    n = 0
+    for i, ch in enumerate(line):
+        if n >= units:
+            return i
+        n += 2 if ord(ch) > 0xFFFF else 1
+    return len(line)
+
+
+def _index_to_utf16(line: str, index: int) -> int:
+    index = max(index, 0)
+    if line.isascii():
+        return index
+    return sum(2 if ord(ch) > 0xFFFF else 1 for ch in line[:index]) + max(index - len(line), 0)
@@ -0,0 +1,232 @@
+"""
+Language server over stdio: `python -m lsp`.
+
+Speaks the base protocol (Content-Length framed JSON-RPC) and supports:
+  textDocument/didOpen, didChange (incremental), didClose
+  textDocument/publishDiagnostics    lexer/parser errors, debounced on edits
+  textDocument/documentSymbol        func/proc, struct (+ fields), enum (+ members)
+
+Each open document is an `lsp.document.Document`, which keeps its tokens
+and per-statement ASTs between edits.  Changes are applied as they arrive;
+diagnostics are computed on a timer thread once the document has been
+quiet for `debounce` seconds (on open they are published at once).
+"""
+from __future__ import annotations
+import json
+import sys
+import threading
+from typing import Any, BinaryIO, Dict, Optional
+
+from .document import Document
+
+DEFAULT_DEBOUNCE = 0.15
+
+# JSON-RPC / LSP error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+SERVER_NOT_INITIALIZED = -32002
+
+TEXT_SYNC_INCREMENTAL = 2
+
+
+def read_message(fp: BinaryIO) -> Optional[Dict[str, Any]]:
+    """Одно сообщение базового протокола; None — конец потока."""
+    length = None
+    while True:
+        line = fp.readline()
+        if not line:
+            return None
+        line = line.strip()
+        if not line:
+            break
+        name, _, value = line.decode("ascii").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value.strip())
+    if length is None:
+        raise ValueError("message without Content-Length")
+    body = fp.read(length)
+    if len(body) < length:
+        return None
+    return json.loads(body.decode("utf-8"))
+
+
+def write_message(fp: BinaryIO, msg: Dict[str, Any]) -> None:
+    body = json.dumps(msg, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    fp.write(b"Content-Length: " + str(len(body)).encode("ascii") + b"\r\n\r\n" + body)
+    fp.flush()
+
+
+class LspError(Exception):
+    def __init__(self, code: int, message: str) -> None:
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+class LanguageServer:
+    def __init__(self, rfile: BinaryIO, wfile: BinaryIO, debounce: float = DEFAULT_DEBOUNCE) -> None:
+        self.rfile = rfile
+        self.wfile = wfile
+        self.debounce = debounce
+        self.documents: Dict[str, Document] = {}
+        self.timers: Dict[str, threading.Timer] = {}
+        # документы меняет цикл чтения, диагностику считают таймеры; вывод общий
+        self.lock = threading.Lock()
+        self.write_lock = threading.Lock()
+        self.initialized = False
+        self.shutdown_requested = False
+
+    def send(self, msg: Dict[str, Any]) -> None:
+        msg = dict(jsonrpc="2.0", **msg)
+        with self.write_lock:
+            write_message(self.wfile, msg)
+
+    # --- цикл ---
+
+    def run(self) -> int:
+        """Обрабатывает сообщения до `exit`; код выхода по спецификации LSP."""
+        while True:
+            try:
+                msg = read_message(self.rfile)
+            except ValueError as e:
+                self.send({"id": None, "error": {"code": PARSE_ERROR, "message": str(e)}})
+                continue
+            if msg is None:
+                break
+            if msg.get("method") == "exit":
+                break
+            self.handle(msg)
+        self._cancel_timers()
+        return 0 if self.shutdown_requested else 1
+
+    def handle(self, msg: Dict[str, Any]) -> None:
+        method = msg.get("method")
+        is_request = "id" in msg
+        if not isinstance(method, str):
+            if is_request:
+                self.send({"id": msg["id"], "error": {"code": INVALID_REQUEST, "message": "expected a 'method'"}})
+            return               # ответ клиента на наш запрос — мы их не посылаем
+        handler = getattr(self, "on_" + method.replace("/", "_").replace("$", "_"), None)
+        try:
+            if not self.initialized and method != "initialize":
+                if is_request:
+                    raise LspError(SERVER_NOT_INITIALIZED, "server not initialized")
+                return
+            if handler is None:
+                if is_request and not method.startswith("$/"):
+                    raise LspError(METHOD_NOT_FOUND, f"unknown method {method!r}")
+                return           # неизвестные уведомления игнорируются
+            result = handler(msg.get("params") or {})
+        except LspError as e:
+            if is_request:
+                self.send({"id": msg["id"], "error": {"code": e.code, "message": e.message}})
+            return
+        except (KeyError, TypeError, ValueError) as e:
+            if is_request:
+                self.send({"id": msg["id"], "error": {"code": INVALID_PARAMS, "message": f"bad params: {e!r}"}})
+            return
+        if is_request:
+            self.send({"id": msg["id"], "result": result})
+
+    # --- жизненный цикл ---
+
+    def on_initialize(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        self.initialized = True
+        return {
+            "capabilities": {
+                "textDocumentSync": {"openClose": True, "change": TEXT_SYNC_INCREMENTAL},
+                "documentSymbolProvider": True,
+            },
+            "serverInfo": {"name": "minilang-lsp"},
+        }
+
+    def on_initialized(self, params: Dict[str, Any]) -> None:
+        return None
+
+    def on_shutdown(self, params: Dict[str, Any]) -> None:
+        self.shutdown_requested = True
+        self._cancel_timers()
+        return None
+
+    # --- документы ---
+
+    def on_textDocument_didOpen(self, params: Dict[str, Any]) -> None:
+        item = params["textDocument"]
+        with self.lock:
+            self.documents[item["uri"]] = Document(item["text"], item.get("version", 0))
+        self.publish(item["uri"])
+
+    def on_textDocument_didChange(self, params: Dict[str, Any]) -> None:
+        ident = params["textDocument"]
+        uri = ident["uri"]
+        with self.lock:
+            doc = self.documents.get(uri)
+            if doc is None:
+                return
+            for change in params["contentChanges"]:
+                doc.apply_change(change)
+            doc.version = ident.get("version", doc.version + 1)
+        self._schedule(uri)
+
+    def on_textDocument_didClose(self, params: Dict[str, Any]) -> None:
+        uri = params["textDocument"]["uri"]
+        with self.lock:
+            self.documents.pop(uri, None)
+            timer = self.timers.pop(uri, None)
+        if timer is not None:
+            timer.cancel()
+        self.send({"method": "textDocument/publishDiagnostics", "params": {"uri": uri, "diagnostics": []}})
+
+    def on_textDocument_documentSymbol(self, params: Dict[str, Any]) -> Any:
+        with self.lock:
+            doc = self.documents.get(params["textDocument"]["uri"])
+            return [] if doc is None else doc.symbols()
+
+    # --- диагностика ---
+
+    def _schedule(self, uri: str) -> None:
+        with self.lock:
+            old = self.timers.get(uri)
+            if old is not None:
+                old.cancel()
+            if self.debounce <= 0:
+                self.timers.pop(uri, None)
+                timer = None
+            else:
+                timer = self.timers[uri] = threading.Timer(self.debounce, self.publish, (uri,))
+                timer.daemon = True
+        if timer is None:
+            self.publish(uri)
+        else:
+            timer.start()
+
+    def publish(self, uri: str) -> None:
+        with self.lock:
+            doc = self.documents.get(uri)
+            if doc is None:
+                return
+            version = doc.version
+            diagnostics = doc.diagnostics()
+            # отправляем под той же блокировкой: иначе устаревший результат мог бы уйти после нового
+            self.send({"method": "textDocument/publishDiagnostics",
+                       "params": {"uri": uri, "version": version, "diagnostics": diagnostics}})
+
+    def _cancel_timers(self) -> None:
+        with self.lock:
+            timers = list(self.timers.values())
+            self.timers.clear()
+        for t in timers:
+            t.cancel()
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    debounce = DEFAULT_DEBOUNCE
+    if argv[:1] == ["--debounce"] and len(argv) > 1:
+        debounce = float(argv[1]) / 1000.0
+    elif argv:
+        print("Usage: python -m lsp [--debounce MS]", file=sys.stderr)
+        return 2
+    return LanguageServer(sys.stdin.buffer, sys.stdout.buffer, debounce).run()
@@ -0,0 +1,157 @@
+"""
+Batch mode for main.main: many files in one interpreter.
+
+Paths may be plain files or glob patterns (`examples/*.txt`,
+`src/**/*.ml`).  Each file goes through the same `run_file` as the
+single-file CLI, either in this process (`--jobs 1`, the default) or in a
+`ProcessPoolExecutor` (`--jobs N`); results are collected in input order.
+
+Output:
+  --out-dir DIR   every file's normal output goes to DIR/<path><ext>
+                  (the input path is mirrored under DIR when it is relative)
+  otherwise       one compact JSON line per file on stdout:
+                    {"path": ..., "ok": true, "ast": {...}}      JSON modes
+                    {"path": ..., "ok": true, "output": "..."}   other modes
+                    {"path": ..., "ok": false, "error": "..."}
+
+A summary (files, failures, wall time) and the errors go to stderr; the
+exit code is 1 if any file failed.
+"""
+from __future__ import annotations
+import io
+import os
+import sys
+import time
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+# glob, json, pathlib и concurrent.futures (он тянет multiprocessing) — внутри
+# функций: main.main импортирует этот модуль и для одного файла, ради is_batch
+
+_GLOB_CHARS = "*?["
+
+_JSON_MODES = ("json", "json-compact", "ndjson")
+
+_EXTENSIONS = {
+    "pretty": ".ast.txt",
+    "json": ".json",
+    "json-compact": ".json",
+    "ndjson": ".ndjson",
+    "tokens": ".tokens.ndjson",
+    "tokens-binary": ".tokens.bin",
+    "tokens-stats": ".tokens.txt",
+    "format": "",
+}
+
+# (path, ok, запись NDJSON или None, текст ошибок)
+Result = Tuple[str, bool, Optional[str], str]
+
+
+def is_batch(paths: List[str], jobs: Optional[int], out_dir: Optional[str]) -> bool:
+    return (len(paths) > 1 or jobs is not None or out_dir is not None
+            or any(ch in paths[0] for ch in _GLOB_CHARS))
+
+
+def expand_paths(patterns: Iterable[str]) -> Tuple[List[str], List[str]]:
+    """Раскрывает glob'ы; возвращает (файлы без повторов, шаблоны без совпадений)."""
+    import glob
+    files: List[str] = []
+    seen = set()
+    unmatched: List[str] = []
+    for pattern in patterns:
+        if any(ch in pattern for ch in _GLOB_CHARS):
+            matches = sorted(p for p in glob.glob(pattern, recursive=True) if os.path.isfile(p))
+            if not matches:
+                unmatched.append(pattern)
+        else:
+            matches = [pattern]
+        for p in matches:
+            if p not in seen:
+                seen.add(p)
+                files.append(p)
+    return files, unmatched
+
+
+def output_path(out_dir: str, path: str, mode: str) -> Path:
+    from pathlib import Path
+    p = Path(path)
+    rel = Path(p.name) if p.is_absolute() or ".." in p.parts else p
+    return Path(out_dir) / rel.with_name(rel.name + _EXTENSIONS[mode])
+
+
+def _record(path: str, **fields) -> str:
+    import json
+    fields = dict(path=path, **fields)
+    return json.dumps(fields, ensure_ascii=False, separators=(",", ":"))
+
+
+def process_one(task: Tuple[str, str, bool, Optional[str]]) -> Result:
+    """Выполняется в рабочем процессе (или в текущем при --jobs 1)."""
+    from main.main import run_file
+    path, mode, ids, out_dir = task
+    err = io.StringIO()
+    if mode in ("check", "semantic", "lint"):
+        ok = run_file(path, mode, ids, io.StringIO(), err) == 0
+        return path, ok, _record(path, ok=ok) if out_dir is None else None, err.getvalue()
+
+    if out_dir is not None:
+        target = output_path(out_dir, path, mode)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with open(target, "w", encoding="utf-8", newline="") as f:
+            ok = run_file(path, mode, ids, f, err) == 0
+        if not ok:
+            target.unlink()
+        return path, ok, None, err.getvalue()
+
+    if mode == "tokens-binary":
+        return path, False, _record(path, ok=False, error="--tokens-binary needs --out-dir"), ""
+    out = io.StringIO()
+    # в общем потоке AST — это объект JSON в одну строку, независимо от --json/--ndjson
+    ok = run_file(path, "json-compact" if mode in _JSON_MODES else mode, ids, out, err) == 0
+    if not ok:
+        return path, False, _record(path, ok=False, error=err.getvalue().strip()), err.getvalue()
+    if mode in _JSON_MODES:
+        line = _record(path, ok=True)[:-1] + ',"ast":' + out.getvalue().rstrip("\n") + "}"
+    else:
+        line = _record(path, ok=True, output=out.getvalue())
+    return path, True, line, err.getvalue()
+
+
+def iter_results(files: List[str], mode: str, ids: bool, jobs: int,
+                 out_dir: Optional[str]) -> Iterator[Result]:
+    tasks = [(p, mode, ids, out_dir) for p in files]
+    if jobs == 1 or len(tasks) < 2:
+        for t in tasks:
+            yield process_one(t)
+        return
+    from concurrent.futures import ProcessPoolExecutor
+    workers = jobs or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # порядок результатов = порядок входа; пачками, чтобы не гонять по одному файлу через pipe
+        chunk = max(1, min(64, len(tasks) // (workers * 4)))
+        yield from pool.map(process_one, tasks, chunksize=chunk)
+
+
+def run_batch(patterns: List[str], mode: str, ids: bool, jobs: int = 1, out_dir: Optional[str] = None,
+              out: Optional[TextIO] = None, err: Optional[TextIO] = None) -> int:
+    out = sys.stdout if out is None else out
+    err = sys.stderr if err is None else err
+    start = time.perf_counter()
+    files, unmatched = expand_paths(patterns)
+    for pattern in unmatched:
+        print(f"ERROR: no files match '{pattern}'", file=err)
+    failed = 0
+    for path, ok, line, errors in iter_results(files, mode, ids, jobs, out_dir):
+        if line is not None:
+            out.write(line + "\n")
+        if not ok:
+            failed += 1
+        # и у успешных файлов: предупреждения --semantic не делают файл ошибочным
+        for msg in errors.splitlines():
+            print(f"{path}: {msg}" if not msg.startswith(path) else msg, file=err)
+    elapsed = time.perf_counter() - start
+    print(f"{len(files)} files, {len(files) - failed} ok, {failed} failed in {elapsed:.2f}s "
+          f"(jobs={jobs or os.cpu_count()})", file=err)
+    return 1 if failed or unmatched else 0
@@ -0,0 +1,99 @@
+"""
+Thin client for the parse server (see main/server.py).
+
+Usage:
+  python -m main.client <socket> parse|check|lex <files...>
+  python -m main.client <socket> stats | shutdown
+
+Prints one JSON result line per file; exit code 1 if any file has
+diagnostics.  Only `json` and `socket` are imported, so the client starts
+much faster than the full CLI.  From Python, keep one `Client` open and
+call it repeatedly:
+
+    with Client("/tmp/ml.sock") as c:
+        c.call("parse", path="a.txt")["ast"]
+"""
+import json
+import os
+import socket
+import sys
+
+
+class ClientError(Exception):
+    def __init__(self, code, message):
+        super().__init__(f"{message} (code {code})")
+        self.code = code
+        self.message = message
+
+
+class Client:
+    def __init__(self, sock_path, timeout=None):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        self.sock.connect(sock_path)
+        self.rfile = self.sock.makefile("rb")
+        self.next_id = 0
+
+    def call_raw(self, method, **params):
+        """Ответ сервера как строка JSON (без разбора)."""
+        self.next_id += 1
+        req = {"jsonrpc": "2.0", "id": self.next_id, "method": method, "params": params}
+        self.sock.sendall(json.dumps(req).encode("utf-8") + b"\n")
+        line = self.rfile.readline()
+        if not line:
+            raise ConnectionError("server closed the connection")
+        return line.decode("utf-8")
+
+    def call(self, method, **params):
+        resp = json.loads(self.call_raw(method, **params))
+        if "error" in resp:
+            raise ClientError(resp["error"]["code"], resp["error"]["message"])
+        return resp["result"]
+
+    def close(self):
+        self.rfile.close()
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) < 2:
+        print(__doc__.strip(), file=sys.stderr)
+        return 1
+    sock_path, method, files = argv[0], argv[1], argv[2:]
+    try:
+        client = Client(sock_path)
+    except OSError as e:
+        print(f"ERROR: cannot connect to {sock_path}: {e}", file=sys.stderr)
+        return 1
+    failed = 0
+    with client:
+        try:
+            if not files:
+                print(json.dumps(client.call(method)))
+                return 0
+            for path in files:
+                # у сервера может быть другой рабочий каталог
+                resp = json.loads(client.call_raw(method, path=os.path.abspath(path)))
+                if "error" in resp:
+                    raise ClientError(resp["error"]["code"], resp["error"]["message"])
+                result = resp["result"]
+                if not result.get("ok", True):
+                    failed += 1
+                    for d in result["diagnostics"]:
+                        print(f"{path}:{d['line']}:{d['col']}: {d['source']} error: {d['message']}", file=sys.stderr)
+                print(json.dumps(result, ensure_ascii=False, separators=(",", ":")))
+        except ClientError as e:
+            print(f"ERROR: {e}", file=sys.stderr)
+            return 1
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
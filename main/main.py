@@ -1,17 +1,60 @@
 """
-CLI: parse a source file and print AST (pretty or JSON).
+CLI: parse source files and print AST (pretty or JSON).
 
 Usage:
-  python -m main.main <path/to/source.txt> [--json]
+  python -m main.main <path/to/source.txt> [--json | --json-compact | --ndjson] [--no-ids] [--stats[=json]]
+  python -m main.main <path/to/source.txt> --tokens | --tokens-binary | --tokens-stats
+  python -m main.main <path/to/source.txt> --format | --check | --semantic | --lint
+  python -m main.main <paths and globs...> [mode] [--jobs N] [--out-dir DIR]
+  python -m main.main <paths and globs...> --profile[=collapsed|json]
+  python -m main.main --serve /path/to.sock
+  python -m main.main --watch DIR [mode] [--no-ids] [--out-dir OUT]
+Options:
+  --json          indented JSON AST
+  --json-compact  JSON AST on a single line, no spaces
+  --ndjson        one compact JSON object per top-level statement, one per line
+  --no-ids        leave node ids out of JSON output
+  --tokens        lexer only: one JSON object per token (NDJSON)
+  --tokens-binary lexer only: binary token records (see lexer/token_dump.py)
+  --tokens-stats  lexer only: token counts per kind
+  --format        print the source in canonical form (comments kept)
+  --check         exit 1 if --format would change the file, report the first difference
+  --semantic      check names, scopes and types (semantic/checker.py), then warn about reads
+                  before assignment, dead stores and unused variables (semantic/dataflow.py);
+                  diagnostics on stderr as path:line:col: error|warning: message,
+                  exit 1 if there are errors
+  --lint          run the lint rules (lint/rules.py) in one pass over the tree; findings on
+                  stderr as path:line:col: rule: message, exit 1 if there are any
+  --jobs N        batch: process files in N worker processes (0 = one per CPU)
+  --out-dir DIR   batch: write each file's output to DIR instead of one NDJSON stream
+  --serve SOCK    run the parse server on a Unix socket (see main/server.py, main/client.py)
+  --watch DIR     process every .txt file under DIR, then re-process files as they change
+                  (output as in batch mode; see main/watch.py)
+  --stats[=json]  single file, AST modes: time and memory per phase, token and node counts
+                  on stderr as text (default) or one JSON object (see main/stats.py)
+  --profile[=collapsed|json]
+                  parse the files with the per-rule profiler (parser/profile.py) and print
+                  its report on stdout instead of the AST; collapsed = flamegraph input
+Batch mode (several paths, a glob such as 'examples/*.txt', --jobs or --out-dir):
+  files are processed in-process; without --out-dir stdout gets one JSON line
+  per file ({"path", "ok", "error" | "ast" | "output" ...}), and a summary goes to stderr.
 Exit codes:
-  0 on success, 1 on lex/parse error.
+  0 on success, 1 on lex/parse error (or, with --check, if the file is not formatted;
+  with --semantic, if it has semantic errors; with --lint, if there are findings);
+  in batch mode 1 if any file failed.
 """
+import io
 import sys
-import json
 
 from lexer import scan_all  # твоя функция лексера: scan_all(src) -> list[Token]
 from parser import parse    # твоя функция парсера: parse(tokens) -> Program
 from parser.errors import ParseError
+from parser.ast import _reset_ids
+from lexer import Lexer, LexError
+
+# json_io (json), formatter (decimal), token_dump (json, struct) и main.batch
+# импортируются там, где нужны: запуск на коротком файле
+# в основном состоит из импортов, и режиму по умолчанию они ни к чему
 
 def main(argv=None):
     argv = sys.argv[1:] if argv is None else argv
@@ -19,48 +62,246 @@ def main(argv=None):
         print(__doc__.strip())
         return 0
 
-    path = None
-    as_json = False
-    for a in argv:
-        if a == "--json":
-            as_json = True
+    paths = []
+    mode = "pretty"
+    ids = True
+    jobs = None
+    out_dir = None
+    serve_path = None
+    watch_dir = None
+    stats_format = None
+    profile_format = None
+    args = iter(argv)
+    for a in args:
+        if a in ("--json", "--json-compact", "--ndjson", "--tokens", "--tokens-binary", "--tokens-stats",
+                 "--format", "--check", "--semantic", "--lint"):
+            mode = a[2:]
+        elif a == "--no-ids":
+            ids = False
+        elif a == "--stats" or a.startswith("--stats="):
+            stats_format = a.partition("=")[2] or "text"
+            if stats_format not in ("text", "json"):
+                print(f"ERROR: --stats= expects text or json, got {stats_format!r}", file=sys.stderr)
+                return 1
+        elif a == "--profile" or a.startswith("--profile="):
+            profile_format = a.partition("=")[2] or "text"
+            if profile_format not in ("text", "collapsed", "json"):
+                print(f"ERROR: --profile= expects text, collapsed or json, got {profile_format!r}",
+                      file=sys.stderr)
+                return 1
+        elif a in ("--jobs", "--out-dir", "--serve", "--watch"):
+            value = next(args, None)
+            if value is None:
+                print(f"ERROR: {a} needs a value", file=sys.stderr)
+                return 1
+            if a == "--out-dir":
+                out_dir = value
+                continue
+            if a == "--serve":
+                serve_path = value
+                continue
+            if a == "--watch":
+                watch_dir = value
+                continue
+            try:
+                jobs = int(value)
+            except ValueError:
+                jobs = -1
+            if jobs < 0:
+                print(f"ERROR: --jobs expects a non-negative integer, got {value!r}", file=sys.stderr)
+                return 1
         elif a.startswith("-"):
             print(f"Unknown option: {a}", file=sys.stderr)
             print(__doc__.strip(), file=sys.stderr)
             return 1
         else:
-            path = a
+            paths.append(a)
 
-    if not path:
+    if serve_path is not None:
+        from main.server import serve
+        return serve(serve_path)
+    if not ids and mode not in ("json", "json-compact", "ndjson"):
+        print("ERROR: --no-ids needs --json, --json-compact or --ndjson", file=sys.stderr)
+        return 1
+    if watch_dir is not None:
+        if paths:
+            print("ERROR: --watch takes a directory, not input files", file=sys.stderr)
+            return 1
+        from main.watch import watch
+        return watch(watch_dir, mode, ids, out_dir)
+    if not paths:
         print("ERROR: Missing input file.\n", file=sys.stderr)
         print(__doc__.strip(), file=sys.stderr)
         return 1
 
+    if profile_format is not None:
+        return run_profile(paths, profile_format)
+    from main.batch import is_batch, run_batch
+    batch = is_batch(paths, jobs, out_dir)
+    if stats_format is not None:
+        if batch or mode not in ("pretty", "json", "json-compact", "ndjson"):
+            print("ERROR: --stats works with a single file in the pretty or JSON modes", file=sys.stderr)
+            return 1
+        return run_with_stats(paths[0], mode, ids, stats_format)
+    if batch:
+        return run_batch(paths, mode, ids, jobs=1 if jobs is None else jobs, out_dir=out_dir)
+    return run_file(paths[0], mode, ids)
+
+def run_profile(patterns, fmt):
+    """Разбор всех файлов профилирующим парсером; на stdout — отчёт вместо AST."""
+    from main.batch import expand_paths
+    from parser.profile import Profile, ProfilingParser
+    files, unmatched = expand_paths(patterns)
+    failed = len(unmatched)
+    for pattern in unmatched:
+        print(f"ERROR: no files match '{pattern}'", file=sys.stderr)
+    profile = Profile()
+    for path in files:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                src = f.read()
+            _reset_ids()
+            ProfilingParser(scan_all(src), profile=profile).parse()
+        except (OSError, UnicodeDecodeError, LexError, ParseError) as e:
+            print(f"{path}: {e}", file=sys.stderr)
+            failed += 1
+    if fmt == "collapsed":
+        profile.write_collapsed(sys.stdout)
+    elif fmt == "json":
+        import json
+        json.dump(profile.to_json(), sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    else:
+        profile.write_report(sys.stdout)
+    return 1 if failed else 0
+
+def run_with_stats(path, mode, ids, fmt):
+    from main.stats import RunStats
+    stats = RunStats(path)
+    stats.start()
+    try:
+        code = run_file(path, mode, ids, stats=stats)
+    finally:
+        stats.stop()
+    sys.stdout.flush()
+    stats.report(fmt, sys.stderr)
+    return code
+
+def run_file(path, mode="pretty", ids=True, out=None, err=None, stats=None):
+    """Один файл: вывод в out (по умолчанию stdout), ошибки в err (stderr). Возвращает код выхода.
+
+    stats: main.stats.RunStats или None; заполняется по фазам (только режимы AST).
+    """
+    out = sys.stdout if out is None else out
+    err = sys.stderr if err is None else err
+    if stats is not None:
+        stats.begin("read")
     try:
         with open(path, "r", encoding="utf-8") as f:
             src = f.read()
     except OSError as e:
-        print(f"ERROR: cannot read file '{path}': {e}", file=sys.stderr)
+        print(f"ERROR: cannot read file '{path}': {e}", file=err)
         return 1
 
+    if mode.startswith("tokens"):
+        return run_tokens(src, mode, out, err)
+
+    # id узлов в выводе нумеруются с 1 для каждого файла, как при отдельном запуске
+    _reset_ids()
+
     # Lexer -> Parser
     try:
+        if mode == "format":
+            from parser.formatter import write_formatted
+            write_formatted(src, out)
+            return 0
+        if mode == "check":
+            from parser.formatter import check_source
+            first_diff = check_source(src)
+            if first_diff is not None:
+                print(f"{path}:{first_diff[0]}:{first_diff[1]}: not formatted", file=err)
+                return 1
+            return 0
+        if mode == "semantic":
+            from semantic import check_source as check_semantics
+            diagnostics = check_semantics(src, dataflow=True)
+            for d in diagnostics:
+                print(f"{path}:{d}", file=err)
+            return 1 if any(d.severity == "error" for d in diagnostics) else 0
+        if mode == "lint":
+            from lint import lint_source
+            findings = lint_source(src)
+            for finding in findings:
+                print(f"{path}:{finding}", file=err)
+            return 1 if findings else 0
+        if stats is not None:
+            stats.size = len(src)
+            stats.begin("scan_all")
         tokens = scan_all(src)
+        if stats is not None:
+            stats.end()
+            stats.count_tokens(tokens)
+            stats.begin("parse")
         program = parse(tokens)
     except ParseError as e:
-        print(f"PARSE ERROR: {e}", file=sys.stderr)
+        print(f"PARSE ERROR: {e}", file=err)
+        if stats is not None:
+            stats.error = str(e)
         return 1
     except Exception as e:
         # сюда попадут лексические ошибки, если ты их бросаешь как Exception
-        print(f"ERROR: {e}", file=sys.stderr)
+        print(f"ERROR: {e}", file=err)
+        if stats is not None:
+            stats.error = str(e)
         return 1
 
     # Output
-    if as_json:
-        print(json.dumps(program.to_json(), ensure_ascii=False, indent=2))
+    if mode in ("json", "json-compact", "ndjson"):
+        from parser.json_io import dump_json, dump_ndjson, COMPACT
+    if stats is not None:
+        # сериализация в буфер, чтобы отделить её от записи в stdout
+        stats.end()
+        stats.count_nodes(program)
+        stats.begin("pretty" if mode == "pretty" else "to_json")
+        final_out, out = out, io.StringIO()
+    if mode == "json":
+        # потоковый вывод: тот же текст, что json.dumps(program.to_json(), indent=2)
+        dump_json(program, out, indent=2, ids=ids)
+        out.write("\n")
+    elif mode == "json-compact":
+        dump_json(program, out, indent=None, separators=COMPACT, ids=ids)
+        out.write("\n")
+    elif mode == "ndjson":
+        dump_ndjson(program, out, ids=ids)
     else:
-        print(program.pretty().rstrip())
+        program.write_pretty(out)
+
+    if stats is not None:
+        stats.begin("output")
+        final_out.write(out.getvalue())
+        final_out.flush()
+        stats.end()
+    return 0
 
+def run_tokens(src, mode, out=None, err=None):
+    """Только лексер: токены идут в вывод по мере сканирования, без списка."""
+    out = sys.stdout if out is None else out
+    err = sys.stderr if err is None else err
+    from lexer.token_dump import dump_tokens_ndjson, dump_tokens_binary, token_stats, write_token_stats
+    tokens = Lexer(src).tokens()
+    try:
+        if mode == "tokens":
+            dump_tokens_ndjson(tokens, out)
+        elif mode == "tokens-binary":
+            out.flush()
+            dump_tokens_binary(tokens, out.buffer)
+            out.buffer.flush()
+        else:
+            write_token_stats(token_stats(tokens), out)
+    except LexError as e:
+        out.flush()
+        print(f"ERROR: {e}", file=err)
+        return 1
     return 0
 
 if __name__ == "__main__":
@@ -0,0 +1,242 @@
+"""
+Long-running parse server: `python -m main.main --serve /path/to.sock`.
+
+Clients connect to the Unix socket and send newline-delimited JSON-RPC 2.0
+requests; every request gets exactly one response line, in order:
+
+    {"jsonrpc": "2.0", "id": 1, "method": "parse", "params": {"path": "a.txt"}}
+    {"jsonrpc": "2.0", "id": 1, "result": {"ok": true, "ast": {...}}}
+
+Methods (params take either "source" or "path"):
+  lex       {"ok", "tokens": [{"kind", "lexeme", "line", "col", "offset"}]}
+  parse     {"ok", "ast"} on success, {"ok": false, "diagnostics"} otherwise;
+            "ids": false leaves node ids out of the AST
+  check     {"ok", "diagnostics"} without the AST
+  stats     cache counters
+  shutdown  stops the server after answering
+
+A diagnostic is {"severity": "error", "source": "lex" | "parse",
+"message", "line", "col"}.  Parse and check results are kept in an LRU
+keyed by the SHA-256 of the source, so asking again for an unchanged file
+costs a hash and a dictionary lookup.  The AST is stored already encoded
+as JSON text and spliced into the response as is; it is encoded on the
+first `parse` that needs it, separately with and without ids (`check`
+encodes nothing; asking for the other variant later parses again).
+"""
+from __future__ import annotations
+import hashlib
+import io
+import json
+import os
+import socketserver
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from lexer import Lexer, LexError
+from parser.ast import _reset_ids
+from parser.errors import ParseError
+from parser.json_io import dump_json, COMPACT
+from parser.parser import Parser
+
+DEFAULT_CACHE_SIZE = 256
+
+# JSON-RPC 2.0 error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+
+class RpcError(Exception):
+    def __init__(self, code: int, message: str) -> None:
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+def diagnostic(e: Exception) -> Dict[str, Any]:
+    if isinstance(e, ParseError):
+        return {"severity": "error", "source": "parse", "message": e.message,
+                "line": e.at.line, "col": e.at.col}
+    if isinstance(e, LexError):
+        return {"severity": "error", "source": "lex", "message": e.message, "line": e.line, "col": e.col}
+    raise e
+
+
+class CacheEntry:
+    __slots__ = ("ok", "diagnostics", "ast")
+
+    def __init__(self, ok: bool, diagnostics: list) -> None:
+        self.ok = ok
+        self.diagnostics = diagnostics
+        self.ast: Dict[bool, str] = {}      # ids -> AST JSON; только запрошенные варианты
+
+
+class ParseCache:
+    """LRU: sha256(source) -> CacheEntry.  hits/misses считает ParseService:
+    запись без нужного варианта AST — тоже промах."""
+
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE) -> None:
+        self.maxsize = maxsize
+        self.entries: "OrderedDict[bytes, CacheEntry]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: bytes) -> Optional[CacheEntry]:
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+        return entry
+
+    def put(self, key: bytes, entry: CacheEntry) -> None:
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+
+class ParseService:
+    """Состояние сервера: кэш и разбор; методы вызываются под одной блокировкой."""
+
+    def __init__(self, cache_size: int = DEFAULT_CACHE_SIZE) -> None:
+        self.cache = ParseCache(cache_size)
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _source(params: Dict[str, Any]) -> str:
+        if "source" in params:
+            if not isinstance(params["source"], str):
+                raise RpcError(INVALID_PARAMS, "'source' must be a string")
+            return params["source"]
+        if "path" in params:
+            try:
+                with open(params["path"], "r", encoding="utf-8") as f:
+                    return f.read()
+            except (OSError, TypeError, UnicodeDecodeError) as e:
+                raise RpcError(INVALID_PARAMS, f"cannot read file {params['path']!r}: {e}") from None
+        raise RpcError(INVALID_PARAMS, "expected 'source' or 'path'")
+
+    def _parsed(self, src: str, ids: Optional[bool] = None) -> CacheEntry:
+        """Результат разбора; ids не None — нужен ещё AST в этом варианте."""
+        key = hashlib.sha256(src.encode("utf-8")).digest()
+        entry = self.cache.get(key)
+        if entry is not None and (ids is None or not entry.ok or ids in entry.ast):
+            self.cache.hits += 1
+            return entry
+        self.cache.misses += 1
+        _reset_ids()       # id в ответе нумеруются с 1, как у CLI
+        parser = None
+        program = None
+        diagnostics = []
+        try:
+            parser = Parser(Lexer(src).scan_all())
+            program = parser.parse()
+        except (LexError, ParseError) as e:
+            diagnostics = [diagnostic(e)]
+        except RecursionError:
+            # парсер рекурсивный: `((((...` глубиной в тысячи уровней его не пропустит
+            at = parser.ts.peek() if parser is not None else None
+            diagnostics = [{"severity": "error", "source": "parse", "message": "expression is nested too deeply",
+                            "line": at.line if at is not None else 0, "col": at.col if at is not None else 0}]
+        if entry is None:
+            entry = CacheEntry(program is not None, diagnostics)
+            self.cache.put(key, entry)
+        if program is not None and ids is not None:
+            buf = io.StringIO()
+            dump_json(program, buf, indent=None, separators=COMPACT, ids=ids)
+            entry.ast[ids] = buf.getvalue()
+        return entry
+
+    def call(self, method: str, params: Dict[str, Any]) -> Any:
+        """Результат метода: объект для json.dumps или готовый JSON-текст (str)."""
+        with self.lock:
+            if method in ("parse", "check"):
+                ids = bool(params.get("ids", True)) if method == "parse" else None
+                entry = self._parsed(self._source(params), ids)
+                if ids is None or not entry.ok:
+                    return json.dumps({"ok": entry.ok, "diagnostics": entry.diagnostics},
+                                      ensure_ascii=False, separators=COMPACT)
+                return '{"ok":true,"ast":' + entry.ast[ids] + "}"
+            if method == "lex":
+                src = self._source(params)
+                try:
+                    tokens = [{"kind": t.kind.name, "lexeme": t.lexeme, "line": t.line, "col": t.col,
+                               "offset": t.offset} for t in Lexer(src).tokens()]
+                except LexError as e:
+                    return {"ok": False, "diagnostics": [diagnostic(e)]}
+                return {"ok": True, "tokens": tokens}
+            if method == "stats":
+                return {"cache_size": len(self.cache.entries), "cache_max": self.cache.maxsize,
+                        "hits": self.cache.hits, "misses": self.cache.misses}
+        raise RpcError(METHOD_NOT_FOUND, f"unknown method {method!r}")
+
+    def handle_line(self, line: bytes) -> Tuple[str, bool]:
+        """Одна строка запроса -> (строка ответа без '\\n', нужно ли остановиться)."""
+        req_id = None
+        stop = False
+        try:
+            try:
+                req = json.loads(line)
+            except ValueError as e:
+                raise RpcError(PARSE_ERROR, f"invalid JSON: {e}") from None
+            if not isinstance(req, dict) or not isinstance(req.get("method"), str):
+                raise RpcError(INVALID_REQUEST, "expected an object with a 'method'")
+            req_id = req.get("id")
+            params = req.get("params") or {}
+            if not isinstance(params, dict):
+                raise RpcError(INVALID_PARAMS, "'params' must be an object")
+            if req["method"] == "shutdown":
+                result: Any = None
+                stop = True
+            else:
+                result = self.call(req["method"], params)
+        except Exception as e:
+            # ошибка сервера не должна обрывать соединение без ответа
+            if not isinstance(e, RpcError):
+                e = RpcError(INTERNAL_ERROR, f"internal error: {type(e).__name__}: {e}")
+            body = json.dumps({"code": e.code, "message": e.message}, ensure_ascii=False, separators=COMPACT)
+            return '{"jsonrpc":"2.0","id":' + json.dumps(req_id) + ',"error":' + body + "}", False
+        if not isinstance(result, str):
+            result = json.dumps(result, ensure_ascii=False, separators=COMPACT)
+        return '{"jsonrpc":"2.0","id":' + json.dumps(req_id) + ',"result":' + result + "}", stop
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        service: ParseService = self.server.service  # type: ignore[attr-defined]
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            response, stop = service.handle_line(line)
+            self.wfile.write(response.encode("utf-8") + b"\n")
+            self.wfile.flush()
+            if stop:
+                # shutdown() ждёт конца serve_forever, поэтому из другого потока
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+                return
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def serve(sock_path: str, cache_size: int = DEFAULT_CACHE_SIZE, ready: Optional[threading.Event] = None) -> int:
+    if os.path.exists(sock_path):
+        os.unlink(sock_path)       # сокет от прошлого (упавшего) запуска
+    server = _Server(sock_path, _Handler)
+    server.service = ParseService(cache_size)  # type: ignore[attr-defined]
+    print(f"listening on {sock_path}", file=sys.stderr)
+    if ready is not None:
+        ready.set()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if os.path.exists(sock_path):
+            os.unlink(sock_path)
+    return 0
@@ -0,0 +1,157 @@
+"""
+Per-run statistics for `main.main FILE --stats[=text|json]`.
+
+run_file calls `begin(phase)` at each phase boundary (read, scan_all,
+parse, to_json or pretty, output) and hands over the tokens and the tree;
+the report goes to stderr after the run:
+
+  phases    wall and CPU time of each phase (perf_counter, process_time)
+  tokens    total and count per kind (EOF included)
+  nodes     total, count per AST class, maximum depth (Program is depth 1)
+  memory    peak of tracemalloc over the run and per phase, and the max RSS
+            of the process where the platform reports it
+
+With stats on, the AST is serialized into a buffer first, so `output` is
+only the write to stdout.  tracemalloc is on for the whole run and slows
+allocation-heavy phases (lexing most of all), so compare timings between
+--stats runs, not against runs without it.  Without --stats run_file only
+tests `stats is not None` at the phase boundaries.
+"""
+from __future__ import annotations
+import json
+import sys
+import time
+import tracemalloc
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, TextIO, Tuple
+
+from lexer.tokens import Token
+from parser.ast import Node
+
+
+@dataclass
+class Phase:
+    name: str
+    wall: float      # секунды
+    cpu: float
+    peak: int        # байты, пик tracemalloc внутри фазы
+
+
+@dataclass
+class RunStats:
+    path: str
+    size: int = 0
+    phases: List[Phase] = field(default_factory=list)
+    tokens: Dict[str, int] = field(default_factory=dict)
+    nodes: Dict[str, int] = field(default_factory=dict)
+    max_depth: int = 0
+    peak: int = 0
+    error: Optional[str] = None
+    _current: Optional[Tuple[str, float, float]] = field(default=None, init=False, repr=False)
+    _tracing: bool = field(default=False, init=False, repr=False)
+
+    def start(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._tracing = True
+
+    def begin(self, name: str) -> None:
+        """Закрывает текущую фазу и открывает следующую."""
+        self.end()
+        if self._tracing and hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+        self._current = (name, time.perf_counter(), time.process_time())
+
+    def end(self) -> None:
+        if self._current is None:
+            return
+        name, wall0, cpu0 = self._current
+        wall, cpu = time.perf_counter() - wall0, time.process_time() - cpu0
+        peak = tracemalloc.get_traced_memory()[1] if self._tracing else 0
+        self.peak = max(self.peak, peak)
+        self.phases.append(Phase(name, wall, cpu, peak))
+        self._current = None
+
+    def stop(self) -> None:
+        self.end()
+        if self._tracing:
+            tracemalloc.stop()
+            self._tracing = False
+
+    def count_tokens(self, tokens: List[Token]) -> None:
+        counts = Counter(tok.kind.name for tok in tokens)
+        self.tokens = dict(sorted(counts.items(), key=lambda kv: (-kv[1], kv[0])))
+
+    def count_nodes(self, program: Node) -> None:
+        counts: Counter = Counter()
+        deepest = 0
+        stack = [(program, 1)]
+        while stack:
+            node, depth = stack.pop()
+            counts[type(node).__name__] += 1
+            if depth > deepest:
+                deepest = depth
+            for child in node.children():
+                stack.append((child, depth + 1))
+        self.nodes = dict(sorted(counts.items(), key=lambda kv: (-kv[1], kv[0])))
+        self.max_depth = deepest
+
+    # --- отчёт ---
+
+    def to_json(self) -> Dict:
+        return {
+            "path": self.path,
+            "bytes": self.size,
+            "error": self.error,
+            "phases": [{"name": p.name, "wall_ms": round(p.wall * 1e3, 3), "cpu_ms": round(p.cpu * 1e3, 3),
+                        "peak_traced_bytes": p.peak} for p in self.phases],
+            "total": {"wall_ms": round(sum(p.wall for p in self.phases) * 1e3, 3),
+                      "cpu_ms": round(sum(p.cpu for p in self.phases) * 1e3, 3)},
+            "tokens": {"total": sum(self.tokens.values()), "by_kind": self.tokens},
+            "nodes": {"total": sum(self.nodes.values()), "by_class": self.nodes, "max_depth": self.max_depth},
+            "peak_traced_bytes": self.peak,
+            "max_rss_bytes": _max_rss(),
+        }
+
+    def write_text(self, fp: TextIO) -> None:
+        fp.write(f"stats: {self.path} ({self.size} bytes)\n")
+        if self.error is not None:
+            fp.write(f"  failed: {self.error}\n")
+        fp.write(f"  {'phase':<10}{'wall ms':>10}{'cpu ms':>10}{'peak KB':>10}\n")
+        for p in self.phases:
+            fp.write(f"  {p.name:<10}{p.wall * 1e3:>10.2f}{p.cpu * 1e3:>10.2f}{p.peak / 1024:>10.1f}\n")
+        wall, cpu = sum(p.wall for p in self.phases), sum(p.cpu for p in self.phases)
+        fp.write(f"  {'total':<10}{wall * 1e3:>10.2f}{cpu * 1e3:>10.2f}\n")
+        if self.tokens:
+            fp.write(f"  tokens: {sum(self.tokens.values())}\n")
+            _write_counts(fp, self.tokens)
+        if self.nodes:
+            fp.write(f"  nodes: {sum(self.nodes.values())}, max depth {self.max_depth}\n")
+            _write_counts(fp, self.nodes)
+        fp.write(f"  peak traced memory: {self.peak / 1024:.1f} KB\n")
+        rss = _max_rss()
+        if rss is not None:
+            fp.write(f"  max RSS: {rss / (1 << 20):.1f} MB\n")
+
+    def report(self, fmt: str, fp: TextIO) -> None:
+        if fmt == "json":
+            json.dump(self.to_json(), fp)
+            fp.write("\n")
+        else:
+            self.write_text(fp)
+
+
+def _write_counts(fp: TextIO, counts: Dict[str, int]) -> None:
+    for name, n in counts.items():
+        fp.write(f"    {name:<18}{n:>10}\n")
+
+
+def _max_rss() -> Optional[int]:
+    try:
+        import resource
+    except ImportError:      # Windows
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux отдаёт KB, macOS — байты
+    return rss if sys.platform == "darwin" else rss * 1024
@@ -0,0 +1,261 @@
+"""
+Watch mode for main.main: `python -m main.main --watch DIR [mode] [--out-dir OUT]`.
+
+Every `.txt` file under DIR is processed once at start, then again only
+when its contents change.  Output uses the batch format (main/batch.py):
+one JSON line per changed file on stdout (or a file under --out-dir),
+`{"path": ..., "removed": true}` for deleted files, errors and a one-line
+summary per round on stderr.
+
+A manifest keeps (mtime, size, inode) and the SHA-256 of every file; a file
+whose stat changed but whose bytes did not (touch, editor re-save) is not
+re-parsed.  Results for unchanged files stay in memory, so the summary
+counts failures over the whole tree without redoing any of them.
+
+Change detection uses inotify on Linux (through ctypes): only the paths
+named in events are looked at, so the cost of a save does not depend on
+the size of the tree.  Elsewhere the tree is polled with os.scandir, which
+is one stat() per file per interval and no reads.
+"""
+from __future__ import annotations
+import ctypes
+import ctypes.util
+import hashlib
+import json
+import os
+import select
+import struct
+import sys
+import time
+from typing import Dict, Iterable, List, Optional, Set, TextIO, Tuple
+
+from main.batch import Result, process_one
+
+WATCH_SUFFIX = ".txt"
+DEFAULT_INTERVAL = 0.5
+# правки редактора приходят пачкой (запись во временный файл, rename): ждём тишины
+SETTLE = 0.05
+
+# (st_mtime_ns, st_size, st_ino)
+Signature = Tuple[int, int, int]
+
+
+class Watcher:
+    def __init__(self, root: str, mode: str = "pretty", ids: bool = True, out_dir: Optional[str] = None,
+                 out: Optional[TextIO] = None, err: Optional[TextIO] = None) -> None:
+        self.root = root
+        self.mode = mode
+        self.ids = ids
+        self.out_dir = out_dir
+        self.out = sys.stdout if out is None else out
+        self.err = sys.stderr if err is None else err
+        self.manifest: Dict[str, Tuple[Signature, bytes]] = {}
+        self.results: Dict[str, Result] = {}
+        # выходной каталог внутри root не смотрим: иначе *.ast.txt запускали бы новый круг
+        self.skip = os.path.realpath(out_dir) if out_dir is not None else None
+
+    def _skipped(self, path: str) -> bool:
+        if self.skip is None:
+            return False
+        real = os.path.realpath(path)
+        return real == self.skip or real.startswith(self.skip + os.sep)
+
+    # --- манифест ---
+
+    def scan(self) -> Dict[str, Signature]:
+        """Все исходники под root с их stat-подписями (stat без чтения файлов)."""
+        found: Dict[str, Signature] = {}
+        stack = [self.root]
+        while stack:
+            d = stack.pop()
+            try:
+                entries = list(os.scandir(d))
+            except OSError:
+                continue
+            for e in entries:
+                try:
+                    if e.is_dir(follow_symlinks=False):
+                        if not self._skipped(e.path):
+                            stack.append(e.path)
+                    elif e.name.endswith(WATCH_SUFFIX) and e.is_file():
+                        st = e.stat()
+                        found[e.path] = (st.st_mtime_ns, st.st_size, st.st_ino)
+                except OSError:
+                    continue
+        return found
+
+    def refresh(self, candidates: Optional[Iterable[str]] = None) -> Tuple[List[str], List[str]]:
+        """Обновляет манифест; candidates=None — весь каталог.
+        Возвращает (изменившиеся по содержимому, удалённые) пути."""
+        if candidates is None:
+            current = self.scan()
+            removed = [p for p in self.manifest if p not in current]
+        else:
+            current = {}
+            removed = []
+            for p in candidates:
+                if not p.endswith(WATCH_SUFFIX) or self._skipped(p):
+                    continue
+                try:
+                    st = os.stat(p)
+                except OSError:
+                    if p in self.manifest:
+                        removed.append(p)
+                    continue
+                current[p] = (st.st_mtime_ns, st.st_size, st.st_ino)
+        changed = []
+        for p, sig in current.items():
+            known = self.manifest.get(p)
+            if known is not None and known[0] == sig:
+                continue
+            try:
+                with open(p, "rb") as f:
+                    digest = hashlib.sha256(f.read()).digest()
+            except OSError:
+                continue
+            self.manifest[p] = (sig, digest)
+            if known is None or known[1] != digest:
+                changed.append(p)
+        for p in removed:
+            self.manifest.pop(p, None)
+            self.results.pop(p, None)
+        return sorted(changed), sorted(removed)
+
+    # --- обработка ---
+
+    def process(self, changed: List[str], removed: List[str]) -> None:
+        start = time.perf_counter()
+        for p in removed:
+            self.out.write(json.dumps({"path": p, "removed": True}, ensure_ascii=False, separators=(",", ":")) + "\n")
+        failed = 0
+        for p in changed:
+            result = self.results[p] = process_one((p, self.mode, self.ids, self.out_dir))
+            _, ok, line, errors = result
+            if line is not None:
+                self.out.write(line + "\n")
+            if not ok:
+                failed += 1
+                for msg in errors.splitlines():
+                    print(f"{p}: {msg}" if not msg.startswith(p) else msg, file=self.err)
+        self.out.flush()
+        failing = sum(1 for r in self.results.values() if not r[1])
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"[watch] {len(changed)} changed, {len(removed)} removed, {failed} failed in {elapsed:.0f} ms; "
+              f"{len(self.results)} files, {failing} failing", file=self.err)
+        self.err.flush()
+
+    def run(self, interval: float = DEFAULT_INTERVAL, use_inotify: bool = True,
+            max_rounds: Optional[int] = None) -> int:
+        """Первый проход по всему дереву, затем по изменениям до Ctrl+C (или max_rounds правок)."""
+        notify = _Inotify.create(self.root) if use_inotify else None
+        try:
+            self.process(*self.refresh())
+            rounds = 0
+            while max_rounds is None or rounds < max_rounds:
+                if notify is not None:
+                    candidates = notify.wait(interval)
+                    if candidates is not None and not candidates:
+                        continue
+                else:
+                    time.sleep(interval)
+                    candidates = None
+                changed, removed = self.refresh(candidates)
+                if changed or removed:
+                    self.process(changed, removed)
+                    rounds += 1
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if notify is not None:
+                notify.close()
+        return 1 if any(not r[1] for r in self.results.values()) else 0
+
+
+def watch(root: str, mode: str = "pretty", ids: bool = True, out_dir: Optional[str] = None,
+          interval: float = DEFAULT_INTERVAL) -> int:
+    if not os.path.isdir(root):
+        print(f"ERROR: --watch expects a directory, got '{root}'", file=sys.stderr)
+        return 1
+    print(f"watching {root} for *{WATCH_SUFFIX} changes (Ctrl+C to stop)", file=sys.stderr)
+    return Watcher(root, mode, ids, out_dir).run(interval)
+
+
+# --- inotify (Linux) ---
+
+_IN_EVENTS = 0x00000008 | 0x00000040 | 0x00000080 | 0x00000100 | 0x00000200
+#            CLOSE_WRITE  MOVED_FROM   MOVED_TO     CREATE       DELETE
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ISDIR = 0x40000000
+_IN_CLOEXEC = 0o2000000
+_EVENT = struct.Struct("iIII")
+
+
+class _Inotify:
+    """Дескриптор inotify с рекурсивными watch'ами на каталоги под root."""
+
+    def __init__(self, libc, fd: int, root: str) -> None:
+        self.libc = libc
+        self.fd = fd
+        self.dirs: Dict[int, str] = {}
+        self.add_tree(root)
+
+    @classmethod
+    def create(cls, root: str) -> Optional["_Inotify"]:
+        if not sys.platform.startswith("linux"):
+            return None
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+            fd = libc.inotify_init1(_IN_CLOEXEC)
+        except (OSError, AttributeError):
+            return None
+        if fd < 0:
+            return None
+        return cls(libc, fd, root)
+
+    def add_tree(self, root: str) -> None:
+        stack = [root]
+        while stack:
+            d = stack.pop()
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(d),
+                                             _IN_EVENTS | _IN_DELETE_SELF | _IN_MOVE_SELF)
+            if wd >= 0:
+                self.dirs[wd] = d
+            try:
+                stack.extend(e.path for e in os.scandir(d) if e.is_dir(follow_symlinks=False))
+            except OSError:
+                continue
+
+    def wait(self, timeout: float) -> Optional[Set[str]]:
+        """Пути из событий за одну пачку; пустое множество — событий не было,
+        None — нужен полный пересмотр (переполнение очереди, менялись каталоги)."""
+        paths: Set[str] = set()
+        rescan = False
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        while ready:
+            data = os.read(self.fd, 65536)
+            pos = 0
+            while pos < len(data):
+                wd, mask, _cookie, length = _EVENT.unpack_from(data, pos)
+                pos += _EVENT.size
+                name = os.fsdecode(data[pos:pos + length].rstrip(b"\0"))
+                pos += length
+                if mask & _IN_Q_OVERFLOW:
+                    rescan = True
+                elif mask & _IN_IGNORED:
+                    self.dirs.pop(wd, None)
+                elif mask & (_IN_ISDIR | _IN_DELETE_SELF | _IN_MOVE_SELF):
+                    rescan = True
+                    if mask & _IN_ISDIR and wd in self.dirs and name:
+                        path = os.path.join(self.dirs[wd], name)
+                        if os.path.isdir(path):
+                            self.add_tree(path)
+                elif wd in self.dirs and name:
+                    paths.add(os.path.join(self.dirs[wd], name))
+            ready, _, _ = select.select([self.fd], [], [], SETTLE)
+        return None if rescan else paths
+
+    def close(self) -> None:
+        os.close(self.fd)
@@ -0,0 +1,4 @@
+from .fold import FoldStats, fold
+from .loops import LoopStats, optimize_loops
+
+__all__ = ["FoldStats", "fold", "LoopStats", "optimize_loops"]
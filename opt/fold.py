@@ -0,0 +1,254 @@
+"""
+Constant folding and dead-branch elimination.
+
+    program, stats = fold(program)
+    print(stats.folded, stats.ifs_removed, stats.loops_removed, stats.nodes_removed)
+
+Rewrites, bottom-up in one pass:
+
+  BinOp/UnOp   of literals become a literal: `1 + 2 * 3` -> 7, `!true` ->
+               false.  int op int stays int, `/` on ints truncates toward
+               zero (-7 / 2 == -3), anything with a real gives a real.
+               Division by zero and results that are not finite are left
+               for run time.  Comparisons give bool.
+  && / ||      with a constant operand: `true && x` -> x, `x || false` -> x,
+               `false && x` -> false, `true || x` -> true (x would not be
+               evaluated anyway).  `x && false` keeps x: it may call a function.
+  If           with a constant condition becomes the branch that runs (or
+               disappears); a lone declaration in that branch keeps its own
+               scope inside a Block.
+  For          whose condition is false runs only its init: an Assign init is
+               kept as a statement, a Decl init is dropped unless its
+               initializer calls a function.
+
+The pass assumes a type-correct program (see semantic.check): ill-typed
+constant operands such as `1 + true` are left as they are.  Ints are not
+wrapped, the language does not fix their width.
+
+The input is not modified.  Unchanged subtrees are shared with the result,
+and a rebuilt or folded node keeps the id of the node it replaces, so the
+parser's positions stay valid for the new tree.  A removed statement in a
+position that needs one (an If branch, a loop body) becomes an empty Block.
+"""
+from __future__ import annotations
+import dataclasses
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from parser.ast import (
+    Node, Program, Block, Decl, If, For, FuncDef, StructDecl, EnumDecl,
+    BinOp, UnOp, Literal, CallExpr, OpKind, _field_names,
+)
+
+_NO = object()      # «не сворачивается»
+_SCOPED = (Decl, FuncDef, StructDecl, EnumDecl)
+
+
+@dataclass
+class FoldStats:
+    folded: int = 0             # операторы, заменённые литералом
+    simplified: int = 0         # && и || с постоянным операндом
+    ifs_removed: int = 0        # If с постоянным условием
+    loops_removed: int = 0      # For с условием false
+    nodes_before: int = 0
+    nodes_after: int = 0
+
+    @property
+    def nodes_removed(self) -> int:
+        return self.nodes_before - self.nodes_after
+
+
+def fold(program: Program) -> Tuple[Program, FoldStats]:
+    """Новое дерево со свёрнутыми константами и статистика."""
+    stats = FoldStats(nodes_before=count_nodes(program))
+    done: Dict[int, Optional[Node]] = {}
+    stack: List[Tuple[Node, bool]] = [(program, False)]
+    while stack:
+        node, ready = stack.pop()
+        if id(node) in done:        # общий подграф (hashcons) — уже обработан
+            continue
+        if not ready:
+            stack.append((node, True))
+            stack.extend((c, False) for c in node.children())
+            continue
+        done[id(node)] = _fold_node(_rebuild(node, done), stats)
+    result = done[id(program)]
+    stats.nodes_after = count_nodes(result)
+    return result, stats
+
+
+def count_nodes(root: Node) -> int:
+    n = 0
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        n += 1
+        stack.extend(node.children())
+    return n
+
+
+def _rebuild(node: Node, done: Dict[int, Optional[Node]]) -> Node:
+    """Тот же узел, если дети не изменились, иначе копия с новыми детьми и прежним id."""
+    changes: Dict[str, Any] = {}
+    for name in _field_names(type(node)):
+        value = getattr(node, name)
+        if isinstance(value, Node):
+            new = done[id(value)]
+            if new is not value:
+                # выброшенный оператор: else можно убрать, остальным местам нужен оператор
+                changes[name] = new if new is not None or name == "else_branch" else Block()
+        elif isinstance(value, list) and value and isinstance(value[0], Node):
+            items = [done[id(v)] for v in value]
+            if any(new is not old for new, old in zip(items, value)):
+                changes[name] = [v for v in items if v is not None]
+    if not changes:
+        return node
+    return _same_id(dataclasses.replace(node, **changes), node)
+
+
+def _same_id(new: Node, old: Node) -> Node:
+    new.id = old.id
+    return new
+
+
+def _fold_node(node: Node, stats: FoldStats) -> Optional[Node]:
+    cls = type(node)
+    if cls is BinOp:
+        return _fold_binop(node, stats)
+    if cls is UnOp:
+        return _fold_unop(node, stats)
+    if cls is If:
+        return _fold_if(node, stats)
+    if cls is For:
+        return _fold_for(node, stats)
+    return node
+
+
+def _kind(value: Any) -> str:
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, int):
+        return "int"
+    if isinstance(value, float):
+        return "real"
+    return ""
+
+
+def _eval_binop(op: OpKind, a: Any, b: Any) -> Any:
+    ka, kb = _kind(a), _kind(b)
+    if op is OpKind.AND or op is OpKind.OR:
+        if ka == kb == "bool":
+            return (a and b) if op is OpKind.AND else (a or b)
+        return _NO
+    numeric = ka in ("int", "real") and kb in ("int", "real")
+    if op is OpKind.EQ or op is OpKind.NEQ:
+        if not numeric and not ka == kb == "bool":
+            return _NO
+        return (a == b) if op is OpKind.EQ else (a != b)
+    if not numeric:
+        return _NO
+    if op is OpKind.LT:
+        return a < b
+    if op is OpKind.LE:
+        return a <= b
+    if op is OpKind.GT:
+        return a > b
+    if op is OpKind.GE:
+        return a >= b
+    if op is OpKind.DIV:
+        if b == 0:
+            return _NO
+        if ka == kb == "int":
+            q = abs(a) // abs(b)
+            return -q if (a < 0) != (b < 0) else q
+        v = a / b
+    elif op is OpKind.ADD:
+        v = a + b
+    elif op is OpKind.SUB:
+        v = a - b
+    elif op is OpKind.MUL:
+        v = a * b
+    else:
+        return _NO
+    if "real" in (ka, kb):
+        v = float(v)
+        if not math.isfinite(v):
+            return _NO
+    return v
+
+
+def _literal(value: Any, replaced: Node, stats: FoldStats) -> Literal:
+    stats.folded += 1
+    return _same_id(Literal(value=value), replaced)
+
+
+def _is_bool(node: Node, value: bool) -> bool:
+    return type(node) is Literal and node.value is value
+
+
+def _fold_binop(node: BinOp, stats: FoldStats) -> Node:
+    l, r = node.left, node.right
+    if type(l) is Literal and type(r) is Literal:
+        v = _eval_binop(node.op, l.value, r.value)
+        return node if v is _NO else _literal(v, node, stats)
+    if node.op is OpKind.AND or node.op is OpKind.OR:
+        neutral = node.op is OpKind.AND       # true для &&, false для ||
+        if _is_bool(l, neutral):
+            stats.simplified += 1
+            return r
+        if _is_bool(r, neutral):
+            stats.simplified += 1
+            return l
+        if _is_bool(l, not neutral):
+            # правый операнд всё равно не вычислялся бы
+            stats.simplified += 1
+            return l
+    return node
+
+
+def _fold_unop(node: UnOp, stats: FoldStats) -> Node:
+    e = node.expr
+    if type(e) is not Literal:
+        return node
+    kind = _kind(e.value)
+    if node.op is OpKind.NEG and kind in ("int", "real"):
+        return _literal(-e.value, node, stats)
+    if node.op is OpKind.NOT and kind == "bool":
+        return _literal(not e.value, node, stats)
+    return node
+
+
+def _in_own_scope(stmt: Optional[Node]) -> Optional[Node]:
+    if isinstance(stmt, _SCOPED):
+        return Block(stmts=[stmt])
+    return stmt
+
+
+def _fold_if(node: If, stats: FoldStats) -> Optional[Node]:
+    cond = node.cond
+    if type(cond) is not Literal or type(cond.value) is not bool:
+        return node
+    stats.ifs_removed += 1
+    return _in_own_scope(node.then_branch if cond.value else node.else_branch)
+
+
+def _calls(root: Node) -> bool:
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if type(node) is CallExpr:
+            return True
+        stack.extend(node.children())
+    return False
+
+
+def _fold_for(node: For, stats: FoldStats) -> Optional[Node]:
+    if not _is_bool(node.cond, False):
+        return node
+    stats.loops_removed += 1
+    init = node.init
+    if isinstance(init, Decl):
+        # переменная цикла видна только в цикле: нужна лишь ради вызовов в инициализаторе
+        return Block(stmts=[init]) if init.init is not None and _calls(init.init) else None
+    return init
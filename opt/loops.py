@@ -0,0 +1,442 @@
+"""
+Loop optimizer for `for`: invariant code motion and strength reduction.
+
+    program, stats = optimize_loops(program)
+
+For every For, inner loops first:
+
+  induction variable   `i` with init `int i = e` / `i = e` (i an int) and
+                       step `i = i + c`, `i = c + i` or `i = i - c`, c an int
+                       literal, and no other assignment to i in the loop
+                       (if the loop calls a function and i is not declared
+                       by the loop, i must be local to the enclosing function).
+  invariant code       a pure subexpression of the condition or the body
+                       (literals and variables, + - * / comparisons && || !)
+                       none of whose variables is assigned, read() or
+                       declared inside the loop.  The largest such
+                       subexpressions with at least one variable are computed
+                       once into `int|real|bool _invN` before the loop; equal
+                       subexpressions share a temporary.  `/` is hoisted only
+                       by a non-zero literal (the loop may run zero times, the
+                       division may be guarded by an if).  If the loop calls a
+                       function, only variables local to the enclosing function
+                       count as invariant: a call may change globals.
+  strength reduction   `i * k` / `k * i`, k an invariant int expression,
+                       becomes `_ivN`, set to `e * k` before the loop and
+                       advanced by `c * k` at the end of the body (the
+                       language has no break/continue, so the end of the body
+                       is always followed by the step).
+
+The temporaries and the loop are wrapped in a Block, so the names stay
+local to it; names are chosen not to clash with any name in the program.
+Loops that declare functions, structs or enums inside are left alone.
+Variable types come from the declarations in scope, so only int, real and
+bool variables are considered; the program is assumed to be type-correct
+(see semantic.check).  Statements are walked recursively: their nesting is
+bounded by the recursive-descent parser anyway.
+
+As in fold.py the input is not modified, unchanged subtrees are shared and
+rebuilt nodes keep their ids.
+"""
+from __future__ import annotations
+import dataclasses
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+
+from parser.ast import (
+    Node, Program, Block, Decl, Assign, If, For, FuncDef, CallStmt, ReadStmt, StructDecl, EnumDecl,
+    Param, BinOp, UnOp, Literal, Ident, IndexExpr, CallExpr, FieldAccessExpr, OpKind, TypeKind,
+    BaseType, _field_names,
+)
+from parser.hashcons import unshare
+from semantic.scope import ScopedTable
+
+_KINDS = {TypeKind.INT: "int", TypeKind.REAL: "real", TypeKind.BOOL: "bool"}
+_TYPE_KINDS = {v: k for k, v in _KINDS.items()}
+_ARITH = (OpKind.ADD, OpKind.SUB, OpKind.MUL, OpKind.DIV)
+_LOGIC = (OpKind.AND, OpKind.OR)
+
+
+@dataclass
+class LoopStats:
+    loops: int = 0              # всего For
+    induction: int = 0          # из них с индуктивной переменной
+    optimized: int = 0          # изменённые циклы
+    hoisted: int = 0            # временные для инвариантов
+    reduced: int = 0            # временные для i * k
+    replaced: int = 0           # заменённые вхождения выражений
+
+
+@dataclass(frozen=True)
+class _Var:
+    kind: Optional[str]         # int, real, bool; None — не скаляр или не переменная
+    local: bool                 # локальная переменная функции: вызовы её не меняют
+
+
+@dataclass(frozen=True)
+class _Info:
+    invariant: bool
+    kind: Optional[str]
+    has_var: bool
+
+
+_VARIANT = _Info(False, None, False)
+
+
+def optimize_loops(program: Program) -> Tuple[Program, LoopStats]:
+    opt = _LoopOptimizer(program)
+    return opt.stmt(program), opt.stats
+
+
+def _walk(root: Node):
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        yield node
+        stack.extend(node.children())
+
+
+def _names(program: Program) -> Set[str]:
+    names: Set[str] = set()
+    for node in _walk(program):
+        for attr in ("name", "callee"):
+            value = getattr(node, attr, None)
+            if isinstance(value, str):
+                names.add(value)
+        if isinstance(node, EnumDecl):
+            names.update(node.members)
+    return names
+
+
+def _rebuild(node: Node, changes: Dict[str, object]) -> Node:
+    new = dataclasses.replace(node, **changes)
+    new.id = node.id
+    return new
+
+
+class _LoopOptimizer:
+    def __init__(self, program: Program) -> None:
+        self.stats = LoopStats()
+        self.vars: ScopedTable[_Var] = ScopedTable()
+        self.used = _names(program)
+        self.counter = 0
+        # внутри функции без вложенных функций: её переменные не меняются вызовами
+        self.local_ok: List[bool] = []
+
+    def fresh(self, prefix: str) -> str:
+        while True:
+            self.counter += 1
+            name = f"{prefix}{self.counter}"
+            if name not in self.used:
+                self.used.add(name)
+                return name
+
+    def declare(self, name: str, kind: Optional[str]) -> None:
+        self.vars.declare(name, _Var(kind, bool(self.local_ok) and self.local_ok[-1]))
+
+    # --- операторы ---
+
+    def stmt(self, node: Node) -> Node:
+        cls = type(node)
+        if cls is Program or cls is Block:
+            self.vars.push()
+            stmts = [self.stmt(s) for s in node.stmts]
+            self.vars.pop()
+            if any(new is not old for new, old in zip(stmts, node.stmts)):
+                return _rebuild(node, {"stmts": stmts})
+            return node
+        if cls is Decl:
+            self.declare(node.name, _KINDS.get(node.type_spec.kind) if type(node.type_spec) is BaseType else None)
+            return node
+        if cls is FuncDef:
+            self.declare(node.name, None)
+            self.vars.push()
+            self.local_ok.append(not any(type(n) is FuncDef for n in _walk(node.body)))
+            for p in node.params:
+                self.declare(p.name, _KINDS.get(p.type_spec.kind) if type(p.type_spec) is BaseType else None)
+            # параметры и тело — одна область
+            stmts = [self.stmt(s) for s in node.body.stmts]
+            self.local_ok.pop()
+            self.vars.pop()
+            if any(new is not old for new, old in zip(stmts, node.body.stmts)):
+                return _rebuild(node, {"body": _rebuild(node.body, {"stmts": stmts})})
+            return node
+        if cls is EnumDecl:
+            for member in node.members:
+                self.declare(member, None)
+            return node
+        if cls is If:
+            changes = {}
+            for name in ("then_branch", "else_branch"):
+                branch = getattr(node, name)
+                if branch is not None:
+                    self.vars.push()
+                    new = self.stmt(branch)
+                    self.vars.pop()
+                    if new is not branch:
+                        changes[name] = new
+            return _rebuild(node, changes) if changes else node
+        if cls is For:
+            self.stats.loops += 1
+            self.vars.push()
+            self.stmt(node.init)
+            self.vars.push()
+            body = self.stmt(node.body)
+            self.vars.pop()
+            if body is not node.body:
+                node = _rebuild(node, {"body": body})
+            result = self.loop(node)
+            self.vars.pop()
+            return result
+        return node
+
+    # --- цикл ---
+
+    def induction(self, node: For) -> Optional[Tuple[str, Node, int]]:
+        """(имя, начальное значение, шаг) или None."""
+        init, step = node.init, node.step
+        if type(init) is Decl and type(init.type_spec) is BaseType and init.type_spec.kind is TypeKind.INT \
+                and init.init is not None:
+            name, start = init.name, init.init
+        elif type(init) is Assign and type(init.lvalue) is Ident:
+            var = self.vars.lookup(init.lvalue.name)
+            if var is None or var.kind != "int":
+                return None
+            name, start = init.lvalue.name, init.expr
+        else:
+            return None
+        if type(step) is not Assign or type(step.lvalue) is not Ident or step.lvalue.name != name:
+            return None
+        e = step.expr
+        if type(e) is not BinOp or e.op not in (OpKind.ADD, OpKind.SUB):
+            return None
+        left_i = type(e.left) is Ident and e.left.name == name
+        right_i = type(e.right) is Ident and e.right.name == name
+        if left_i and _int_literal(e.right):
+            by = e.right.value
+        elif right_i and e.op is OpKind.ADD and _int_literal(e.left):
+            by = e.left.value
+        else:
+            return None
+        return name, start, by if e.op is OpKind.ADD else -by
+
+    def loop(self, node: For) -> Node:
+        # что меняется внутри цикла (шаг — отдельно: он меняет только i)
+        written: Set[str] = set()
+        calls = False
+        for part in (node.cond, node.body):
+            if part is None:
+                continue
+            for n in _walk(part):
+                cls = type(n)
+                if cls in (FuncDef, StructDecl, EnumDecl):
+                    return node
+                if cls is Assign:
+                    target = n.lvalue
+                    while type(target) in (IndexExpr, FieldAccessExpr):
+                        target = target.base
+                    if type(target) is Ident:
+                        written.add(target.name)
+                elif cls is Decl or cls is ReadStmt or cls is Param:
+                    written.add(n.name)
+                elif cls is CallExpr or cls is CallStmt:
+                    calls = True
+        iv = self.induction(node)
+        if iv is not None and (iv[0] in written or any(type(n) is CallExpr for n in _walk(iv[1]))):
+            iv = None
+        if iv is not None and calls and type(node.init) is Assign and not self.vars.lookup(iv[0]).local:
+            # i объявлена вне цикла и не локальна функции: вызов из тела может её поменять
+            iv = None
+        if iv is not None:
+            self.stats.induction += 1
+        if type(node.init) is Decl:
+            written.add(node.init.name)
+        elif type(node.init) is Assign and type(node.init.lvalue) is Ident:
+            written.add(node.init.lvalue.name)
+        if node.step is not None:
+            for n in _walk(node.step):
+                if type(n) is Assign and type(n.lvalue) is Ident:
+                    written.add(n.lvalue.name)
+
+        rw = _Rewriter(self, written, calls, iv)
+        cond = rw.rewrite(node.cond) if node.cond is not None else None
+        body = rw.rewrite(node.body)
+        if not rw.temps:
+            return node
+        self.stats.optimized += 1
+        self.stats.hoisted += rw.hoisted
+        self.stats.reduced += len(rw.reduced)
+        self.stats.replaced += rw.replaced
+        if rw.reduced:
+            updates = [Assign(lvalue=Ident(name=name), expr=BinOp(op=OpKind.ADD, left=Ident(name=name), right=amount))
+                       for name, amount in rw.reduced]
+            if type(body) is Block:
+                body = _rebuild(body, {"stmts": body.stmts + updates})
+            else:
+                body = Block(stmts=[body] + updates)
+        loop = _rebuild(node, {"cond": cond, "body": body})
+        return Block(stmts=rw.temps + [loop])
+
+
+class _Rewriter:
+    """Замена инвариантов и i * k внутри одного цикла."""
+
+    def __init__(self, opt: _LoopOptimizer, written: Set[str], calls: bool,
+                 iv: Optional[Tuple[str, Node, int]]) -> None:
+        self.opt = opt
+        self.written = written
+        self.calls = calls
+        self.iv = iv
+        self.temps: List[Decl] = []
+        self.by_hash: Dict[bytes, str] = {}
+        self.reduced: List[Tuple[str, Node]] = []     # (имя, приращение)
+        self.reduced_by_hash: Dict[bytes, str] = {}
+        self.hoisted = 0
+        self.replaced = 0
+        self.info: Dict[int, _Info] = {}
+
+    def var_info(self, node: Ident) -> _Info:
+        if node.name in self.written:
+            return _VARIANT
+        var = self.opt.vars.lookup(node.name)
+        if var is None or var.kind is None or (self.calls and not var.local):
+            return _VARIANT
+        return _Info(True, var.kind, True)
+
+    def node_info(self, node: Node) -> _Info:
+        cls = type(node)
+        if cls is Literal:
+            value = node.value
+            kind = "bool" if isinstance(value, bool) else "int" if isinstance(value, int) \
+                else "real" if isinstance(value, float) else None
+            return _Info(kind is not None, kind, False)
+        if cls is Ident:
+            return self.var_info(node)
+        if cls is UnOp:
+            a = self.info[id(node.expr)]
+            if not a.invariant:
+                return _VARIANT
+            if node.op is OpKind.NOT:
+                return _Info(a.kind == "bool", "bool", a.has_var)
+            return _Info(a.kind in ("int", "real"), a.kind, a.has_var)
+        if cls is BinOp:
+            a, b = self.info[id(node.left)], self.info[id(node.right)]
+            if not (a.invariant and b.invariant):
+                return _VARIANT
+            has_var = a.has_var or b.has_var
+            if node.op in _LOGIC:
+                return _Info(a.kind == b.kind == "bool", "bool", has_var)
+            if node.op in (OpKind.EQ, OpKind.NEQ):
+                return _Info(a.kind is not None and b.kind is not None, "bool", has_var)
+            numeric = a.kind in ("int", "real") and b.kind in ("int", "real")
+            if node.op is OpKind.DIV and not (type(node.right) is Literal and node.right.value != 0):
+                return _VARIANT
+            if node.op in _ARITH:
+                return _Info(numeric, "real" if "real" in (a.kind, b.kind) else "int", has_var)
+            return _Info(numeric, "bool", has_var)
+        return _VARIANT
+
+    def hoistable(self, node: Node) -> bool:
+        info = self.info[id(node)]
+        return info.invariant and info.has_var and type(node) in (BinOp, UnOp)
+
+    def hoist(self, node: Node) -> Ident:
+        key = node.struct_hash()
+        name = self.by_hash.get(key)
+        if name is None:
+            name = self.by_hash[key] = self.opt.fresh("_inv")
+            kind = self.info[id(node)].kind
+            self.temps.append(Decl(type_spec=BaseType(kind=_TYPE_KINDS[kind]), name=name, init=node))
+            self.hoisted += 1
+        return Ident(name=name)
+
+    def operand(self, node: Node) -> Node:
+        """Инвариант как операнд нового выражения: временная или сам узел (переменная, литерал)."""
+        return self.hoist(node) if self.hoistable(node) else node
+
+    def reduce(self, node: BinOp) -> Optional[Ident]:
+        """i * k -> _ivN; None, если это не умножение индуктивной переменной на инвариант."""
+        if self.iv is None or node.op is not OpKind.MUL:
+            return None
+        name, start, by = self.iv
+        if type(node.left) is Ident and node.left.name == name:
+            factor = node.right
+        elif type(node.right) is Ident and node.right.name == name:
+            factor = node.left
+        else:
+            return None
+        info = self.info[id(factor)]
+        if not info.invariant or info.kind != "int" or (type(factor) is Literal and factor.value == 0):
+            return None
+        key = factor.struct_hash()
+        temp = self.reduced_by_hash.get(key)
+        if temp is None:
+            k = self.operand(factor)
+            temp = self.reduced_by_hash[key] = self.opt.fresh("_iv")
+            # начальное значение i остаётся и в init цикла: копия, чтобы id в дереве не повторялись
+            if type(start) is Literal and (type(k) is Literal or start.value == 0):
+                first: Node = Literal(value=start.value * k.value if start.value else 0)
+            else:
+                first = BinOp(op=OpKind.MUL, left=unshare(start), right=k)
+            self.temps.append(Decl(type_spec=BaseType(kind=TypeKind.INT), name=temp, init=first))
+            if type(k) is Literal:
+                amount: Node = Literal(value=by * k.value)
+            elif by == 1:
+                amount = unshare(k)
+            else:
+                step = self.opt.fresh("_inv")
+                self.temps.append(Decl(type_spec=BaseType(kind=TypeKind.INT), name=step,
+                                       init=BinOp(op=OpKind.MUL, left=Literal(value=by), right=unshare(k))))
+                amount = Ident(name=step)
+            self.reduced.append((temp, amount))
+        self.replaced += 1
+        return Ident(name=temp)
+
+    def rewrite(self, root: Node) -> Node:
+        out: Dict[int, Node] = {}
+        stack: List[Tuple[Node, bool]] = [(root, False)]
+        while stack:
+            node, ready = stack.pop()
+            if not ready:
+                stack.append((node, True))
+                # дети в порядке исходника: временные объявляются в том же порядке
+                stack.extend((c, False) for c in reversed(list(node.children())))
+                continue
+            self.info[id(node)] = info = self.node_info(node)
+            if info.invariant:
+                out[id(node)] = node        # целиком уйдёт во временную (или останется как есть)
+                continue
+            if type(node) is BinOp:
+                reduced = self.reduce(node)
+                if reduced is not None:
+                    out[id(node)] = _same_id(reduced, node)
+                    continue
+            changes: Dict[str, object] = {}
+            for name in _field_names(type(node)):
+                value = getattr(node, name)
+                if isinstance(value, Node):
+                    new = self.child(value, out)
+                    if new is not value:
+                        changes[name] = new
+                elif isinstance(value, list) and value and isinstance(value[0], Node):
+                    items = [self.child(v, out) for v in value]
+                    if any(new is not old for new, old in zip(items, value)):
+                        changes[name] = items
+            out[id(node)] = _rebuild(node, changes) if changes else node
+        return self.child(root, out)
+
+    def child(self, node: Node, out: Dict[int, Node]) -> Node:
+        if self.hoistable(node):
+            # выражение со своим id уходит во временную, здесь остаётся новое имя
+            self.replaced += 1
+            return self.hoist(node)
+        return out[id(node)]
+
+
+def _same_id(new: Node, old: Node) -> Node:
+    new.id = old.id
+    return new
+
+
+def _int_literal(node: Node) -> bool:
+    return type(node) is Literal and type(node.value) is int and node.value != 0
@@ -7,6 +7,34 @@ from .ast import (
     EnumDecl, StructDecl, FieldDecl
 )
 from .errors import ParseError
+from .hashcons import InternTable, unshare
+
+# остальное грузится при первом обращении (PEP 562): CLI, которому нужен
+# только разбор, не платит за json, struct, decimal, re и asyncio
+_LAZY = {
+    "diff": "astdiff", "AstDiff": "astdiff", "Change": "astdiff",
+    "AstIndex": "query",
+    "dump_json": "json_io", "dump_ndjson": "json_io", "from_json": "json_io",
+    "load_binary": "binary", "loads_binary": "binary", "dumps_binary": "binary", "BinaryFormatError": "binary",
+    "format_program": "formatter", "format_source": "formatter", "check_source": "formatter",
+    "parse_source": "aio", "parse_path": "aio", "parse_many": "aio", "ParseResult": "aio",
+    "Profile": "profile", "ProfilingParser": "profile",
+}
+
+
+def __getattr__(name):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+    value = getattr(import_module(f"{__name__}.{module}"), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
+
 
 __all__ = [
     "parse", "Parser",
@@ -16,4 +44,12 @@ __all__ = [
     "TypeSpec", "BaseType", "ArrayType", "NamedStructType", "Param",
     "EnumDecl", "StructDecl", "FieldDecl",
     "ParseError",
+    "InternTable", "unshare",
+    "diff", "AstDiff", "Change",
+    "AstIndex",
+    "dump_json", "dump_ndjson", "from_json",
+    "load_binary", "loads_binary", "dumps_binary", "BinaryFormatError",
+    "format_program", "format_source", "check_source",
+    "parse_source", "parse_path", "parse_many", "ParseResult",
+    "Profile", "ProfilingParser",
 ]
@@ -0,0 +1,153 @@
+"""
+asyncio front end for the lexer and parser.
+
+    program = await parse_source(src)
+    program = await parse_path("a.txt", timeout=5)
+    async for result in parse_many(paths, concurrency=16):
+        if result.ok: ...
+
+Lexing and parsing never run on the event loop.  Files are read in the
+loop's default executor, and the CPU work goes to `executor`:
+
+  None or a ThreadPoolExecutor   the parse runs in a worker thread.  The
+                                 loop stays responsive, but threads share
+                                 the GIL, so parses do not overlap.
+  ProcessPoolExecutor            the parse runs in a worker process and the
+                                 tree comes back in the binary AST format
+                                 (parser/binary.py); it is decoded in a
+                                 thread, not on the loop.
+
+As with the CLI, node ids in every result are numbered from 1.
+
+`timeout` bounds reading plus parsing of one source.  Cancelling a call (or
+hitting the timeout) stops waiting at once, and a job that has not started
+is dropped from the executor queue.  A parse that is already running in a
+thread or process still finishes in the background: Python cannot interrupt
+it.  `parse_many` keeps at most `concurrency` sources in flight and yields
+results in completion order.  Closing the generator early (`aclose()`, or
+cancelling the consumer) cancels the sources that are still in flight.
+"""
+from __future__ import annotations
+import asyncio
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import AsyncIterator, Iterable, Optional
+
+from lexer import Lexer
+from parser.ast import Program, _reset_ids
+from parser.parser import Parser
+
+DEFAULT_CONCURRENCY = 8
+
+# счётчик id общий для процесса: разборы в потоках не должны перемешивать нумерацию
+_ID_LOCK = threading.Lock()
+
+
+@dataclass
+class ParseResult:
+    path: str
+    program: Optional[Program] = None
+    # LexError, ParseError, OSError/UnicodeDecodeError при чтении, asyncio.TimeoutError
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _parse_text(src: str) -> Program:
+    with _ID_LOCK:
+        _reset_ids()
+        return Parser(Lexer(src).scan_all()).parse()
+
+
+def _parse_to_binary(src: str) -> bytes:
+    """Выполняется в рабочем процессе: дерево обратно идёт компактными байтами."""
+    from parser.binary import dumps_binary
+    _reset_ids()
+    return dumps_binary(Parser(Lexer(src).scan_all()).parse())
+
+
+def _load_binary(data: bytes) -> Program:
+    from parser.binary import loads_binary
+    with _ID_LOCK:
+        return loads_binary(data)
+
+
+def _read_text(path: str, encoding: str) -> str:
+    with open(path, "r", encoding=encoding) as f:
+        return f.read()
+
+
+async def _parse(src: str, executor: Optional[Executor]) -> Program:
+    loop = asyncio.get_running_loop()
+    if isinstance(executor, ProcessPoolExecutor):
+        data = await loop.run_in_executor(executor, _parse_to_binary, src)
+        return await loop.run_in_executor(None, _load_binary, data)
+    return await loop.run_in_executor(executor, _parse_text, src)
+
+
+async def _parse_file(path: str, executor: Optional[Executor], encoding: str) -> Program:
+    loop = asyncio.get_running_loop()
+    src = await loop.run_in_executor(None, _read_text, path, encoding)
+    return await _parse(src, executor)
+
+
+async def parse_source(src: str, executor: Optional[Executor] = None,
+                       timeout: Optional[float] = None) -> Program:
+    """Разбор строки; LexError/ParseError и asyncio.TimeoutError поднимаются как есть."""
+    return await asyncio.wait_for(_parse(src, executor), timeout)
+
+
+async def parse_path(path: str, executor: Optional[Executor] = None, timeout: Optional[float] = None,
+                     encoding: str = "utf-8") -> Program:
+    """Чтение и разбор файла; ошибки чтения — OSError/UnicodeDecodeError."""
+    return await asyncio.wait_for(_parse_file(path, executor, encoding), timeout)
+
+
+async def _result(path: str, executor: Optional[Executor], timeout: Optional[float],
+                  encoding: str) -> ParseResult:
+    try:
+        program = await parse_path(path, executor, timeout, encoding)
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        return ParseResult(path, error=e)
+    return ParseResult(path, program)
+
+
+async def parse_many(paths: Iterable[str], concurrency: int = DEFAULT_CONCURRENCY,
+                     executor: Optional[Executor] = None, timeout: Optional[float] = None,
+                     encoding: str = "utf-8") -> AsyncIterator[ParseResult]:
+    """Результаты по мере готовности; ошибки отдельных файлов — в ParseResult.error."""
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    pending = iter(paths)
+    # очередь не длиннее concurrency: медленный потребитель притормаживает разбор
+    queue: "asyncio.Queue" = asyncio.Queue(maxsize=concurrency)
+    done = object()
+
+    async def worker() -> None:
+        try:
+            for path in pending:      # итератор общий: каждый путь берёт ровно один worker
+                await queue.put(await _result(path, executor, timeout, encoding))
+        except Exception as e:        # упал сам итератор путей — отдаём потребителю
+            await queue.put(e)
+        await queue.put(done)
+
+    workers = [asyncio.ensure_future(worker()) for _ in range(concurrency)]
+    running = len(workers)
+    try:
+        while running:
+            item = await queue.get()
+            if item is done:
+                running -= 1
+                continue
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        for w in workers:
+            w.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
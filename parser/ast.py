@@ -1,6 +1,7 @@
 from __future__ import annotations
-from dataclasses import dataclass, field
-from typing import Any, List, Dict, Optional
+import io
+from dataclasses import dataclass, field, fields
+from typing import Any, BinaryIO, List, Dict, Iterator, Optional, TextIO, Tuple
 from enum import Enum, auto
 
 # === Выражения (из Этапа 3) ===
@@ -29,13 +30,135 @@ def _next_id() -> int:
     _id_counter += 1
     return _id_counter
 
+def _reserve_ids(last_id: int) -> None:
+    """Сдвигает счётчик за уже занятые id (после загрузки сохранённого дерева)."""
+    global _id_counter
+    if _id_counter < last_id:
+        _id_counter = last_id
+
+def _reset_ids() -> None:
+    """Нумерация id снова с 1: для пакетной обработки, где каждый файл — отдельное дерево."""
+    global _id_counter
+    _id_counter = 0
+
+# имена полей класса без id, в порядке объявления (кэш, чтобы не звать fields() на каждом узле)
+_FIELD_NAMES: Dict[type, Tuple[str, ...]] = {}
+def _field_names(cls: type) -> Tuple[str, ...]:
+    names = _FIELD_NAMES.get(cls)
+    if names is None:
+        names = tuple(f.name for f in fields(cls) if f.name != "id")
+        _FIELD_NAMES[cls] = names
+    return names
+
+def _type_str(type_spec: Optional[Node]) -> str:
+    return type_spec.pretty(0).strip() if type_spec else "UNKNOWN"
+
+def _json_value(value: Any) -> Any:
+    if isinstance(value, Node):
+        return value.to_json()
+    if isinstance(value, list):
+        return [_json_value(v) for v in value]
+    return value
+
+def _hash_scalar(h: Any, value: Any) -> None:
+    data = f"{type(value).__name__}:{value!r}".encode("utf-8")
+    h.update(len(data).to_bytes(4, "little"))
+    h.update(data)
+
 @dataclass
 class Node:
     id: int = field(default_factory=_next_id, init=False)
+    def json_items(self) -> List[Tuple[str, Any]]:
+        """Пары (ключ, значение) JSON-представления в порядке вывода;
+        значения — скаляры, узлы или списки (узлов/строк)."""
+        raise NotImplementedError
     def to_json(self) -> Dict[str, Any]:
+        return {k: _json_value(v) for k, v in self.json_items()}
+    def pretty_label(self) -> str:
+        """Текст строки узла в pretty() (без отступа и перевода строки)."""
         raise NotImplementedError
+    def pretty_children(self) -> List[Node]:
+        """Узлы, печатаемые под этим узлом с отступом +1."""
+        return []
     def pretty(self, indent: int = 0) -> str:
-        raise NotImplementedError
+        buf = io.StringIO()
+        self.write_pretty(buf, indent)
+        return buf.getvalue()
+    def write_pretty(self, out: TextIO, indent: int = 0) -> None:
+        """Печатает дерево в поток за один обход, без рекурсии и без
+        склеивания строк поддеревьев (линейно по размеру вывода)."""
+        chunk: List[str] = []
+        size = 0
+        stack = [(self, indent)]
+        while stack:
+            node, level = stack.pop()
+            line = "  " * level + node.pretty_label() + "\n"
+            chunk.append(line)
+            size += len(line)
+            if size >= 65536:
+                out.write("".join(chunk))
+                chunk.clear()
+                size = 0
+            kids = node.pretty_children()
+            for k in range(len(kids) - 1, -1, -1):
+                stack.append((kids[k], level + 1))
+        out.write("".join(chunk))
+
+    def children(self) -> Iterator[Node]:
+        """Дочерние узлы в порядке объявления полей (списки разворачиваются)."""
+        for name in _field_names(type(self)):
+            value = getattr(self, name)
+            if isinstance(value, Node):
+                yield value
+            elif isinstance(value, list):
+                for v in value:
+                    if isinstance(v, Node):
+                        yield v
+
+    def struct_hash(self) -> bytes:
+        """Merkle hash of the subtree: class, scalar fields and children's
+        hashes, ignoring `id`. Computed lazily and cached on each node, so
+        trees must not be mutated in place after hashing."""
+        h = self.__dict__.get("_struct_hash")
+        if h is not None:
+            return h
+        # hashlib тянет OpenSSL; грузим при первом хэшировании, а не при импорте AST
+        from hashlib import blake2b
+        # обход в обратном порядке без рекурсии: длинные цепочки a+b+c+... глубокие
+        stack = [(self, False)]
+        while stack:
+            node, ready = stack.pop()
+            if "_struct_hash" in node.__dict__:
+                continue
+            if ready:
+                node._struct_hash = node._compute_struct_hash(blake2b)
+                continue
+            stack.append((node, True))
+            for c in node.children():
+                if "_struct_hash" not in c.__dict__:
+                    stack.append((c, False))
+        return self._struct_hash
+
+    def _compute_struct_hash(self, blake2b: Any) -> bytes:
+        h = blake2b(type(self).__name__.encode("ascii"), digest_size=16)
+        for name in _field_names(type(self)):
+            value = getattr(self, name)
+            if isinstance(value, Node):
+                h.update(b"N")
+                h.update(value._struct_hash)
+            elif isinstance(value, list):
+                h.update(b"L" + len(value).to_bytes(4, "little"))
+                for v in value:
+                    if isinstance(v, Node):
+                        h.update(b"N")
+                        h.update(v._struct_hash)
+                    else:
+                        _hash_scalar(h, v)
+            elif isinstance(value, Enum):
+                _hash_scalar(h, value.name)
+            else:
+                _hash_scalar(h, value)
+        return h.digest()
 
 # --- Exprs ---
 class Expr(Node):
@@ -46,75 +169,72 @@ class BinOp(Expr):
     op: OpKind = OpKind.ADD
     left: Expr = None
     right: Expr = None
-    def to_json(self) -> Dict[str, Any]:
-        return {"type": "BinOp", "id": self.id, "op": self.op.name,
-                "left": self.left.to_json(), "right": self.right.to_json()}
-    def pretty(self, indent: int = 0) -> str:
-        pad = "  " * indent
-        return f"{pad}BinOp#{self.id}({self.op.name})\n" + \
-               self.left.pretty(indent + 1) + self.right.pretty(indent + 1)
+    def json_items(self) -> List[Tuple[str, Any]]:
+        return [("type", "BinOp"), ("id", self.id), ("op", self.op.name), ("left", self.left), ("right", self.right)]
+    def pretty_label(self) -> str:
+        return f"BinOp#{self.id}({self.op.name})"
+    def pretty_children(self) -> List[Node]:
+        return [self.left, self.right]
 
 @dataclass
 class UnOp(Expr):
     op: OpKind = OpKind.NEG
     expr: Expr = None
-    def to_json(self) -> Dict[str, Any]:
-        return {"type": "UnOp", "id": self.id, "op": self.op.name,
-                "expr": self.expr.to_json()}
-    def pretty(self, indent: int = 0) -> str:
-        pad = "  " * indent
-        return f"{pad}UnOp#{self.id}({self.op.name})\n" + self.expr.pretty(indent + 1)
+    def json_items(self) -> List[Tuple[str, Any]]:
+        return [("type", "UnOp"), ("id", self.id), ("op", self.op.name), ("expr", self.expr)]
+    def pretty_label(self) -> str:
+        return f"UnOp#{self.id}({self.op.name})"
+    def pretty_children(self) -> List[Node]:
+        return [self.expr]
 
 @dataclass
 class Literal(Expr):
     value: Any = None
-    def to_json(self) -> Dict[str, Any]:
-        return {"type": "Literal", "id": self.id, "value": self.value}
-    def pretty(self, indent: int = 0) -> str:
-        pad = "  " * indent
-        return f"{pad}Literal#{self.id}({self.value!r})\n"
+    def json_items(self) -> List[Tuple[str, Any]]:
+        return [("type", "Literal"), ("id", self.id), ("value", self.value)]
+    def pretty_label(self) -> str:
+        return f"Literal#{self.id}({self.value!r})"
 
 @dataclass
 class Ident(Expr):
     name: str = ""
-    def to_json(self) -> Dict[str, Any]:
-        return {"type": "Ident", "id": self.id, "name": self.name}
-    def pretty(self, indent: int = 0) -> str:
-        pad = "  " * indent
-        return f"{pad}Ident#{self.id}({self.name})\n"
+    def json_items(self) -> List[Tuple[str, Any]]:
+        return [("type", "Ident"), ("id", self.id), ("name", self.name)]
+    def pretty_label(self) -> str:
+        return f"Ident#{self.id}({self.name})"
 
 @dataclass
 class IndexExpr(Expr):
     base: Expr = None
     index: Expr = None
-    def to_json(self) -> Dict[str, Any]:
-        return {"type": "IndexExpr", "id": self.id, "base": self.base.to_json(), "index": self.index.to_json()}
-    def pretty(self, indent: int = 0) -> str:
-        pad = "  " * indent
-        return f"{pad}IndexExpr#{self.id}\n" + self.base.pretty(indent + 1) + self.index.pretty(indent + 1)
+    def json_items(self) -> List[Tuple[str, Any]]:
+        return [("type", "IndexExpr"), ("id", self.id), ("base", self.base), ("index", self.index)]
+    def pretty_label(self) -> str:
+        return f"IndexExpr#{self.id}"
+    def pretty_children(self) -> List[Node]:
+        return [self.base, self.index]
 
 @dataclass
 class CallExpr(Expr):
     callee: str = ""
     args: List[Expr] = field(default_factory=list)
-    def to_json(self) -> Dict[str, Any]:
-        return {"type": "CallExpr", "id": self.id, "callee": self.callee, "args": [a.to_json() for a in self.args]}
-    def pretty(self, indent: int = 0) -> str:
-        pad = "  " * indent
-        s = f"{pad}CallExpr#{self.id}({self.callee})\n"
-        for a in self.args:
-            s += a.pretty(indent + 1)
-        return s
+    def json_items(self) -> List[Tuple[str, Any]]:
+        return [("type", "CallExpr"), ("id", self.id), ("callee", self.callee), ("args", self.args)]
+    def pretty_label(self) -> str:
+        return f"CallExpr#{self.id}({self.callee})"
+    def pretty_children(self) -> List[Node]:
+        return self.args
 
 @dataclass
 class FieldAccessExpr(Expr):
     base: Expr = None
     field: str = ""
-    def to_json(self) -> Dict[str, Any]:
-        return {"type": "FieldAccessExpr", "id": self.id, "base": self.base.to_json(), "field": self.field}
-    def pretty(self, indent: int = 0) -> str:
-        pad = "  " * indent
-        return f"{pad}FieldAccessExpr#{self.id}({self.field})\n" + self.base.pretty(indent + 1)
+    def json_items(self) -> List[Tuple[str, Any]]:
+        return [("type", "FieldAccessExpr"), ("id", self.id), ("base", self.base), ("field", self.field)]
+    def pretty_label(self) -> str:
+        return f"FieldAccessExpr#{self.id}({self.field})"
+    def pretty_children(self) -> List[Node]:
+        return [self.base]
 
 # === Операторы и верхний уровень (Этап 4) ===
 
@@ -132,41 +252,38 @@ class TypeSpec(Node):
 class Param(Node):
     type_spec: TypeSpec = None
     name: str = ""
-    def to_json(self) -> Dict[str, Any]:
-        return {"type": "Param", "id": self.id, "type_spec": self.type_spec.to_json(), "name": self.name}
-    def pretty(self, indent: int = 0) -> str:
-        pad = "  " * indent
-        type_str = self.type_spec.pretty(0).strip() if self.type_spec else "UNKNOWN"
-        return f"{pad}Param#{self.id}({type_str} {self.name})\n"
+    def json_items(self) -> List[Tuple[str, Any]]:
+        return [("type", "Param"), ("id", self.id), ("type_spec", self.type_spec), ("name", self.name)]
+    def pretty_label(self) -> str:
+        return f"Param#{self.id}({_type_str(self.type_spec)} {self.name})"
 
 @dataclass
 class BaseType(TypeSpec):
     kind: TypeKind = TypeKind.INT
-    def to_json(self) -> Dict[str, Any]:
-        return {"type": "BaseType", "id": self.id, "kind": self.kind.name}
-    def pretty(self, indent: int = 0) -> str:
-        pad = "  " * indent
-        return f"{pad}BaseType#{self.id}({self.kind.name})\n"
+    def json_items(self) -> List[Tuple[str, Any]]:
+        return [("type", "BaseType"), ("id", self.id), ("kind", self.kind.name)]
+    def pretty_label(self) -> str:
+        return f"BaseType#{self.id}({self.kind.name})"
 
 @dataclass
 class ArrayType(TypeSpec):
     base: TypeSpec = None
     dims: int = 1
-    def to_json(self) -> Dict[str, Any]:
-        return {"type": "ArrayType", "id": self.id, "base": self.base.to_json(), "dims": self.dims}
-    def pretty(self, indent: int = 0) -> str:
-        pad = "  " * indent
-        return f"{pad}ArrayType#{self.id}(dims={self.dims})\n" + self.base.pretty(indent + 1)
+    def json_items(self) -> List[Tuple[str, Any]]:
+        return [("type", "ArrayType"), ("id", self.id), ("base", self.base), ("dims", self.dims)]
+    def pretty_label(self) -> str:
+        return f"ArrayType#{self.id}(dims={self.dims})"
+    def pretty_children(self) -> List[Node]:
+        return [self.base]
 
 @dataclass
 class NamedStructType(TypeSpec):
     """Nominal struct type: struct Name"""
     name: str = ""
-    def to_json(self) -> Dict[str, Any]:
-        return {"type": "NamedStructType", "id": self.id, "name": self.name}
-    def pretty(self, indent: int = 0) -> str:
-        pad = "  " * indent
-        return f"{pad}NamedStructType#{self.id}({self.name})\n"
+    def json_items(self) -> List[Tuple[str, Any]]:
+        return [("type", "NamedStructType"), ("id", self.id), ("name", self.name)]
+    def pretty_label(self) -> str:
+        return f"NamedStructType#{self.id}({self.name})"
 
 class Stmt(Node):
     pass
@@ -175,56 +292,50 @@ class Stmt(Node):
 class FieldDecl(Node):
     type_spec: TypeSpec = None
     name: str = ""
-    def to_json(self) -> Dict[str, Any]:
-        return {"type": "FieldDecl", "id": self.id, "type_spec": self.type_spec.to_json(), "name": self.name}
-    def pretty(self, indent: int = 0) -> str:
-        pad = "  " * indent
-        type_str = self.type_spec.pretty(0).strip() if self.type_spec else "UNKNOWN"
-        return f"{pad}FieldDecl#{self.id}({type_str} {self.name})\n"
+    def json_items(self) -> List[Tuple[str, Any]]:
+        return [("type", "FieldDecl"), ("id", self.id), ("type_spec", self.type_spec), ("name", self.name)]
+    def pretty_label(self) -> str:
+        return f"FieldDecl#{self.id}({_type_str(self.type_spec)} {self.name})"
 
 @dataclass
 class EnumDecl(Stmt):
     name: str = ""
     members: List[str] = field(default_factory=list)
-    def to_json(self) -> Dict[str, Any]:
-        return {"type": "EnumDecl", "id": self.id, "name": self.name, "members": self.members}
-    def pretty(self, indent: int = 0) -> str:
-        pad = "  " * indent
-        members_str = ", ".join(self.members)
-        return f"{pad}EnumDecl#{self.id}({self.name} {{ {members_str} }})\n"
+    def json_items(self) -> List[Tuple[str, Any]]:
+        return [("type", "EnumDecl"), ("id", self.id), ("name", self.name), ("members", self.members)]
+    def pretty_label(self) -> str:
+        return f"EnumDecl#{self.id}({self.name} {{ {', '.join(self.members)} }})"
 
 @dataclass
 class StructDecl(Stmt):
     name: str = ""
     fields: List[FieldDecl] = field(default_factory=list)
-    def to_json(self) -> Dict[str, Any]:
-        return {"type": "StructDecl", "id": self.id, "name": self.name, "fields": [f.to_json() for f in self.fields]}
-    def pretty(self, indent: int = 0) -> str:
-        pad = "  " * indent
-        s = f"{pad}StructDecl#{self.id}({self.name})\n"
-        for f in self.fields:
-            s += f.pretty(indent + 1)
-        return s
+    def json_items(self) -> List[Tuple[str, Any]]:
+        return [("type", "StructDecl"), ("id", self.id), ("name", self.name), ("fields", self.fields)]
+    def pretty_label(self) -> str:
+        return f"StructDecl#{self.id}({self.name})"
+    def pretty_children(self) -> List[Node]:
+        return self.fields
 
 @dataclass
 class ExprStmt(Stmt):
     expr: Expr = None
-    def to_json(self) -> Dict[str, Any]:
-        return {"type": "ExprStmt", "id": self.id, "expr": self.expr.to_json()}
-    def pretty(self, indent: int = 0) -> str:
-        pad = "  " * indent
-        return f"{pad}ExprStmt#{self.id}\n" + self.expr.pretty(indent + 1)
+    def json_items(self) -> List[Tuple[str, Any]]:
+        return [("type", "ExprStmt"), ("id", self.id), ("expr", self.expr)]
+    def pretty_label(self) -> str:
+        return f"ExprStmt#{self.id}"
+    def pretty_children(self) -> List[Node]:
+        return [self.expr]
 
 @dataclass
 class Block(Stmt):
     stmts: List[Stmt] = field(default_factory=list)
-    def to_json(self) -> Dict[str, Any]:
-        return {"type": "Block", "id": self.id, "stmts": [s.to_json() for s in self.stmts]}
-    def pretty(self, indent: int = 0) -> str:
-        pad = "  " * indent
-        s = f"{pad}Block#{self.id}\n"
-        for st in self.stmts: s += st.pretty(indent + 1)
-        return s
+    def json_items(self) -> List[Tuple[str, Any]]:
+        return [("type", "Block"), ("id", self.id), ("stmts", self.stmts)]
+    def pretty_label(self) -> str:
+        return f"Block#{self.id}"
+    def pretty_children(self) -> List[Node]:
+        return self.stmts
 
 @dataclass
 class Decl(Stmt):
@@ -244,16 +355,14 @@ class Decl(Stmt):
             if isinstance(base, BaseType):
                 return base.kind
         return TypeKind.INT  # fallback
-    def to_json(self) -> Dict[str, Any]:
-        obj = {"type": "Decl", "id": self.id, "type_spec": self.type_spec.to_json(), "name": self.name}
-        if self.init is not None: obj["init"] = self.init.to_json()
-        return obj
-    def pretty(self, indent: int = 0) -> str:
-        pad = "  " * indent
-        type_str = self.type_spec.pretty(0).strip() if self.type_spec else "UNKNOWN"
-        s = f"{pad}Decl#{self.id}({type_str} {self.name})\n"
-        if self.init: s += self.init.pretty(indent + 1)
-        return s
+    def json_items(self) -> List[Tuple[str, Any]]:
+        items = [("type", "Decl"), ("id", self.id), ("type_spec", self.type_spec), ("name", self.name)]
+        if self.init is not None: items.append(("init", self.init))
+        return items
+    def pretty_label(self) -> str:
+        return f"Decl#{self.id}({_type_str(self.type_spec)} {self.name})"
+    def pretty_children(self) -> List[Node]:
+        return [self.init] if self.init else []
 
 @dataclass
 class Assign(Stmt):
@@ -265,28 +374,30 @@ class Assign(Stmt):
         if isinstance(self.lvalue, Ident):
             return self.lvalue.name
         return ""
-    def to_json(self) -> Dict[str, Any]:
-        return {"type": "Assign", "id": self.id, "lvalue": self.lvalue.to_json(), "expr": self.expr.to_json()}
-    def pretty(self, indent: int = 0) -> str:
-        pad = "  " * indent
-        return f"{pad}Assign#{self.id}\n" + self.lvalue.pretty(indent + 1) + self.expr.pretty(indent + 1)
+    def json_items(self) -> List[Tuple[str, Any]]:
+        return [("type", "Assign"), ("id", self.id), ("lvalue", self.lvalue), ("expr", self.expr)]
+    def pretty_label(self) -> str:
+        return f"Assign#{self.id}"
+    def pretty_children(self) -> List[Node]:
+        return [self.lvalue, self.expr]
 
 @dataclass
 class If(Stmt):
     cond: Expr = None
     then_branch: Stmt = None
     else_branch: Optional[Stmt] = None
-    def to_json(self) -> Dict[str, Any]:
-        obj = {"type": "If", "id": self.id,
-               "cond": self.cond.to_json(),
-               "then": self.then_branch.to_json()}
-        if self.else_branch is not None: obj["else"] = self.else_branch.to_json()
-        return obj
-    def pretty(self, indent: int = 0) -> str:
-        pad = "  " * indent
-        s = f"{pad}If#{self.id}\n" + self.cond.pretty(indent + 1) + self.then_branch.pretty(indent + 1)
-        if self.else_branch: s += self.else_branch.pretty(indent + 1)
-        return s
+    def json_items(self) -> List[Tuple[str, Any]]:
+        items = [("type", "If"), ("id", self.id),
+                 ("cond", self.cond),
+                 ("then", self.then_branch)]
+        if self.else_branch is not None: items.append(("else", self.else_branch))
+        return items
+    def pretty_label(self) -> str:
+        return f"If#{self.id}"
+    def pretty_children(self) -> List[Node]:
+        kids = [self.cond, self.then_branch]
+        if self.else_branch: kids.append(self.else_branch)
+        return kids
 
 @dataclass
 class For(Stmt):
@@ -294,52 +405,51 @@ class For(Stmt):
     cond: Optional[Expr] = None
     step: Optional[Assign] = None
     body: Stmt = None
-    def to_json(self) -> Dict[str, Any]:
-        obj = {"type": "For", "id": self.id,
-               "init": self.init.to_json(),
-               "body": self.body.to_json()}
-        if self.cond is not None: obj["cond"] = self.cond.to_json()
-        if self.step is not None: obj["step"] = self.step.to_json()
-        return obj
-    def pretty(self, indent: int = 0) -> str:
-        pad = "  " * indent
-        s = f"{pad}For#{self.id}\n"
-        s += self.init.pretty(indent + 1)
-        if self.cond: s += self.cond.pretty(indent + 1)
-        if self.step: s += self.step.pretty(indent + 1)
-        s += self.body.pretty(indent + 1)
-        return s
+    def json_items(self) -> List[Tuple[str, Any]]:
+        items = [("type", "For"), ("id", self.id),
+                 ("init", self.init),
+                 ("body", self.body)]
+        if self.cond is not None: items.append(("cond", self.cond))
+        if self.step is not None: items.append(("step", self.step))
+        return items
+    def pretty_label(self) -> str:
+        return f"For#{self.id}"
+    def pretty_children(self) -> List[Node]:
+        kids = [self.init]
+        if self.cond: kids.append(self.cond)
+        if self.step: kids.append(self.step)
+        kids.append(self.body)
+        return kids
 
 @dataclass
 class PrintStmt(Stmt):
     expr: Expr = None
-    def to_json(self) -> Dict[str, Any]:
-        return {"type": "Print", "id": self.id, "expr": self.expr.to_json()}
-    def pretty(self, indent: int = 0) -> str:
-        pad = "  " * indent
-        return f"{pad}Print#{self.id}\n" + self.expr.pretty(indent + 1)
+    def json_items(self) -> List[Tuple[str, Any]]:
+        return [("type", "Print"), ("id", self.id), ("expr", self.expr)]
+    def pretty_label(self) -> str:
+        return f"Print#{self.id}"
+    def pretty_children(self) -> List[Node]:
+        return [self.expr]
 
 @dataclass
 class ReadStmt(Stmt):
     name: str = ""
-    def to_json(self) -> Dict[str, Any]:
-        return {"type": "Read", "id": self.id, "name": self.name}
-    def pretty(self, indent: int = 0) -> str:
-        pad = "  " * indent
-        return f"{pad}Read#{self.id}({self.name})\n"
+    def json_items(self) -> List[Tuple[str, Any]]:
+        return [("type", "Read"), ("id", self.id), ("name", self.name)]
+    def pretty_label(self) -> str:
+        return f"Read#{self.id}({self.name})"
 
 @dataclass
 class Return(Stmt):
     expr: Optional[Expr] = None
-    def to_json(self) -> Dict[str, Any]:
-        obj = {"type": "Return", "id": self.id}
-        if self.expr is not None: obj["expr"] = self.expr.to_json()
-        return obj
-    def pretty(self, indent: int = 0) -> str:
-        pad = "  " * indent
-        s = f"{pad}Return#{self.id}\n"
-        if self.expr: s += self.expr.pretty(indent + 1)
-        return s
+    def json_items(self) -> List[Tuple[str, Any]]:
+        items = [("type", "Return"), ("id", self.id)]
+        if self.expr is not None: items.append(("expr", self.expr))
+        return items
+    def pretty_label(self) -> str:
+        return f"Return#{self.id}"
+    def pretty_children(self) -> List[Node]:
+        return [self.expr] if self.expr else []
 
 @dataclass
 class FuncDef(Stmt):
@@ -349,50 +459,55 @@ class FuncDef(Stmt):
     ret_type: Optional[TypeSpec] = None    # только если is_proc == False
     body: Block = None
     params: List[Param] = field(default_factory=list)  # типизированные параметры
-    def to_json(self) -> Dict[str, Any]:
-        obj = {"type": "FuncDef", "id": self.id, "name": self.name,
-               "kind": "proc" if self.is_proc else "func",
-               "params": [p.to_json() for p in self.params],
-               "body": self.body.to_json()}
+    def json_items(self) -> List[Tuple[str, Any]]:
+        items = [("type", "FuncDef"), ("id", self.id), ("name", self.name),
+                 ("kind", "proc" if self.is_proc else "func"),
+                 ("params", self.params),
+                 ("body", self.body)]
         if not self.is_proc and self.ret_type is not None:
-            obj["ret_type"] = self.ret_type.to_json()
-        return obj
-    def pretty(self, indent: int = 0) -> str:
-        pad = "  " * indent
+            items.append(("ret_type", self.ret_type))
+        return items
+    def pretty_label(self) -> str:
         if self.is_proc:
             kind = "proc"
         else:
-            type_str = self.ret_type.pretty(0).strip() if self.ret_type else "UNKNOWN"
-            kind = f"func:{type_str}"
-        s = f"{pad}FuncDef#{self.id}({kind} {self.name})\n"
-        for p in self.params:
-            s += p.pretty(indent + 1)
-        s += self.body.pretty(indent + 1)
-        return s
+            kind = f"func:{_type_str(self.ret_type)}"
+        return f"FuncDef#{self.id}({kind} {self.name})"
+    def pretty_children(self) -> List[Node]:
+        return self.params + [self.body]
 
 # example log(x); → CallStmt("log", [Ident("x")])
 @dataclass
 class CallStmt(Stmt):
     name: str = ""
     args: List[Expr] = field(default_factory=list)
-    def to_json(self) -> Dict[str, Any]:
-        return {"type": "CallStmt", "id": self.id, "name": self.name,
-                "args": [a.to_json() for a in self.args]}
-    def pretty(self, indent: int = 0) -> str:
-        pad = "  " * indent
-        s = f"{pad}CallStmt#{self.id}({self.name})\n"
-        for a in self.args: s += a.pretty(indent + 1)
-        return s
+    def json_items(self) -> List[Tuple[str, Any]]:
+        return [("type", "CallStmt"), ("id", self.id), ("name", self.name), ("args", self.args)]
+    def pretty_label(self) -> str:
+        return f"CallStmt#{self.id}({self.name})"
+    def pretty_children(self) -> List[Node]:
+        return self.args
 
 # Верхний уровень
 
 @dataclass
 class Program(Node):
     stmts: List[Stmt] = field(default_factory=list)
-    def to_json(self) -> Dict[str, Any]:
-        return {"type": "Program", "id": self.id, "stmts": [s.to_json() for s in self.stmts]}
-    def pretty(self, indent: int = 0) -> str:
-        pad = "  " * indent
-        s = f"{pad}Program#{self.id}\n"
-        for st in self.stmts: s += st.pretty(indent + 1)
-        return s
+    def json_items(self) -> List[Tuple[str, Any]]:
+        return [("type", "Program"), ("id", self.id), ("stmts", self.stmts)]
+    def pretty_label(self) -> str:
+        return f"Program#{self.id}"
+    def pretty_children(self) -> List[Node]:
+        return self.stmts
+    def index(self, refresh: bool = False) -> "AstIndex":
+        """Индекс узлов по классам с родителями (строится один раз и кэшируется).
+        После изменения дерева вызовите index(refresh=True)."""
+        idx = self.__dict__.get("_index")
+        if idx is None or refresh:
+            from parser.query import AstIndex
+            idx = self._index = AstIndex(self)
+        return idx
+    def dump_binary(self, fp: BinaryIO) -> None:
+        """Пишет программу в компактном бинарном формате (см. parser.binary)."""
+        from parser.binary import dump_binary
+        dump_binary(self, fp)
@@ -0,0 +1,190 @@
+"""
+Structural AST diff built on `Node.struct_hash()`.
+
+`diff(old, new)` walks both trees top-down and skips every pair of
+subtrees whose Merkle hashes match, so (once hashes are cached) the work
+is proportional to the changed paths and their sibling lists rather than
+to the whole program.  Node ids are ignored: two parses of the same text
+produce an empty diff.
+
+Reported changes:
+  inserted — node present only in `new`
+  deleted  — node present only in `old`
+  moved    — identical subtree found at a different position
+  changed  — same class at the same position, but scalar fields differ
+             (operator, name, literal value, ...)
+"""
+from __future__ import annotations
+import bisect
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from parser.ast import Node, _field_names
+
+
+@dataclass
+class Change:
+    kind: str                 # "inserted" | "deleted" | "moved" | "changed"
+    old: Optional[Node]
+    new: Optional[Node]
+    old_path: str = ""
+    new_path: str = ""
+
+    def __str__(self) -> str:
+        if self.kind == "inserted":
+            return f"inserted {type(self.new).__name__} at {self.new_path}"
+        if self.kind == "deleted":
+            return f"deleted {type(self.old).__name__} at {self.old_path}"
+        if self.kind == "moved":
+            return f"moved {type(self.old).__name__} {self.old_path} -> {self.new_path}"
+        return f"changed {type(self.old).__name__} at {self.new_path}"
+
+
+@dataclass
+class AstDiff:
+    inserted: List[Change] = field(default_factory=list)
+    deleted: List[Change] = field(default_factory=list)
+    moved: List[Change] = field(default_factory=list)
+    changed: List[Change] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.inserted or self.deleted or self.moved or self.changed)
+
+    def changes(self) -> List[Change]:
+        return self.changed + self.moved + self.deleted + self.inserted
+
+
+def _is_node_list(value: object) -> bool:
+    return isinstance(value, list) and bool(value) and isinstance(value[0], Node)
+
+
+def _lis_positions(seq: List[int]) -> set:
+    """Позиции элементов, входящих в наибольшую возрастающую подпоследовательность."""
+    tails: List[int] = []
+    tails_pos: List[int] = []
+    prev = [-1] * len(seq)
+    for pos, v in enumerate(seq):
+        k = bisect.bisect_left(tails, v)
+        if k == len(tails):
+            tails.append(v)
+            tails_pos.append(pos)
+        else:
+            tails[k] = v
+            tails_pos[k] = pos
+        prev[pos] = tails_pos[k - 1] if k > 0 else -1
+    keep = set()
+    pos = tails_pos[-1] if tails_pos else -1
+    while pos != -1:
+        keep.add(pos)
+        pos = prev[pos]
+    return keep
+
+
+class _Differ:
+    def __init__(self) -> None:
+        self.result = AstDiff()
+
+    def node(self, old: Node, new: Node, old_path: str, new_path: str) -> None:
+        if old is new or old.struct_hash() == new.struct_hash():
+            return
+        if type(old) is not type(new):
+            self.result.deleted.append(Change("deleted", old, None, old_path=old_path))
+            self.result.inserted.append(Change("inserted", None, new, new_path=new_path))
+            return
+        changed = False
+        nested = []
+        for name in _field_names(type(old)):
+            ov, nv = getattr(old, name), getattr(new, name)
+            if isinstance(ov, Node) or isinstance(nv, Node) or _is_node_list(ov) or _is_node_list(nv):
+                nested.append((name, ov, nv))
+            elif type(ov) is not type(nv) or ov != nv:
+                changed = True
+        if changed:
+            self.result.changed.append(Change("changed", old, new, old_path, new_path))
+        for name, ov, nv in nested:
+            op = f"{old_path}.{name}" if old_path else name
+            np_ = f"{new_path}.{name}" if new_path else name
+            if isinstance(ov, list) or isinstance(nv, list):
+                self.seq(ov or [], nv or [], op, np_)
+            elif ov is None:
+                self.result.inserted.append(Change("inserted", None, nv, new_path=np_))
+            elif nv is None:
+                self.result.deleted.append(Change("deleted", ov, None, old_path=op))
+            else:
+                self.node(ov, nv, op, np_)
+
+    def seq(self, olds: List[Node], news: List[Node], old_path: str, new_path: str) -> None:
+        # общий префикс и суффикс отбрасываем сразу
+        lo = 0
+        while lo < len(olds) and lo < len(news) and olds[lo].struct_hash() == news[lo].struct_hash():
+            lo += 1
+        hi_o, hi_n = len(olds), len(news)
+        while hi_o > lo and hi_n > lo and olds[hi_o - 1].struct_hash() == news[hi_n - 1].struct_hash():
+            hi_o -= 1
+            hi_n -= 1
+        if lo == hi_o and lo == hi_n:
+            return
+
+        by_hash: Dict[bytes, List[int]] = {}
+        for i in range(hi_o - 1, lo - 1, -1):
+            by_hash.setdefault(olds[i].struct_hash(), []).append(i)
+
+        matched: List[Tuple[int, int]] = []      # (old index, new index)
+        unmatched_new: List[int] = []
+        for j in range(lo, hi_n):
+            cands = by_hash.get(news[j].struct_hash())
+            if cands:
+                matched.append((cands.pop(), j))
+            else:
+                unmatched_new.append(j)
+        used_old = {i for i, _ in matched}
+        unmatched_old = [i for i in range(lo, hi_o) if i not in used_old]
+
+        # совпавшие поддеревья, нарушающие относительный порядок, считаются перемещёнными
+        in_order = _lis_positions([i for i, _ in matched])
+        for pos, (i, j) in enumerate(matched):
+            if pos not in in_order:
+                self.result.moved.append(Change("moved", olds[i], news[j],
+                                                f"{old_path}[{i}]", f"{new_path}[{j}]"))
+
+        # оставшиеся пары одного класса сравниваем рекурсивно, по порядку
+        pending_old: Dict[type, List[int]] = {}
+        for i in unmatched_old:
+            pending_old.setdefault(type(olds[i]), []).append(i)
+        for j in unmatched_new:
+            queue = pending_old.get(type(news[j]))
+            if queue:
+                i = queue.pop(0)
+                self.node(olds[i], news[j], f"{old_path}[{i}]", f"{new_path}[{j}]")
+            else:
+                self.result.inserted.append(Change("inserted", None, news[j], new_path=f"{new_path}[{j}]"))
+        for queue in pending_old.values():
+            for i in queue:
+                self.result.deleted.append(Change("deleted", olds[i], None, old_path=f"{old_path}[{i}]"))
+
+    def finish(self) -> AstDiff:
+        # удалённое в одном месте и вставленное в другом одинаковое поддерево — перемещение
+        r = self.result
+        inserted_by_hash: Dict[bytes, List[Change]] = {}
+        for ch in r.inserted:
+            inserted_by_hash.setdefault(ch.new.struct_hash(), []).append(ch)
+        still_deleted: List[Change] = []
+        moved_ins = set()
+        for ch in r.deleted:
+            cands = inserted_by_hash.get(ch.old.struct_hash())
+            if cands:
+                ins = cands.pop(0)
+                moved_ins.add(id(ins))
+                r.moved.append(Change("moved", ch.old, ins.new, ch.old_path, ins.new_path))
+            else:
+                still_deleted.append(ch)
+        r.deleted = still_deleted
+        r.inserted = [ch for ch in r.inserted if id(ch) not in moved_ins]
+        return r
+
+
+def diff(old: Node, new: Node) -> AstDiff:
+    """Structural difference between two ASTs (usually two `Program`s)."""
+    d = _Differ()
+    d.node(old, new, "", "")
+    return d.finish()
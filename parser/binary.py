@@ -0,0 +1,331 @@
+"""
+Compact binary AST format (version 1).
+
+Layout (all integers are unsigned LEB128 varints unless noted):
+
+    magic      b"MLAST"
+    version    1 byte
+    strings    count, then (byte length, UTF-8 bytes) per string
+    literals   count, then per literal a tag byte and a payload:
+                 0 int (zigzag varint), 1 real (8-byte little-endian double),
+                 2 false, 3 true
+    nodes      post-order record stream up to the end of the data
+
+A record is a tag: 0 is an absent optional child (`None`), k >= 1 is the
+k-th class of `NODE_CLASSES`, followed by the node id and that class's
+scalar fields from `_SCHEMA`: string-table index for names, enum value
+for operators/type kinds, literal-table index for `Literal.value`, and an
+element count for each list field.  Children come before their parent, so
+the loader is a simple stack machine: it pops the children a record needs
+and pushes the new node.  Neither side recurses, so trees of any depth
+round-trip.
+
+Node classes and ids are reconstructed exactly; after loading, the global
+id counter is moved past the largest loaded id.
+"""
+from __future__ import annotations
+import struct
+from typing import Any, BinaryIO, Dict, List, Tuple
+
+from parser import ast
+from parser.ast import (
+    Node, Program, Block, Decl, Assign, If, For, FuncDef, CallStmt,
+    PrintStmt, ReadStmt, Return, ExprStmt,
+    BinOp, UnOp, Literal, Ident, IndexExpr, CallExpr, FieldAccessExpr, OpKind, TypeKind,
+    BaseType, ArrayType, NamedStructType, Param,
+    EnumDecl, StructDecl, FieldDecl
+)
+
+MAGIC = b"MLAST"
+VERSION = 1
+
+# Порядок классов и полей — часть формата: менять только вместе с VERSION.
+NODE_CLASSES = (
+    Program, Block, Decl, Assign, If, For, FuncDef, CallStmt,
+    PrintStmt, ReadStmt, Return, ExprStmt,
+    BinOp, UnOp, Literal, Ident, IndexExpr, CallExpr, FieldAccessExpr,
+    BaseType, ArrayType, NamedStructType, Param,
+    EnumDecl, StructDecl, FieldDecl,
+)
+
+# Field kinds: node (optional child), nodes (child list), str, strs (list of str),
+# op (OpKind), tkind (TypeKind), bool, uint, lit (Literal.value)
+_SCHEMA: Dict[type, Tuple[Tuple[str, str], ...]] = {
+    Program: (("stmts", "nodes"),),
+    Block: (("stmts", "nodes"),),
+    Decl: (("type_spec", "node"), ("name", "str"), ("init", "node")),
+    Assign: (("lvalue", "node"), ("expr", "node")),
+    If: (("cond", "node"), ("then_branch", "node"), ("else_branch", "node")),
+    For: (("init", "node"), ("cond", "node"), ("step", "node"), ("body", "node")),
+    FuncDef: (("name", "str"), ("is_proc", "bool"), ("ret_type", "node"), ("body", "node"), ("params", "nodes")),
+    CallStmt: (("name", "str"), ("args", "nodes")),
+    PrintStmt: (("expr", "node"),),
+    ReadStmt: (("name", "str"),),
+    Return: (("expr", "node"),),
+    ExprStmt: (("expr", "node"),),
+    BinOp: (("op", "op"), ("left", "node"), ("right", "node")),
+    UnOp: (("op", "op"), ("expr", "node")),
+    Literal: (("value", "lit"),),
+    Ident: (("name", "str"),),
+    IndexExpr: (("base", "node"), ("index", "node")),
+    CallExpr: (("callee", "str"), ("args", "nodes")),
+    FieldAccessExpr: (("base", "node"), ("field", "str")),
+    BaseType: (("kind", "tkind"),),
+    ArrayType: (("base", "node"), ("dims", "uint")),
+    NamedStructType: (("name", "str"),),
+    Param: (("type_spec", "node"), ("name", "str")),
+    EnumDecl: (("name", "str"), ("members", "strs")),
+    StructDecl: (("name", "str"), ("fields", "nodes")),
+    FieldDecl: (("type_spec", "node"), ("name", "str")),
+}
+
+_TAG = {cls: i + 1 for i, cls in enumerate(NODE_CLASSES)}
+_OPS = list(OpKind)
+_OP_INDEX = {op: i for i, op in enumerate(_OPS)}
+_TKINDS = list(TypeKind)
+_TKIND_INDEX = {k: i for i, k in enumerate(_TKINDS)}
+_DOUBLE = struct.Struct("<d")
+
+_LIT_INT, _LIT_REAL, _LIT_FALSE, _LIT_TRUE = 0, 1, 2, 3
+
+_K_NODE, _K_NODES, _K_STR, _K_STRS, _K_OP, _K_TKIND, _K_BOOL, _K_UINT, _K_LIT = range(9)
+_KIND_CODES = {"node": _K_NODE, "nodes": _K_NODES, "str": _K_STR, "strs": _K_STRS, "op": _K_OP,
+               "tkind": _K_TKIND, "bool": _K_BOOL, "uint": _K_UINT, "lit": _K_LIT}
+_PLAN = {cls: tuple((name, _KIND_CODES[kind]) for name, kind in schema) for cls, schema in _SCHEMA.items()}
+
+
+class BinaryFormatError(ValueError):
+    pass
+
+
+def _put_varint(out: bytearray, value: int) -> None:
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _zigzag(value: int) -> int:
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def _unzigzag(value: int) -> int:
+    return value >> 1 if not value & 1 else -((value + 1) >> 1)
+
+
+def _decode_varints(data: bytes, pos: int) -> List[int]:
+    raw = data[pos:]
+    if not raw or max(raw) < 0x80:
+        return list(raw)           # частый случай: все значения < 128
+    out: List[int] = []
+    result = shift = 0
+    for b in raw:
+        result |= (b & 0x7F) << shift
+        if b < 0x80:
+            out.append(result)
+            result = shift = 0
+        else:
+            shift += 7
+    if shift:
+        raise BinaryFormatError("truncated binary AST")
+    return out
+
+
+def dumps_binary(root: Node) -> bytes:
+    strings: Dict[str, int] = {}
+    literals: Dict[Tuple[type, Any], int] = {}
+    body = bytearray()
+
+    def sidx(text: str) -> int:
+        i = strings.get(text)
+        if i is None:
+            i = strings[text] = len(strings)
+        return i
+
+    # обход в обратном порядке (post-order) на явном стеке
+    stack: List[Tuple[Any, bool]] = [(root, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if node is None:
+            body.append(0)
+            continue
+        schema = _SCHEMA.get(type(node))
+        if schema is None:
+            raise BinaryFormatError(f"cannot encode node of type {type(node).__name__}")
+        if not expanded:
+            stack.append((node, True))
+            kids: List[Any] = []
+            for name, kind in schema:
+                if kind == "node":
+                    kids.append(getattr(node, name))
+                elif kind == "nodes":
+                    kids.extend(getattr(node, name))
+            for k in reversed(kids):
+                stack.append((k, False))
+            continue
+        _put_varint(body, _TAG[type(node)])
+        _put_varint(body, node.id)
+        for name, kind in schema:
+            if kind == "node":
+                continue
+            value = getattr(node, name)
+            if kind == "nodes":
+                _put_varint(body, len(value))
+            elif kind == "str":
+                _put_varint(body, sidx(value))
+            elif kind == "strs":
+                _put_varint(body, len(value))
+                for v in value:
+                    _put_varint(body, sidx(v))
+            elif kind == "op":
+                _put_varint(body, _OP_INDEX[value])
+            elif kind == "tkind":
+                _put_varint(body, _TKIND_INDEX[value])
+            elif kind in ("bool", "uint"):
+                _put_varint(body, int(value))
+            else:  # lit
+                key = (type(value), value)
+                i = literals.get(key)
+                if i is None:
+                    if not isinstance(value, (bool, int, float)):
+                        raise BinaryFormatError(f"cannot encode literal {value!r}")
+                    i = literals[key] = len(literals)
+                _put_varint(body, i)
+
+    out = bytearray(MAGIC)
+    out.append(VERSION)
+    _put_varint(out, len(strings))
+    for text in strings:               # dict сохраняет порядок вставки = индекс
+        data = text.encode("utf-8")
+        _put_varint(out, len(data))
+        out += data
+    _put_varint(out, len(literals))
+    for typ, value in literals:
+        if typ is bool:
+            out.append(_LIT_TRUE if value else _LIT_FALSE)
+        elif typ is int:
+            out.append(_LIT_INT)
+            _put_varint(out, _zigzag(value))
+        else:
+            out.append(_LIT_REAL)
+            out += _DOUBLE.pack(value)
+    out += body
+    return bytes(out)
+
+
+def dump_binary(root: Node, fp: BinaryIO) -> None:
+    fp.write(dumps_binary(root))
+
+
+def loads_binary(data: bytes) -> Node:
+    if data[:len(MAGIC)] != MAGIC:
+        raise BinaryFormatError("not a MiniLang binary AST (bad magic)")
+    pos = len(MAGIC)
+    if pos >= len(data) or data[pos] != VERSION:
+        raise BinaryFormatError(f"unsupported binary AST version {data[pos] if pos < len(data) else None}")
+    pos += 1
+    n = len(data)
+
+    def varint() -> int:
+        nonlocal pos
+        result = shift = 0
+        while True:
+            if pos >= n:
+                raise BinaryFormatError("truncated binary AST")
+            b = data[pos]
+            pos += 1
+            result |= (b & 0x7F) << shift
+            if b < 0x80:
+                return result
+            shift += 7
+
+    strings: List[str] = []
+    for _ in range(varint()):
+        size = varint()
+        strings.append(data[pos:pos + size].decode("utf-8"))
+        pos += size
+    literals: List[Any] = []
+    for _ in range(varint()):
+        tag = data[pos]
+        pos += 1
+        if tag == _LIT_INT:
+            literals.append(_unzigzag(varint()))
+        elif tag == _LIT_REAL:
+            literals.append(_DOUBLE.unpack_from(data, pos)[0])
+            pos += 8
+        elif tag in (_LIT_FALSE, _LIT_TRUE):
+            literals.append(tag == _LIT_TRUE)
+        else:
+            raise BinaryFormatError(f"bad literal tag {tag}")
+
+    # после таблиц тело — только varint'ы: декодируем их разом в список чисел
+    ints = _decode_varints(data, pos)
+    m = len(ints)
+    i = 0
+    values: List[Any] = []
+    max_id = 0
+    try:
+        while i < m:
+            tag = ints[i]
+            i += 1
+            if tag == 0:
+                values.append(None)
+                continue
+            cls = NODE_CLASSES[tag - 1]
+            nid = ints[i]
+            i += 1
+            if nid > max_id:
+                max_id = nid
+            attrs: Dict[str, Any] = {"id": nid}
+            child_slots = []      # (поле, число детей; -1 — одиночный)
+            n_children = 0
+            for name, kind in _PLAN[cls]:
+                if kind == _K_NODE:
+                    child_slots.append((name, -1))
+                    n_children += 1
+                    continue
+                v = ints[i]
+                i += 1
+                if kind == _K_NODES:
+                    child_slots.append((name, v))
+                    n_children += v
+                elif kind == _K_STR:
+                    attrs[name] = strings[v]
+                elif kind == _K_LIT:
+                    attrs[name] = literals[v]
+                elif kind == _K_OP:
+                    attrs[name] = _OPS[v]
+                elif kind == _K_TKIND:
+                    attrs[name] = _TKINDS[v]
+                elif kind == _K_BOOL:
+                    attrs[name] = bool(v)
+                elif kind == _K_UINT:
+                    attrs[name] = v
+                else:  # strs
+                    attrs[name] = [strings[x] for x in ints[i:i + v]]
+                    i += v
+            if n_children > len(values):
+                raise BinaryFormatError("corrupt node stream (missing children)")
+            k = len(values) - n_children
+            for name, count in child_slots:
+                if count < 0:
+                    attrs[name] = values[k]
+                    k += 1
+                else:
+                    attrs[name] = values[k:k + count]
+                    k += count
+            if n_children:
+                del values[len(values) - n_children:]
+            node = cls.__new__(cls)          # без __init__: id берём из потока
+            node.__dict__.update(attrs)
+            values.append(node)
+    except IndexError:
+        raise BinaryFormatError("corrupt binary AST (index out of range)") from None
+    if len(values) != 1 or not isinstance(values[0], Node):
+        raise BinaryFormatError("corrupt node stream (expected a single root)")
+    ast._reserve_ids(max_id)
+    return values[0]
+
+
+def load_binary(fp: BinaryIO) -> Node:
+    return loads_binary(fp.read())
@@ -0,0 +1,425 @@
+"""
+Source formatter: turns a Program back into canonical MiniLang text.
+
+    format_source(src)                 -> formatted text
+    write_formatted(src, out)          formatted text written to a stream
+    check_source(src)                  None if `src` is already formatted,
+                                       else (line, col) of the first difference
+    format_program(program, out, ...)  the AST-level entry point
+
+Canonical form: two-space indentation, one statement per line, `} else {`
+on one line, single spaces around binary operators, and only the
+parentheses that operator precedence requires.  A single blank line
+between statements is kept, longer runs are collapsed.
+
+Comments come from the lexer side table (`Lexer(src, keep_comments=True)`)
+and are placed using the statement positions recorded by
+`Parser(..., track_positions=True)`: a comment before a statement is
+written on its own line above it, a comment after the end of a statement
+on the same line stays at the end of that line.  Comments inside an
+expression move in front of the next statement (or the closing `}`).
+
+The tree is walked once with an explicit work stack and text goes to the
+stream in chunks, so nesting depth is not limited by recursion.
+In check mode the output is compared against the source while it is being
+produced and formatting stops at the first difference.
+"""
+from __future__ import annotations
+import io
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Sequence, TextIO, Tuple
+
+from lexer import Lexer
+from lexer.tokens import Comment
+from parser.ast import (
+    Node, Program, Block, Decl, Assign, If, For, FuncDef, CallStmt,
+    PrintStmt, ReadStmt, Return, ExprStmt,
+    BinOp, UnOp, Literal, Ident, IndexExpr, CallExpr, FieldAccessExpr, OpKind, TypeKind,
+    BaseType, ArrayType, NamedStructType,
+    EnumDecl, StructDecl, FieldDecl
+)
+from parser.parser import Parser
+
+Positions = Dict[int, Tuple[int, int, int, int]]
+
+_CHUNK = 1 << 16
+
+_OP_TEXT = {
+    OpKind.OR: "||", OpKind.AND: "&&", OpKind.EQ: "==", OpKind.NEQ: "!=",
+    OpKind.LT: "<", OpKind.LE: "<=", OpKind.GT: ">", OpKind.GE: ">=",
+    OpKind.ADD: "+", OpKind.SUB: "-", OpKind.MUL: "*", OpKind.DIV: "/",
+    OpKind.NEG: "-", OpKind.NOT: "!",
+}
+
+# приоритеты как в каскаде parse_or ... parse_postfix; все бинарные — левоассоциативные
+_PREC = {
+    OpKind.OR: 1, OpKind.AND: 2,
+    OpKind.EQ: 3, OpKind.NEQ: 3,
+    OpKind.LT: 4, OpKind.LE: 4, OpKind.GT: 4, OpKind.GE: 4,
+    OpKind.ADD: 5, OpKind.SUB: 5,
+    OpKind.MUL: 6, OpKind.DIV: 6,
+}
+_PREC_UNARY = 7
+_PREC_ATOM = 8
+
+_TYPE_NAMES = {TypeKind.INT: "int", TypeKind.REAL: "real", TypeKind.BOOL: "bool"}
+
+
+def _prec(e: Node) -> int:
+    if isinstance(e, BinOp):
+        return _PREC[e.op]
+    if isinstance(e, UnOp):
+        return _PREC_UNARY
+    if isinstance(e, Literal) and not isinstance(e.value, bool) and e.value < 0:
+        return _PREC_UNARY      # отрицательный литерал (после свёртки) читается как унарный минус
+    return _PREC_ATOM
+
+
+def _literal_text(value: Any) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, float):
+        if value != value or value in (float("inf"), -float("inf")):
+            raise ValueError(f"cannot format non-finite real {value!r}")
+        text = repr(value)
+        if "e" in text or "E" in text:
+            text = format(Decimal(text), "f")     # в языке нет экспоненты: только d+.d+
+        if "." not in text:
+            text += ".0"
+        return text
+    raise ValueError(f"cannot format literal {value!r}")
+
+
+def type_text(t: Node) -> str:
+    """Тип в исходном виде: `int`, `real[][]`, `struct Point`."""
+    if isinstance(t, BaseType):
+        return _TYPE_NAMES[t.kind]
+    if isinstance(t, ArrayType):
+        return type_text(t.base) + "[]" * t.dims
+    if isinstance(t, NamedStructType):
+        return f"struct {t.name}"
+    raise ValueError(f"not a type: {type(t).__name__}")
+
+
+def _dangling(stmt: Node) -> bool:
+    """True, если за `stmt` мог бы «прилипнуть» чужой else (if без else в хвосте)."""
+    while True:
+        if isinstance(stmt, If):
+            if stmt.else_branch is None:
+                return True
+            stmt = stmt.else_branch
+        elif isinstance(stmt, For):
+            stmt = stmt.body
+        else:
+            return False
+
+
+class _Formatter:
+    def __init__(self, out: TextIO, comments: Sequence[Comment], positions: Optional[Positions],
+                 indent: str) -> None:
+        self.fp = out
+        self.buf: List[str] = []
+        self.size = 0
+        self.at_bol = True
+        self.unit = indent
+        self.comments = sorted(comments, key=lambda c: c.offset)
+        self.ci = 0
+        self.positions = positions or {}
+        self.last_line = 0           # последняя строка исходника, уже попавшая в вывод
+        self.no_blank = True         # пустую строку сразу после '{' (и в начале файла) не ставим
+
+    # --- вывод ---
+
+    def w(self, text: str) -> None:
+        self.buf.append(text)
+        self.size += len(text)
+        self.at_bol = text.endswith("\n")
+        if self.size >= _CHUNK:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.buf:
+            self.fp.write("".join(self.buf))
+            self.buf.clear()
+            self.size = 0
+
+    # --- комментарии ---
+
+    def _comment_before(self, line: int, col: int) -> Optional[Comment]:
+        if self.ci < len(self.comments):
+            c = self.comments[self.ci]
+            if (c.line, c.col) < (line, col):
+                return c
+        return None
+
+    def leading(self, line: int, col: int, level: int) -> None:
+        """Комментарии перед позицией (line, col) — отдельными строками."""
+        c = self._comment_before(line, col)
+        while c is not None:
+            self.blank_before(c.line)
+            self.w(self.unit * level + c.text.rstrip() + "\n")
+            self.last_line = c.end_line
+            self.ci += 1
+            c = self._comment_before(line, col)
+
+    def trailing(self, end_line: int, limit: Optional[Tuple[int, int]] = None) -> None:
+        """Комментарии, начинающиеся на строке end_line (и до позиции limit),
+        дописываются в конец строки."""
+        while self.ci < len(self.comments) and self.comments[self.ci].line == end_line:
+            c = self.comments[self.ci]
+            if limit is not None and (c.line, c.col) >= limit:
+                break
+            self.w(" " + c.text.rstrip())
+            self.last_line = c.end_line
+            self.ci += 1
+
+    def blank_before(self, line: int) -> None:
+        if not self.no_blank and self.last_line and line > self.last_line + 1:
+            self.w("\n")
+        self.no_blank = False
+
+    # --- обход ---
+
+    def run(self, program: Program) -> None:
+        stack: List[Any] = [("rest",)]
+        for s in reversed(program.stmts):
+            stack.append(("stmt", s, 0))
+        while stack:
+            item = stack.pop()
+            if isinstance(item, str):
+                self.w(item)
+                continue
+            tag = item[0]
+            if tag == "expr":
+                stack.extend(reversed(self.expr(item[1])))
+            elif tag == "stmt":
+                _, s, level = item
+                pos = self.positions.get(s.id)
+                if pos is not None:
+                    self.leading(pos[0], pos[1], level)
+                    self.blank_before(pos[0])
+                else:
+                    self.no_blank = False
+                self.w(self.unit * level)
+                stack.append(("end", s))
+                stack.extend(reversed(self.stmt(s, level)))
+            elif tag == "end":
+                pos = self.positions.get(item[1].id)
+                if pos is not None:
+                    self.trailing(pos[2])
+                    self.last_line = max(self.last_line, pos[2])
+                if not self.at_bol:
+                    self.w("\n")
+            elif tag == "open":
+                # заголовок (или '{') выведен: переходим на новую строку к вложенным операторам
+                _, node, level = item
+                pos = self.positions.get(node.id) if node is not None else None
+                if pos is not None:
+                    nxt = self.positions.get(stack[-1][1].id) if stack[-1][0] == "stmt" else None
+                    self.trailing(pos[0], nxt[:2] if nxt is not None else None)
+                    self.last_line = max(self.last_line, pos[0])
+                self.w("\n")
+                self.no_blank = True
+            elif tag == "else":
+                self.w(self.unit * item[1] + "else" if self.at_bol else " else")
+            elif tag == "close":
+                _, node, level = item
+                pos = self.positions.get(node.id)
+                if pos is not None:
+                    self.leading(pos[2], pos[3] - 1, level + 1)
+                self.no_blank = False
+                self.w(self.unit * level + "}")
+            else:  # rest: всё, что осталось после последнего оператора
+                for c in self.comments[self.ci:]:
+                    self.blank_before(c.line)
+                    self.w(c.text.rstrip() + "\n")
+                    self.last_line = c.end_line
+                self.ci = len(self.comments)
+        self.flush()
+
+    def block(self, node: Node, stmts: List[Node], level: int) -> List[Any]:
+        pos = self.positions.get(node.id)
+        empty = not stmts and (pos is None or self._comment_before(pos[2], pos[3] - 1) is None)
+        if empty:
+            return ["{}"]
+        return ["{", ("open", node, level)] + [("stmt", s, level + 1) for s in stmts] + [("close", node, level)]
+
+    def branch(self, s: Node, level: int, force_block: bool = False) -> List[Any]:
+        if isinstance(s, Block):
+            return [" "] + self.block(s, s.stmts, level)
+        if force_block:
+            return [" {", ("open", None, level), ("stmt", s, level + 1), self.unit * level + "}"]
+        return [("open", None, level), ("stmt", s, level + 1)]
+
+    def stmt(self, s: Node, level: int) -> List[Any]:
+        if isinstance(s, Block):
+            return self.block(s, s.stmts, level)
+        if isinstance(s, Decl):
+            return self.decl(s) + [";"]
+        if isinstance(s, Assign):
+            return self.assign(s) + [";"]
+        if isinstance(s, ExprStmt):
+            return [("expr", s.expr), ";"]
+        if isinstance(s, PrintStmt):
+            return ["print(", ("expr", s.expr), ");"]
+        if isinstance(s, ReadStmt):
+            return [f"read({s.name});"]
+        if isinstance(s, Return):
+            return ["return;"] if s.expr is None else ["return ", ("expr", s.expr), ";"]
+        if isinstance(s, CallStmt):
+            return [s.name + "("] + self.args(s.args) + [");"]
+        if isinstance(s, If):
+            return self.if_stmt(s, level)
+        if isinstance(s, For):
+            out: List[Any] = ["for ("]
+            out += self.decl(s.init) if isinstance(s.init, Decl) else self.assign(s.init)
+            out.append(";")
+            if s.cond is not None:
+                out += [" ", ("expr", s.cond)]
+            out.append(";")
+            if s.step is not None:
+                out += [" "] + self.assign(s.step)
+            out.append(")")
+            return out + self.branch(s.body, level)
+        if isinstance(s, FuncDef):
+            head = "proc " if s.is_proc else f"func {type_text(s.ret_type)} "
+            params = ", ".join(f"{type_text(p.type_spec)} {p.name}" for p in s.params)
+            return [f"{head}{s.name}({params}) "] + self.block(s.body, s.body.stmts, level)
+        if isinstance(s, EnumDecl):
+            return [f"enum {s.name} {{ {', '.join(s.members)} }}" if s.members else f"enum {s.name} {{}}"]
+        if isinstance(s, StructDecl):
+            return [f"struct {s.name} "] + self.block(s, s.fields, level)
+        if isinstance(s, FieldDecl):
+            return [f"{type_text(s.type_spec)} {s.name};"]
+        raise ValueError(f"cannot format statement {type(s).__name__}")
+
+    def if_stmt(self, s: If, level: int) -> List[Any]:
+        out: List[Any] = ["if (", ("expr", s.cond), ")"]
+        if s.else_branch is None:
+            return out + self.branch(s.then_branch, level)
+        # без скобок else достался бы вложенному if
+        out += self.branch(s.then_branch, level, force_block=_dangling(s.then_branch))
+        out.append(("else", level))
+        e = s.else_branch
+        if isinstance(e, If):
+            return out + [" "] + self.if_stmt(e, level)
+        return out + self.branch(e, level)
+
+    def decl(self, d: Decl) -> List[Any]:
+        out: List[Any] = [f"{type_text(d.type_spec)} {d.name}"]
+        if d.init is not None:
+            out += [" = ", ("expr", d.init)]
+        return out
+
+    def assign(self, a: Assign) -> List[Any]:
+        return [("expr", a.lvalue), " = ", ("expr", a.expr)]
+
+    def args(self, args: List[Node]) -> List[Any]:
+        out: List[Any] = []
+        for i, a in enumerate(args):
+            if i:
+                out.append(", ")
+            out.append(("expr", a))
+        return out
+
+    def expr(self, e: Node) -> List[Any]:
+        if isinstance(e, BinOp):
+            p = _PREC[e.op]
+            left: Any = ("expr", e.left)
+            right: Any = ("expr", e.right)
+            out: List[Any] = []
+            if _prec(e.left) < p:
+                out += ["(", left, ")"]
+            else:
+                out.append(left)
+            out.append(f" {_OP_TEXT[e.op]} ")
+            if _prec(e.right) <= p:
+                out += ["(", right, ")"]
+            else:
+                out.append(right)
+            return out
+        if isinstance(e, UnOp):
+            inner: Any = ("expr", e.expr)
+            if _prec(e.expr) < _PREC_UNARY:
+                return [_OP_TEXT[e.op] + "(", inner, ")"]
+            return [_OP_TEXT[e.op], inner]
+        if isinstance(e, Literal):
+            return [_literal_text(e.value)]
+        if isinstance(e, Ident):
+            return [e.name]
+        if isinstance(e, CallExpr):
+            return [e.callee + "("] + self.args(e.args) + [")"]
+        if isinstance(e, (IndexExpr, FieldAccessExpr)):
+            base: Any = ("expr", e.base)
+            out = ["(", base, ")"] if _prec(e.base) < _PREC_ATOM else [base]
+            if isinstance(e, IndexExpr):
+                return out + ["[", ("expr", e.index), "]"]
+            return out + ["." + e.field]
+        raise ValueError(f"cannot format expression {type(e).__name__}")
+
+
+def format_program(program: Program, out: TextIO, comments: Sequence[Comment] = (),
+                   positions: Optional[Positions] = None, indent: str = "  ") -> None:
+    """Write `program` as source text to `out`; `comments` and `positions`
+    (from the lexer and the parser) are needed only to keep comments and blank lines."""
+    _Formatter(out, comments, positions, indent).run(program)
+
+
+def _parse_for_format(src: str) -> Tuple[Program, List[Comment], Positions]:
+    lexer = Lexer(src, keep_comments=True)
+    parser = Parser(lexer.scan_all(), track_positions=True)
+    program = parser.parse()
+    return program, lexer.comments, parser.positions
+
+
+def write_formatted(src: str, out: TextIO) -> None:
+    program, comments, positions = _parse_for_format(src)
+    format_program(program, out, comments, positions)
+
+
+def format_source(src: str) -> str:
+    buf = io.StringIO()
+    write_formatted(src, buf)
+    return buf.getvalue()
+
+
+class _Different(Exception):
+    def __init__(self, index: int) -> None:
+        super().__init__(index)
+        self.index = index
+
+
+class _CompareWriter:
+    """Текстовый «поток», сверяющий всё записанное с ожидаемым текстом."""
+
+    def __init__(self, expected: str) -> None:
+        self.expected = expected
+        self.pos = 0
+
+    def write(self, text: str) -> int:
+        end = self.pos + len(text)
+        if self.expected[self.pos:end] != text:
+            i = 0
+            while self.pos + i < len(self.expected) and i < len(text) and self.expected[self.pos + i] == text[i]:
+                i += 1
+            raise _Different(self.pos + i)
+        self.pos = end
+        return len(text)
+
+
+def check_source(src: str) -> Optional[Tuple[int, int]]:
+    """None if `src` is already in canonical form, otherwise the (line, col)
+    of the first character that formatting would change."""
+    program, comments, positions = _parse_for_format(src)
+    cmp = _CompareWriter(src)
+    try:
+        format_program(program, cmp, comments, positions)
+        if cmp.pos == len(src):
+            return None
+        index = cmp.pos
+    except _Different as e:
+        index = e.index
+    line = src.count("\n", 0, index) + 1
+    return line, index - (src.rfind("\n", 0, index) + 1) + 1
@@ -0,0 +1,119 @@
+"""
+Hash-consing of immutable expression nodes.
+
+`Parser(tokens, hashcons=True)` builds every expression node through an
+`InternTable`, so structurally identical subtrees (`Literal(0)`, `Ident(i)`,
+`i + 1`, ...) are created once and shared by all their occurrences.
+Inside one table two interned expressions are structurally equal exactly
+when they are the same object, so the check is `a is b`.
+
+The table only holds weak references: once no program uses a node, its
+entry disappears.  A shared node has a single `id`; tools that need a
+distinct id per occurrence can call `unshare(program)`.
+"""
+from __future__ import annotations
+import weakref
+from dataclasses import fields
+from typing import Any, List, Tuple
+
+from parser.ast import (
+    Node, Expr, BinOp, UnOp, Literal, Ident, IndexExpr, CallExpr, FieldAccessExpr, OpKind
+)
+
+
+class NodeFactory:
+    """Plain expression constructors: a fresh node per call (default mode)."""
+
+    def binop(self, op: OpKind, left: Expr, right: Expr) -> Expr:
+        return BinOp(op=op, left=left, right=right)
+
+    def unop(self, op: OpKind, expr: Expr) -> Expr:
+        return UnOp(op=op, expr=expr)
+
+    def literal(self, value: Any) -> Expr:
+        return Literal(value=value)
+
+    def ident(self, name: str) -> Expr:
+        return Ident(name=name)
+
+    def index(self, base: Expr, index: Expr) -> Expr:
+        return IndexExpr(base=base, index=index)
+
+    def call(self, callee: str, args: List[Expr]) -> Expr:
+        return CallExpr(callee=callee, args=args)
+
+    def field(self, base: Expr, name: str) -> Expr:
+        return FieldAccessExpr(base=base, field=name)
+
+
+class InternTable(NodeFactory):
+    """Expression constructors that share structurally identical subtrees.
+
+    Keys use `id()` of the (already interned) children: a parent keeps its
+    children alive, and its entry is dropped as soon as the parent dies, so
+    a key never outlives the objects it refers to.
+    """
+
+    def __init__(self) -> None:
+        self._table: "weakref.WeakValueDictionary[Tuple[Any, ...], Expr]" = weakref.WeakValueDictionary()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+    def _get(self, key: Tuple[Any, ...]) -> Any:
+        node = self._table.get(key)
+        if node is not None:
+            self.hits += 1
+        return node
+
+    def _put(self, key: Tuple[Any, ...], node: Expr) -> Expr:
+        self._table[key] = node
+        self.misses += 1
+        return node
+
+    def binop(self, op: OpKind, left: Expr, right: Expr) -> Expr:
+        key = ("BinOp", op, id(left), id(right))
+        return self._get(key) or self._put(key, BinOp(op=op, left=left, right=right))
+
+    def unop(self, op: OpKind, expr: Expr) -> Expr:
+        key = ("UnOp", op, id(expr))
+        return self._get(key) or self._put(key, UnOp(op=op, expr=expr))
+
+    def literal(self, value: Any) -> Expr:
+        # тип входит в ключ: иначе 1, 1.0 и True совпали бы
+        key = ("Literal", type(value), value)
+        return self._get(key) or self._put(key, Literal(value=value))
+
+    def ident(self, name: str) -> Expr:
+        key = ("Ident", name)
+        return self._get(key) or self._put(key, Ident(name=name))
+
+    def index(self, base: Expr, index: Expr) -> Expr:
+        key = ("IndexExpr", id(base), id(index))
+        return self._get(key) or self._put(key, IndexExpr(base=base, index=index))
+
+    def call(self, callee: str, args: List[Expr]) -> Expr:
+        key = ("CallExpr", callee, tuple(id(a) for a in args))
+        return self._get(key) or self._put(key, CallExpr(callee=callee, args=args))
+
+    def field(self, base: Expr, name: str) -> Expr:
+        key = ("FieldAccessExpr", id(base), name)
+        return self._get(key) or self._put(key, FieldAccessExpr(base=base, field=name))
+
+
+def unshare(node: Node) -> Node:
+    """Deep-copy `node` so that every occurrence of a shared subtree becomes
+    its own node with its own fresh id."""
+    kwargs = {}
+    for f in fields(node):
+        if not f.init:
+            continue
+        value = getattr(node, f.name)
+        if isinstance(value, Node):
+            value = unshare(value)
+        elif isinstance(value, list):
+            value = [unshare(v) if isinstance(v, Node) else v for v in value]
+        kwargs[f.name] = value
+    return type(node)(**kwargs)
@@ -0,0 +1,206 @@
+"""
+JSON input/output for ASTs.
+
+`dump_json(program, fp, indent=2)` writes exactly the same text as
+`json.dumps(program.to_json(), ensure_ascii=False, indent=2)`, but walks
+the tree with an explicit stack and writes to `fp` in small chunks, so no
+nested dict and no giant string is ever built.  `indent=None` gives the
+single-line form (`separators` works like in `json.dump`), `ids=False`
+leaves out the "id" keys.
+
+`dump_ndjson(program, fp)` writes one compact line per top-level statement.
+
+`from_json(obj)` rebuilds the node tree from that schema (as produced by
+`Node.to_json()` or parsed from --json output).  Ids are restored when
+present, otherwise fresh ones are assigned.
+"""
+from __future__ import annotations
+from json.encoder import encode_basestring, encode_basestring_ascii
+from typing import Any, Callable, Dict, List, Optional, TextIO, Tuple
+
+from parser import ast
+from parser.ast import (
+    Node, Program, Block, Decl, Assign, If, For, FuncDef, CallStmt,
+    PrintStmt, ReadStmt, Return, ExprStmt,
+    BinOp, UnOp, Literal, Ident, IndexExpr, CallExpr, FieldAccessExpr, OpKind, TypeKind,
+    BaseType, ArrayType, NamedStructType, Param,
+    EnumDecl, StructDecl, FieldDecl
+)
+
+_END = object()
+_CHUNK = 1 << 16   # сколько символов копим перед fp.write
+
+
+def _float_str(value: float) -> str:
+    if value != value:
+        return "NaN"
+    if value == float("inf"):
+        return "Infinity"
+    if value == -float("inf"):
+        return "-Infinity"
+    return float.__repr__(value)
+
+
+def dump_json(node: Node, fp: TextIO, indent: Optional[int] = 2, ensure_ascii: bool = False,
+              separators: Optional[Tuple[str, str]] = None, ids: bool = True) -> None:
+    """Write `node` (usually a Program) as JSON to the text stream `fp`."""
+    enc_str = encode_basestring_ascii if ensure_ascii else encode_basestring
+    if separators is not None:
+        item_sep, key_sep = separators
+    elif indent is not None:
+        item_sep, key_sep = ",", ": "
+    else:
+        item_sep, key_sep = ", ", ": "
+    unit = " " * indent if indent is not None else None
+
+    buf: List[str] = []
+    size = 0
+
+    def out(text: str) -> None:
+        nonlocal size
+        buf.append(text)
+        size += len(text)
+        if size >= _CHUNK:
+            fp.write("".join(buf))
+            buf.clear()
+            size = 0
+
+    def scalar(value: Any) -> str:
+        if isinstance(value, str):
+            return enc_str(value)
+        if value is None:
+            return "null"
+        if value is True:
+            return "true"
+        if value is False:
+            return "false"
+        if isinstance(value, int):
+            return int.__repr__(value)
+        if isinstance(value, float):
+            return _float_str(value)
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+    # кадр стека: [итератор элементов, это объект?, уровень, первый элемент?]
+    stack: List[list] = []
+
+    def open_value(value: Any, level: int) -> None:
+        if isinstance(value, Node):
+            out("{")
+            stack.append([iter(value.json_items()), True, level + 1, True])
+        elif isinstance(value, list):
+            if not value:
+                out("[]")
+            else:
+                out("[")
+                stack.append([iter(value), False, level + 1, True])
+        else:
+            out(scalar(value))
+
+    open_value(node, 0)
+    while stack:
+        frame = stack[-1]
+        item = next(frame[0], _END)
+        level = frame[2]
+        if item is _END:
+            stack.pop()
+            if unit is not None:
+                out("\n" + unit * (level - 1))
+            out("}" if frame[1] else "]")
+            continue
+        if frame[1] and not ids and item[0] == "id":
+            continue
+        if frame[3]:
+            frame[3] = False
+            if unit is not None:
+                out("\n" + unit * level)
+        else:
+            out(item_sep + "\n" + unit * level if unit is not None else item_sep)
+        if frame[1]:
+            key, value = item
+            out(enc_str(key) + key_sep)
+        else:
+            value = item
+        open_value(value, level)
+    if buf:
+        fp.write("".join(buf))
+
+
+COMPACT = (",", ":")
+
+
+def dump_ndjson(program: Program, fp: TextIO, ids: bool = True) -> None:
+    """One compact JSON object per top-level statement, one per line."""
+    for stmt in program.stmts:
+        dump_json(stmt, fp, indent=None, separators=COMPACT, ids=ids)
+        fp.write("\n")
+
+
+# === Загрузка ===
+
+class _Loader:
+    def __init__(self) -> None:
+        self.max_id = 0
+
+    def node(self, obj: Dict[str, Any]) -> Node:
+        try:
+            builder = _BUILDERS[obj["type"]]
+        except KeyError:
+            raise ValueError(f"unknown AST node type {obj.get('type')!r}") from None
+        except (TypeError, AttributeError):
+            raise ValueError(f"expected an AST node object, got {type(obj).__name__}") from None
+        try:
+            node = builder(self, obj)
+        except KeyError as e:
+            raise ValueError(f"{obj['type']} node is missing key {e.args[0]!r}") from None
+        nid = obj.get("id")
+        if nid is not None:
+            node.id = nid
+            if nid > self.max_id:
+                self.max_id = nid
+        return node
+
+    def opt(self, obj: Optional[Dict[str, Any]]) -> Optional[Node]:
+        return None if obj is None else self.node(obj)
+
+    def nodes(self, objs: List[Dict[str, Any]]) -> List[Node]:
+        return [self.node(o) for o in objs]
+
+
+_BUILDERS: Dict[str, Callable[[_Loader, Dict[str, Any]], Node]] = {
+    "Program": lambda L, o: Program(stmts=L.nodes(o["stmts"])),
+    "Block": lambda L, o: Block(stmts=L.nodes(o["stmts"])),
+    "Decl": lambda L, o: Decl(type_spec=L.node(o["type_spec"]), name=o["name"], init=L.opt(o.get("init"))),
+    "Assign": lambda L, o: Assign(lvalue=L.node(o["lvalue"]), expr=L.node(o["expr"])),
+    "If": lambda L, o: If(cond=L.node(o["cond"]), then_branch=L.node(o["then"]), else_branch=L.opt(o.get("else"))),
+    "For": lambda L, o: For(init=L.node(o["init"]), cond=L.opt(o.get("cond")), step=L.opt(o.get("step")),
+                            body=L.node(o["body"])),
+    "FuncDef": lambda L, o: FuncDef(name=o["name"], is_proc=o["kind"] == "proc", ret_type=L.opt(o.get("ret_type")),
+                                    body=L.node(o["body"]), params=L.nodes(o["params"])),
+    "CallStmt": lambda L, o: CallStmt(name=o["name"], args=L.nodes(o["args"])),
+    "Print": lambda L, o: PrintStmt(expr=L.node(o["expr"])),
+    "Read": lambda L, o: ReadStmt(name=o["name"]),
+    "Return": lambda L, o: Return(expr=L.opt(o.get("expr"))),
+    "ExprStmt": lambda L, o: ExprStmt(expr=L.node(o["expr"])),
+    "BinOp": lambda L, o: BinOp(op=OpKind[o["op"]], left=L.node(o["left"]), right=L.node(o["right"])),
+    "UnOp": lambda L, o: UnOp(op=OpKind[o["op"]], expr=L.node(o["expr"])),
+    "Literal": lambda L, o: Literal(value=o["value"]),
+    "Ident": lambda L, o: Ident(name=o["name"]),
+    "IndexExpr": lambda L, o: IndexExpr(base=L.node(o["base"]), index=L.node(o["index"])),
+    "CallExpr": lambda L, o: CallExpr(callee=o["callee"], args=L.nodes(o["args"])),
+    "FieldAccessExpr": lambda L, o: FieldAccessExpr(base=L.node(o["base"]), field=o["field"]),
+    "BaseType": lambda L, o: BaseType(kind=TypeKind[o["kind"]]),
+    "ArrayType": lambda L, o: ArrayType(base=L.node(o["base"]), dims=o["dims"]),
+    "NamedStructType": lambda L, o: NamedStructType(name=o["name"]),
+    "Param": lambda L, o: Param(type_spec=L.node(o["type_spec"]), name=o["name"]),
+    "EnumDecl": lambda L, o: EnumDecl(name=o["name"], members=list(o["members"])),
+    "StructDecl": lambda L, o: StructDecl(name=o["name"], fields=L.nodes(o["fields"])),
+    "FieldDecl": lambda L, o: FieldDecl(type_spec=L.node(o["type_spec"]), name=o["name"]),
+}
+
+
+def from_json(obj: Dict[str, Any]) -> Node:
+    """Rebuild an AST from its JSON form (a dict, as from `json.loads`)."""
+    loader = _Loader()
+    node = loader.node(obj)
+    ast._reserve_ids(loader.max_id)
+    return node
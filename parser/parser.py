@@ -1,14 +1,15 @@
 from __future__ import annotations
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 from lexer.tokens import Token, TokenKind
 from parser.ast import (
-    Program, Stmt, Block, Decl, Assign, If, For, FuncDef, CallStmt,
+    Program, Stmt, Block, Decl, Assign, If, For, FuncDef,
     PrintStmt, ReadStmt, Return, ExprStmt,
-    Expr, BinOp, UnOp, Literal, Ident, IndexExpr, CallExpr, FieldAccessExpr, OpKind, TypeKind,
+    Expr, Ident, IndexExpr, FieldAccessExpr, OpKind, TypeKind,
     TypeSpec, BaseType, ArrayType, NamedStructType, Param,
     EnumDecl, StructDecl, FieldDecl
 )
 from parser.errors import ParseError
+from parser.hashcons import NodeFactory, InternTable
 
 # Короткое имя для удобства — поправьте здесь, если ваши имена в TokenKind отличаются
 class K:  # noqa: N801
@@ -89,11 +90,28 @@ class _TokenStream:
             raise ParseError(self.last_ok_line, self.last_ok_col, tok, msg)
         return self.advance()
 
+    def rewind(self, i: int) -> None:
+        """Откат к сохранённой позиции (перебор в _parse_stmt)."""
+        self.i = i
+
 # === Парсер ===
 
 class Parser:
-    def __init__(self, tokens: List[Token]) -> None:
+    def __init__(self, tokens: List[Token], hashcons: bool = False,
+                 intern_table: Optional[InternTable] = None, track_positions: bool = False) -> None:
         self.ts = _TokenStream(tokens)
+        # track_positions=True: node.id -> (line, col, end_line, end_col) для операторов,
+        # полей структур и выражений с именем (Ident, CallExpr, FieldAccessExpr);
+        # end_col указывает на символ после последнего токена
+        self.positions: Optional[Dict[int, Tuple[int, int, int, int]]] = {} if track_positions else None
+        # hashcons=True: одинаковые подвыражения строятся один раз и разделяются;
+        # intern_table позволяет разделять их и между несколькими программами
+        if intern_table is not None:
+            self.nodes: NodeFactory = intern_table
+        elif hashcons:
+            self.nodes = InternTable()
+        else:
+            self.nodes = NodeFactory()
 
     def parse(self) -> Program:
         stmts: List[Stmt] = []
@@ -104,9 +122,21 @@ class Parser:
             stmts.append(self.parse_stmt())
         return Program(stmts=stmts)
 
+    def _mark(self, node, start: Token):
+        if self.positions is not None:
+            end = self.ts.toks[self.ts.i - 1]
+            self.positions[node.id] = (start.line, start.col, end.line, end.col + len(end.lexeme))
+        return node
+
     # --- Statements ---
 
     def parse_stmt(self) -> Stmt:
+        if self.positions is None:
+            return self._parse_stmt()
+        start = self.ts.peek()
+        return self._mark(self._parse_stmt(), start)
+
+    def _parse_stmt(self) -> Stmt:
         tok = self.ts.peek()
 
         # блок
@@ -158,7 +188,7 @@ class Parser:
                                    self.ts.peek(), "Assignment target must be identifier, indexed expression, or field access")
                 return Assign(lvalue=lvalue, expr=expr)
             # Не присваивание - откатываемся и парсим как выражение
-            self.ts.i = save_i
+            self.ts.rewind(save_i)
             expr = self.parse_expr()
             self.ts.expect(K.SEMI, "Expected ';' after expression")
             return ExprStmt(expr=expr)
@@ -172,14 +202,14 @@ class Parser:
         raise ParseError(self.ts.last_ok_line, self.ts.last_ok_col, tok, "Expected statement")
 
     def parse_block(self) -> Block:
-        self.ts.expect(K.LBRACE, "Expected '{' to start block")
+        start = self.ts.expect(K.LBRACE, "Expected '{' to start block")
         stmts: List[Stmt] = []
         while not self.ts.at_end() and self.ts.peek().kind != K.RBRACE:
             if self.ts.match(K.SEMI):  # разрешим пустые строки
                 continue
             stmts.append(self.parse_stmt())
         self.ts.expect(K.RBRACE, "Expected '}' to end block")
-        return Block(stmts=stmts)
+        return self._mark(Block(stmts=stmts), start)
 
     def parse_if(self) -> If:
         self.ts.expect(K.IF, "Expected 'if'")
@@ -302,10 +332,11 @@ class Parser:
         while self.ts.peek().kind != K.RBRACE:
             if self.ts.match(K.SEMI):  # пропустим пустые строки
                 continue
+            start = self.ts.peek()
             field_type = self.parse_type()
             field_name = self.ts.expect(K.IDENT, "Expected field name").lexeme
             self.ts.expect(K.SEMI, "Expected ';' after field declaration")
-            fields.append(FieldDecl(type_spec=field_type, name=field_name))
+            fields.append(self._mark(FieldDecl(type_spec=field_type, name=field_name), start))
         self.ts.expect(K.RBRACE, "Expected '}' after struct body")
         return StructDecl(name=name, fields=fields)
 
@@ -386,14 +417,14 @@ class Parser:
         left = self.parse_and()
         while self.ts.match(K.OR):
             right = self.parse_and()
-            left = BinOp(op=OpKind.OR, left=left, right=right)
+            left = self.nodes.binop(OpKind.OR, left, right)
         return left
 
     def parse_and(self) -> Expr:
         left = self.parse_equality()
         while self.ts.match(K.AND):
             right = self.parse_equality()
-            left = BinOp(op=OpKind.AND, left=left, right=right)
+            left = self.nodes.binop(OpKind.AND, left, right)
         return left
 
     def parse_equality(self) -> Expr:
@@ -406,7 +437,7 @@ class Parser:
             else:
                 break
             right = self.parse_relational()
-            left = BinOp(op=op, left=left, right=right)
+            left = self.nodes.binop(op, left, right)
         return left
 
     def parse_relational(self) -> Expr:
@@ -423,7 +454,7 @@ class Parser:
             else:
                 break
             right = self.parse_add()
-            left = BinOp(op=op, left=left, right=right)
+            left = self.nodes.binop(op, left, right)
         return left
 
     def parse_add(self) -> Expr:
@@ -436,7 +467,7 @@ class Parser:
             else:
                 break
             right = self.parse_mul()
-            left = BinOp(op=op, left=left, right=right)
+            left = self.nodes.binop(op, left, right)
         return left
 
     def parse_mul(self) -> Expr:
@@ -449,14 +480,14 @@ class Parser:
             else:
                 break
             right = self.parse_unary()
-            left = BinOp(op=op, left=left, right=right)
+            left = self.nodes.binop(op, left, right)
         return left
 
     def parse_unary(self) -> Expr:
         if self.ts.match(K.NOT):
-            return UnOp(op=OpKind.NOT, expr=self.parse_unary())
+            return self.nodes.unop(OpKind.NOT, self.parse_unary())
         if self.ts.match(K.MINUS):
-            return UnOp(op=OpKind.NEG, expr=self.parse_unary())
+            return self.nodes.unop(OpKind.NEG, self.parse_unary())
         return self.parse_postfix()
 
     def parse_arguments(self) -> List[Expr]:
@@ -473,6 +504,7 @@ class Parser:
 
     def parse_postfix(self) -> Expr:
         """Parse postfix expressions: primary ('(' args? ')' | '[' expr ']' | '.' IDENT)*"""
+        start = self.ts.peek()
         expr = self.parse_primary()
         # Parse function calls, array indexing, and field access: ('(' args? ')' | '[' expr ']' | '.' IDENT)*
         while True:
@@ -480,7 +512,7 @@ class Parser:
             if isinstance(expr, Ident) and self.ts.match(K.LPAREN):
                 args = self.parse_arguments()
                 self.ts.expect(K.RPAREN, "Expected ')' after arguments")
-                expr = CallExpr(callee=expr.name, args=args)
+                expr = self._mark(self.nodes.call(expr.name, args), start)
                 continue
             # Array indexing: [expr]
             elif self.ts.match(K.LBRACKET):
@@ -490,12 +522,12 @@ class Parser:
                                    self.ts.peek(), "Expected expression inside []")
                 index_expr = self.parse_expr()
                 self.ts.expect(K.RBRACKET, "Expected ']' after index expression")
-                expr = IndexExpr(base=expr, index=index_expr)
+                expr = self.nodes.index(expr, index_expr)
                 continue
             # Field access: .IDENT
             elif self.ts.match(K.DOT):
                 field_name = self.ts.expect(K.IDENT, "Expected field name after '.'").lexeme
-                expr = FieldAccessExpr(base=expr, field=field_name)
+                expr = self._mark(self.nodes.field(expr, field_name), start)
                 continue
             else:
                 break
@@ -505,16 +537,16 @@ class Parser:
         tok = self.ts.peek()
         # литералы
         if self.ts.match(K.INT_LIT):
-            return Literal(value=tok.value)
+            return self.nodes.literal(tok.value)
         if self.ts.match(K.REAL_LIT):
-            return Literal(value=tok.value)
+            return self.nodes.literal(tok.value)
         if self.ts.match(K.BOOL_LIT):
             # в зависимости от вашего лексера true/false могут быть BOOL с value True/False
             val = tok.value if tok.value is not None else (tok.lexeme == "true")
-            return Literal(value=val)
+            return self.nodes.literal(val)
         # идентификатор
         if self.ts.match(K.IDENT):
-            return Ident(name=tok.lexeme)
+            return self._mark(self.nodes.ident(tok.lexeme), tok)
         # (expr)
         if self.ts.match(K.LPAREN):
             e = self.parse_expr()
@@ -522,5 +554,5 @@ class Parser:
             return e
         raise ParseError(self.ts.last_ok_line, self.ts.last_ok_col, tok, "Expected primary expression")
 
-def parse(tokens: List[Token]) -> Program:
-    return Parser(tokens).parse()
+def parse(tokens: List[Token], hashcons: bool = False) -> Program:
+    return Parser(tokens, hashcons=hashcons).parse()
@@ -0,0 +1,181 @@
+"""
+Node-type index and a small selector language over a Program.
+
+`Program.index()` walks the tree once and records every node by class
+together with its parent.  `AstIndex.select()` answers CSS-like selectors
+from that index instead of re-walking the tree:
+
+    FuncDef > For CallExpr[callee=foo]
+    BinOp[op=ADD]
+    Block > *
+
+Grammar:
+    selector  ::= compound (('>' | ' ') compound)*
+    compound  ::= (NodeClass | '*') ('[' attr '=' value ']')*
+
+`A B` matches B with an ancestor A, `A > B` matches B whose parent is A.
+A function's body Block is transparent for `>`: the statements of the
+body are children of the FuncDef as well (`FuncDef > For` and
+`FuncDef > Block > For` both match a loop at the top of a function).
+Attribute values compare against `str()` of the field; enums compare by
+name and bools as `true`/`false`.  Results come back in document order and
+are cached per selector, so repeating a query costs O(len(result)).
+
+On hash-consed trees a shared node is indexed once, under the first parent
+met during the walk; use `unshare()` first if every occurrence matters.
+"""
+from __future__ import annotations
+import re
+from enum import Enum
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from parser import ast
+from parser.ast import Node, Block, FuncDef
+
+_NODE_CLASSES: Dict[str, type] = {
+    name: obj for name, obj in vars(ast).items()
+    if isinstance(obj, type) and issubclass(obj, Node)
+}
+
+_TOKEN_RE = re.compile(r"""\s*(?:(>)|([A-Za-z_][A-Za-z0-9_]*|\*)((?:\[[^\]]*\])*))""")
+_ATTR_RE = re.compile(r"""\[\s*([A-Za-z_][A-Za-z0-9_]*)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\]\s]*))\s*\]""")
+
+# (класс или None для '*', [(attr, value)])
+_Compound = Tuple[Optional[type], List[Tuple[str, str]]]
+
+
+def _attr_str(value: Any) -> str:
+    if isinstance(value, Enum):
+        return value.name
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+def parse_selector(selector: str) -> List[Tuple[str, _Compound]]:
+    """Split a selector into [(combinator, compound)], combinator is '' for
+    the first compound, ' ' for descendant and '>' for child."""
+    steps: List[Tuple[str, _Compound]] = []
+    pos, combinator = 0, ""
+    text = selector.strip()
+    if not text:
+        raise ValueError("empty selector")
+    while pos < len(text):
+        m = _TOKEN_RE.match(text, pos)
+        if m is None or m.end() == pos:
+            raise ValueError(f"bad selector {selector!r} at offset {pos}")
+        pos = m.end()
+        if m.group(1):
+            if not steps or combinator == ">":
+                raise ValueError(f"misplaced '>' in selector {selector!r}")
+            combinator = ">"
+            continue
+        name = m.group(2)
+        cls: Optional[type] = None
+        if name != "*":
+            cls = _NODE_CLASSES.get(name)
+            if cls is None:
+                raise ValueError(f"unknown node type {name!r} in selector")
+        attrs = []
+        for am in _ATTR_RE.finditer(m.group(3) or ""):
+            value = next(v for v in am.group(2, 3, 4) if v is not None)
+            attrs.append((am.group(1), value))
+        if (m.group(3) or "").count("[") != len(attrs):
+            raise ValueError(f"bad attribute filter in selector {selector!r}")
+        steps.append((combinator or ("" if not steps else " "), (cls, attrs)))
+        combinator = ""
+    if combinator:
+        raise ValueError(f"selector {selector!r} ends with '>'")
+    return steps
+
+
+class AstIndex:
+    """Class → nodes map and parent pointers, built in one traversal."""
+
+    def __init__(self, root: Node) -> None:
+        self.root = root
+        self.nodes: List[Node] = []                  # все узлы в порядке документа
+        self.by_type: Dict[type, List[Node]] = {}
+        self._parent: Dict[int, Node] = {}          # id(node) -> parent
+        self._order: Dict[int, int] = {}            # id(node) -> позиция в self.nodes
+        self._cache: Dict[str, List[Node]] = {}
+
+        stack: List[Tuple[Node, Optional[Node]]] = [(root, None)]
+        while stack:
+            node, parent = stack.pop()
+            key = id(node)
+            if key in self._order:       # разделяемый узел (hashcons) — уже учтён
+                continue
+            self._order[key] = len(self.nodes)
+            self.nodes.append(node)
+            if parent is not None:
+                self._parent[key] = parent
+            self.by_type.setdefault(type(node), []).append(node)
+            kids = list(node.children())
+            for child in reversed(kids):
+                stack.append((child, node))
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def of_type(self, cls: Union[type, str]) -> List[Node]:
+        """Nodes of exactly this class (not subclasses), in document order."""
+        if isinstance(cls, str):
+            cls = _NODE_CLASSES[cls]
+        return list(self.by_type.get(cls, ()))
+
+    def parent(self, node: Node) -> Optional[Node]:
+        return self._parent.get(id(node))
+
+    def ancestors(self, node: Node) -> List[Node]:
+        out = []
+        p = self._parent.get(id(node))
+        while p is not None:
+            out.append(p)
+            p = self._parent.get(id(p))
+        return out
+
+    def select(self, selector: str) -> List[Node]:
+        cached = self._cache.get(selector)
+        if cached is None:
+            cached = self._cache[selector] = self._run(parse_selector(selector))
+        return list(cached)
+
+    # --- matching ---
+
+    @staticmethod
+    def _matches(node: Node, compound: _Compound) -> bool:
+        cls, attrs = compound
+        if cls is not None and type(node) is not cls:
+            return False
+        for name, value in attrs:
+            if not hasattr(node, name) or _attr_str(getattr(node, name)) != value:
+                return False
+        return True
+
+    def _run(self, steps: List[Tuple[str, _Compound]]) -> List[Node]:
+        cls, _ = steps[-1][1]
+        candidates = self.nodes if cls is None else self.by_type.get(cls, [])
+        return [n for n in candidates if self._matches(n, steps[-1][1]) and self._match_up(n, steps, len(steps) - 1)]
+
+    def _match_up(self, node: Node, steps: List[Tuple[str, _Compound]], k: int) -> bool:
+        # node уже совпал с шагом k; проверяем шаги слева через родителей
+        if k == 0:
+            return True
+        combinator = steps[k][0]
+        compound = steps[k - 1][1]
+        p = self._parent.get(id(node))
+        if combinator == ">":
+            if p is None:
+                return False
+            if self._matches(p, compound) and self._match_up(p, steps, k - 1):
+                return True
+            # тело функции прозрачно для '>': операторы тела — дети и самой FuncDef
+            fn = self._parent.get(id(p))
+            return (type(p) is Block and type(fn) is FuncDef and fn.body is p
+                    and self._matches(fn, compound) and self._match_up(fn, steps, k - 1))
+        while p is not None:
+            if self._matches(p, compound) and self._match_up(p, steps, k - 1):
+                return True
+            p = self._parent.get(id(p))
+        return False
@@ -0,0 +1,59 @@
+"""
+Build a single-file zipapp of the CLI: dist/minilang.pyz.
+
+    python scripts/build_zipapp.py [--output PATH]
+    python dist/minilang.pyz examples/valid01_basics.txt --json
+
+The archive holds lexer/, parser/, main/, semantic/ and lint/ as sources
+plus bytecode compiled by the running interpreter.  The .pyc files are
+unchecked hash-based pycs next to their sources (the layout zipimport looks
+for), so the first run does not compile anything and nothing is validated
+against the sources.  Another Python version ignores the bytecode (magic
+number mismatch) and falls back to the .py files, which are kept for that
+and for tracebacks.  Entries are stored uncompressed: imports from the
+archive then cost no zlib work.
+"""
+import argparse
+import importlib.util
+import pathlib
+import py_compile
+import sys
+import tempfile
+import zipfile
+
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parents[1]
+PACKAGES = ["lexer", "parser", "main", "semantic", "lint"]
+MAIN = "from main.main import main\nraise SystemExit(main())\n"
+SHEBANG = b"#!/usr/bin/env python3\n"
+
+
+def build(output: pathlib.Path) -> pathlib.Path:
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory() as tmp, open(output, "wb") as fp:
+        fp.write(SHEBANG)
+        with zipfile.ZipFile(fp, "w", compression=zipfile.ZIP_STORED) as zf:
+            zf.writestr("__main__.py", MAIN)
+            for pkg in PACKAGES:
+                for src in sorted((PROJECT_ROOT / pkg).rglob("*.py")):
+                    rel = src.relative_to(PROJECT_ROOT)
+                    zf.write(src, rel.as_posix())
+                    pyc = pathlib.Path(tmp) / "module.pyc"
+                    py_compile.compile(str(src), cfile=str(pyc), dfile=rel.as_posix(), doraise=True,
+                                       invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH)
+                    zf.write(pyc, rel.with_suffix(".pyc").as_posix())
+    output.chmod(0o755)
+    return output
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Build dist/minilang.pyz")
+    ap.add_argument("--output", default=str(PROJECT_ROOT / "dist" / "minilang.pyz"))
+    args = ap.parse_args(argv)
+    out = build(pathlib.Path(args.output))
+    tag = importlib.util.MAGIC_NUMBER.hex()
+    print(f"[OK] Created: {out} ({out.stat().st_size} bytes, bytecode for {sys.implementation.cache_tag}, magic {tag})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,15 +1,15 @@
-import subprocess, pathlib
+import io, pathlib, sys
+
+# все примеры в одном процессе: без запуска интерпретатора на каждый файл
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+from main.main import run_file  # noqa: E402
 
 for f in sorted(pathlib.Path("examples").glob("*.txt")):
     print(f"=== {f} ===")
-    result = subprocess.run(
-        ["python", "-m", "main.main", str(f)],
-        capture_output=True,
-        text=True,
-    )
-    if result.returncode == 0:
-        print(result.stdout.strip())
+    out, err = io.StringIO(), io.StringIO()
+    if run_file(str(f), out=out, err=err) == 0:
+        print(out.getvalue().strip())
     else:
-        print(result.stderr.strip())
+        print(err.getvalue().strip())
         print("(ошибка как ожидается)")
     print()
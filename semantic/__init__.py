@@ -0,0 +1,8 @@
+from semantic.annotate import Annotations, StructLayout, annotate, annotate_source
+from semantic.checker import Checker, Diagnostic, Symbol, check, check_source
+from semantic.cfg import CFG, build_cfgs
+from semantic.dataflow import analyze
+from semantic.types import Type, assignable
+
+__all__ = ["Annotations", "CFG", "Checker", "Diagnostic", "StructLayout", "Symbol", "Type", "analyze",
+           "annotate", "annotate_source", "assignable", "build_cfgs", "check", "check_source"]
@@ -0,0 +1,127 @@
+"""
+Type annotation: resolved types on the tree, struct layouts, field slots.
+
+    result = annotate(program, parser.positions)      # or annotate_source(src)
+    expr.sem_type                                     # interned Type, `is`-comparable
+    decl.layout.slot("x")                             # FieldSlot(name, index, type)
+    access.slot                                       # FieldAccessExpr: index into the layout
+
+The pass is the semantic checker run once with a hook on its expression
+walk, so the types are exactly the ones the checker reasons with and the
+diagnostics come for free.  After it:
+
+  every Expr        `sem_type`: its Type (`error` where the checker reported
+                    one, `void` for a procedure call); the Ident on the
+                    left of an assignment gets the variable's type
+  every StructDecl  `layout`: a StructLayout, fields numbered 0, 1, ... in
+                    declaration order (a duplicate or self-containing field
+                    is an error and gets no slot)
+  FieldAccessExpr   `slot`: the field's index in the layout of the base's
+                    struct type, -1 if it could not be resolved
+
+The attributes are plain instance attributes, not dataclass fields: they
+do not show up in JSON, the binary format or struct hashes, and a pass that
+rebuilds nodes (opt.fold, opt.loops) drops them, so annotate after such
+passes.  The tree must not be hash-consed (see parser.unshare): a shared
+Ident can have a different type in each place it occurs.
+"""
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from parser.ast import Node, Program, Assign, Ident, FieldAccessExpr, StructDecl
+from semantic.checker import Checker, Diagnostic, Positions, StructInfo
+from semantic.types import Type, ERROR
+
+
+@dataclass(frozen=True)
+class FieldSlot:
+    name: str
+    index: int
+    type: Type
+
+
+@dataclass
+class StructLayout:
+    name: str
+    node: StructDecl
+    fields: List[FieldSlot]                         # в порядке слотов
+    by_name: Dict[str, FieldSlot] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        if not self.by_name:
+            self.by_name = {f.name: f for f in self.fields}
+
+    def __len__(self) -> int:
+        return len(self.fields)
+
+    def slot(self, name: str) -> Optional[FieldSlot]:
+        return self.by_name.get(name)
+
+
+@dataclass
+class Annotations:
+    diagnostics: List[Diagnostic]
+    layouts: List[StructLayout]                     # по одной на StructDecl, в порядке объявления
+    by_type: Dict[Type, StructLayout]               # тип struct -> раскладка (как Checker.structs)
+    expressions: int = 0                            # сколько узлов выражений получили тип
+
+    def layout_of(self, t: Type) -> Optional[StructLayout]:
+        return self.by_type.get(t)
+
+
+class Annotator(Checker):
+    def __init__(self, positions: Optional[Positions] = None) -> None:
+        super().__init__(positions)
+        self._record = self._set_type
+        self.layouts: List[StructLayout] = []
+        self.expressions = 0
+
+    def annotate(self, program: Program) -> Annotations:
+        diagnostics = self.check(program)
+        by_type = {t: info.node.layout for t, info in self.structs.items()}
+        return Annotations(diagnostics, self.layouts, by_type, self.expressions)
+
+    def _set_type(self, node: Node, t: Type) -> None:
+        node.sem_type = t
+        self.expressions += 1
+
+    def _struct_fields(self, node: StructDecl) -> None:
+        super()._struct_fields(node)
+        info = self.tags.lookup_local(node.name)
+        if not isinstance(info, StructInfo) or info.node is not node:
+            # повторное объявление: поля не разбирались, раскладка пустая
+            node.layout = StructLayout(node.name, node, [])
+        else:
+            # Checker.fields — dict, порядок вставки = порядок объявления полей
+            node.layout = StructLayout(node.name, node,
+                                       [FieldSlot(name, i, t) for i, (name, t) in enumerate(info.fields.items())])
+        self.layouts.append(node.layout)
+
+    def _field(self, node: FieldAccessExpr, args: List[Type]) -> Type:
+        t = super()._field(node, args)
+        info = self.structs.get(args[0])
+        slot = info.node.layout.slot(node.field) if info is not None else None
+        node.slot = slot.index if slot is not None else -1
+        return t
+
+    def _assign(self, node: Assign, work: List[tuple]) -> None:
+        super()._assign(node, work)
+        lv = node.lvalue
+        if isinstance(lv, Ident):
+            sym = self.values.lookup(lv.name)
+            self._set_type(lv, sym.type if sym is not None and sym.kind in ("var", "param") else ERROR)
+
+
+def annotate(program: Program, positions: Optional[Positions] = None) -> Annotations:
+    """Типы на всех выражениях, раскладки структур, слоты полей; плюс диагностики проверки."""
+    return Annotator(positions).annotate(program)
+
+
+def annotate_source(src: str) -> Tuple[Program, Annotations]:
+    """Разбор с позициями и аннотация; LexError/ParseError пробрасываются."""
+    from lexer import Lexer
+    from parser.parser import Parser
+    parser = Parser(Lexer(src).scan_all(), track_positions=True)
+    program = parser.parse()
+    return program, annotate(program, parser.positions)
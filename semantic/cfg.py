@@ -0,0 +1,268 @@
+"""
+Control-flow graphs for the dataflow analyses (dataflow.py).
+
+    for cfg in build_cfgs(program):      # top-level code first, then every function
+        print(cfg.name, len(cfg.blocks), [v.name for v in cfg.vars])
+
+One CFG per function (FuncDef, nested ones included) and one for the
+top-level statements.  A basic block is a list of items, one per simple
+statement (Decl, Assign, ExprStmt, CallStmt, PrintStmt, ReadStmt, Return)
+or If/For condition, with edges for If (then/else/join), For (init, then a
+header with the condition, the body followed by the step, a back edge and
+the exit) and Return (to the exit block; what follows is unreachable).
+
+Every declaration is a variable of its own (names are resolved through
+the same scopes as in the checker), numbered from 0: bit i of a Python int
+is variable i, so a set of variables is an int and transfer functions are
+`&`, `|` and `~`.  Each item records what it reads (with the Ident nodes,
+for diagnostics) and what it assigns as a whole (`x = ...`, a Decl,
+`read(x)`); storing into `a[i]` or `s.f` reads a (or s).  Variables of the
+enclosing scopes (globals, seen from a function) are not tracked.  A call
+may read and assign the variables other functions can see: in the
+top-level CFG every global declared so far, in a function the variables
+declared before its last nested FuncDef so far.  This is recorded in
+`call_uses`/`call_defs`.
+"""
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from parser.ast import (
+    Node, Program, Block, Decl, Assign, If, For, FuncDef, CallStmt, PrintStmt, ReadStmt, Return, ExprStmt,
+    EnumDecl, Literal, Ident, CallExpr, BaseType,
+)
+from semantic.scope import ScopedTable
+
+TOP_LEVEL = "<top level>"
+
+
+@dataclass
+class Var:
+    index: int                  # номер бита
+    name: str
+    node: Node                  # Decl или Param
+    kind: str                   # local, param, global
+    scalar: bool                # int/real/bool: только для них проверяется присваивание до чтения
+
+
+@dataclass
+class Item:
+    node: Node                  # оператор; для условия — сам If/For
+    uses: List[Tuple[int, Ident]] = field(default_factory=list)
+    use_mask: int = 0
+    defs: int = 0               # получают значение целиком (или объявлены заново)
+    unset: int = 0              # объявлены без значения (скаляры)
+    store: int = -1             # переменная, которой присваивается значение (для «мёртвых» записей)
+    call_uses: int = 0          # переменные, видимые другим функциям, которые может прочитать вызов
+    call_defs: int = 0          # ... и присвоить
+
+
+@dataclass
+class BasicBlock:
+    index: int
+    items: List[Item] = field(default_factory=list)
+    succs: List[int] = field(default_factory=list)
+    preds: List[int] = field(default_factory=list)
+
+
+@dataclass
+class CFG:
+    name: str                   # имя функции или TOP_LEVEL
+    node: Node                  # FuncDef или Program
+    blocks: List[BasicBlock] = field(default_factory=list)
+    vars: List[Var] = field(default_factory=list)
+    entry: int = 0
+    exit: int = 1
+
+    @property
+    def all_vars(self) -> int:
+        return (1 << len(self.vars)) - 1
+
+
+def build_cfgs(program: Program) -> List[CFG]:
+    cfgs: List[CFG] = []
+    pending: List[Node] = [program]
+    # функции в порядке обнаружения: сначала верхнего уровня, потом вложенные
+    for owner in pending:
+        builder = _Builder(owner)
+        cfgs.append(builder.cfg)
+        pending.extend(builder.functions)
+    return cfgs
+
+
+class _Builder:
+    """Операторы обходятся рекурсивно: вложенность ограничена рекурсивным парсером."""
+
+    def __init__(self, owner: Node) -> None:
+        top = type(owner) is Program
+        self.cfg = CFG(owner.name if not top else TOP_LEVEL, owner)
+        self.top = top
+        self.scopes: ScopedTable[Optional[Var]] = ScopedTable()
+        self.functions: List[FuncDef] = []
+        # видимые другим функциям: глобальные / локальные, объявленные до вложенной FuncDef
+        self.shared = 0
+        entry = self.new_block()
+        self.new_block()            # exit
+        self.cur = entry
+        if top:
+            self.stmts(owner.stmts)
+        else:
+            for p in owner.params:
+                self.declare(p.name, p, "param", type(p.type_spec) is BaseType)
+            self.stmts(owner.body.stmts)
+        self.edge(self.cur, self.cfg.blocks[self.cfg.exit])
+
+    # --- граф ---
+
+    def new_block(self) -> BasicBlock:
+        block = BasicBlock(len(self.cfg.blocks))
+        self.cfg.blocks.append(block)
+        return block
+
+    def edge(self, a: BasicBlock, b: BasicBlock) -> None:
+        a.succs.append(b.index)
+        b.preds.append(a.index)
+
+    def declare(self, name: str, node: Node, kind: str, scalar: bool) -> Var:
+        var = Var(len(self.cfg.vars), name, node, kind, scalar)
+        self.cfg.vars.append(var)
+        self.scopes.declare(name, var)
+        if kind == "global":
+            self.shared |= 1 << var.index
+        return var
+
+    def reads(self, expr: Optional[Node], item: Item) -> None:
+        if expr is None:
+            return
+        stack = [expr]
+        while stack:
+            node = stack.pop()
+            cls = type(node)
+            if cls is Ident:
+                var = self.scopes.lookup(node.name)
+                if var is not None:
+                    item.uses.append((var.index, node))
+                    item.use_mask |= 1 << var.index
+            elif cls is CallExpr:
+                item.call_uses |= self.shared
+                item.call_defs |= self.shared
+            stack.extend(node.children())
+
+    # --- операторы ---
+
+    def stmts(self, stmts: List[Node]) -> None:
+        for s in stmts:
+            self.stmt(s)
+
+    def scoped(self, s: Node) -> None:
+        self.scopes.push()
+        self.stmt(s)
+        self.scopes.pop()
+
+    def stmt(self, s: Node) -> None:
+        cls = type(s)
+        if cls is Block:
+            self.scopes.push()
+            self.stmts(s.stmts)
+            self.scopes.pop()
+        elif cls is Decl:
+            item = Item(s)
+            self.reads(s.init, item)
+            kind = "global" if self.top and self.scopes.depth == 1 else "local"
+            scalar = type(s.type_spec) is BaseType
+            var = self.declare(s.name, s, kind, scalar)
+            item.defs = 1 << var.index
+            if s.init is not None:
+                item.store = var.index
+            elif scalar:
+                item.unset = item.defs
+            self.cur.items.append(item)
+        elif cls is Assign:
+            item = Item(s)
+            self.reads(s.expr, item)
+            if type(s.lvalue) is Ident:
+                var = self.scopes.lookup(s.lvalue.name)
+                if var is not None:
+                    item.defs = 1 << var.index
+                    item.store = var.index
+            else:
+                self.reads(s.lvalue, item)
+            self.cur.items.append(item)
+        elif cls is ReadStmt:
+            item = Item(s)
+            var = self.scopes.lookup(s.name)
+            if var is not None:
+                item.defs = 1 << var.index
+                item.store = var.index
+            self.cur.items.append(item)
+        elif cls is ExprStmt or cls is PrintStmt:
+            item = Item(s)
+            self.reads(s.expr, item)
+            self.cur.items.append(item)
+        elif cls is CallStmt:
+            item = Item(s)
+            for a in s.args:
+                self.reads(a, item)
+            item.call_uses = item.call_defs = self.shared
+            self.cur.items.append(item)
+        elif cls is Return:
+            item = Item(s)
+            self.reads(s.expr, item)
+            self.cur.items.append(item)
+            self.edge(self.cur, self.cfg.blocks[self.cfg.exit])
+            self.cur = self.new_block()         # недостижимый код после return
+        elif cls is If:
+            self.if_(s)
+        elif cls is For:
+            self.for_(s)
+        elif cls is FuncDef:
+            self.scopes.declare(s.name, None)
+            self.functions.append(s)
+            if not self.top:
+                # вложенная функция видит всё, что объявлено до неё (лишние — вне области, их не читают)
+                self.shared = (1 << len(self.cfg.vars)) - 1
+        elif cls is EnumDecl:
+            for member in s.members:
+                self.scopes.declare(member, None)
+
+    def if_(self, s: If) -> None:
+        item = Item(s)
+        self.reads(s.cond, item)
+        self.cur.items.append(item)
+        head = self.cur
+        ends = []
+        for branch in (s.then_branch, s.else_branch):
+            if branch is None:
+                ends.append(head)
+                continue
+            self.cur = self.new_block()
+            self.edge(head, self.cur)
+            self.scoped(branch)
+            ends.append(self.cur)
+        join = self.new_block()
+        for end in ends:
+            self.edge(end, join)
+        self.cur = join
+
+    def for_(self, s: For) -> None:
+        self.scopes.push()
+        if s.init is not None:
+            self.stmt(s.init)
+        head = self.new_block()
+        self.edge(self.cur, head)
+        if s.cond is not None:
+            item = Item(s)
+            self.reads(s.cond, item)
+            head.items.append(item)
+        self.cur = self.new_block()
+        self.edge(head, self.cur)
+        self.scoped(s.body)
+        if s.step is not None:
+            self.stmt(s.step)
+        self.edge(self.cur, head)
+        after = self.new_block()
+        endless = s.cond is None or (type(s.cond) is Literal and s.cond.value is True)
+        if not endless:
+            self.edge(head, after)
+        self.cur = after
+        self.scopes.pop()
@@ -0,0 +1,544 @@
+"""
+Semantic checker: name resolution, scopes and types in one pass.
+
+    diagnostics = check(program, parser.positions)     # or check_source(src)
+    for d in diagnostics:
+        print(f"{path}:{d}")                          # 12:3: error: ...
+
+Scopes: the program, every Block, a FuncDef (parameters and the top level
+of its body share one scope, as in C), a For (its init declaration) and
+each branch of an If.  Names live in two namespaces, both ScopedTables:
+values (variables, parameters, functions, enum members) and tags (struct
+and enum names).  Redeclaring a name in the same scope is an error;
+shadowing an outer one is allowed.
+
+Top-level struct, enum and function declarations are registered before the
+walk (a scan of Program.stmts, not of the tree), so functions can call each
+other in any order and struct fields can name structs declared later.
+Everything else must be declared before use.  The tree itself is walked
+once, with explicit stacks for statements and expressions.
+
+Types: int, real, bool, `struct S`, `enum E`, `T[]`; a struct or enum type
+is its declaration, so a shadowing `struct S` is a new type.  int converts to
+real, and enum members to int, on assignment and in arithmetic; `/` on two
+ints is integer division and stays int.  Conditions must be bool.  Every
+error is reported (the result type becomes `error`, which is accepted
+everywhere, so one mistake is reported once).  Arrays have no size in the
+language, so indexing an array variable that never got a value (declared
+without initializer and never assigned as a whole) is a warning.
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from parser.ast import (
+    Node, Program, Block, Decl, Assign, If, For, FuncDef, CallStmt, PrintStmt, ReadStmt, Return, ExprStmt,
+    BinOp, UnOp, Literal, Ident, IndexExpr, CallExpr, FieldAccessExpr, OpKind, TypeKind,
+    TypeSpec, BaseType, ArrayType, NamedStructType, EnumDecl, StructDecl,
+)
+from semantic.scope import ScopedTable
+from semantic.types import (
+    Type, INT, REAL, BOOL, VOID, ERROR, array_of, struct_type, enum_type, assignable,
+)
+
+Positions = Dict[int, Tuple[int, int, int, int]]
+
+_BASE = {TypeKind.INT: INT, TypeKind.REAL: REAL, TypeKind.BOOL: BOOL}
+_OP_TEXT = {
+    OpKind.OR: "||", OpKind.AND: "&&", OpKind.EQ: "==", OpKind.NEQ: "!=",
+    OpKind.LT: "<", OpKind.LE: "<=", OpKind.GT: ">", OpKind.GE: ">=",
+    OpKind.ADD: "+", OpKind.SUB: "-", OpKind.MUL: "*", OpKind.DIV: "/",
+    OpKind.NEG: "-", OpKind.NOT: "!",
+}
+_ARITH = (OpKind.ADD, OpKind.SUB, OpKind.MUL, OpKind.DIV)
+_ORDER = (OpKind.LT, OpKind.LE, OpKind.GT, OpKind.GE)
+
+# операнды выражений в порядке вычисления
+_EXPR_KIDS: Dict[type, Callable[[Node], tuple]] = {
+    BinOp: lambda n: (n.left, n.right),
+    UnOp: lambda n: (n.expr,),
+    IndexExpr: lambda n: (n.base, n.index),
+    FieldAccessExpr: lambda n: (n.base,),
+    CallExpr: lambda n: tuple(n.args),
+}
+
+
+@dataclass(frozen=True)
+class Diagnostic:
+    severity: str       # "error" | "warning"
+    message: str
+    line: int = 0       # 0 — позиция неизвестна (разбор без track_positions)
+    col: int = 0
+    node_id: int = 0
+
+    def __str__(self) -> str:
+        return f"{self.line}:{self.col}: {self.severity}: {self.message}"
+
+
+@dataclass
+class Symbol:
+    name: str
+    kind: str                       # var, param, func, enum_member
+    type: Type                      # func: тип результата, VOID у процедуры
+    node: Node
+    params: Tuple[Type, ...] = ()
+    sized: bool = True              # массив: получал ли значение целиком
+
+
+@dataclass
+class StructInfo:
+    name: str
+    node: StructDecl
+    fields: Dict[str, Type]
+
+
+@dataclass
+class EnumInfo:
+    name: str
+    node: EnumDecl
+
+
+class Checker:
+    def __init__(self, positions: Optional[Positions] = None) -> None:
+        self.positions: Positions = positions if positions is not None else {}
+        self.diagnostics: List[Diagnostic] = []
+        self.values: ScopedTable[Symbol] = ScopedTable()
+        self.tags: ScopedTable[Union[StructInfo, EnumInfo]] = ScopedTable()
+        self.structs: Dict[Type, StructInfo] = {}
+        self.functions: List[Symbol] = []          # охватывающие функции, для return
+        self.anchor: Optional[Node] = None         # текущий оператор: позиция по умолчанию
+        self._declared: Dict[int, Symbol] = {}     # id(FuncDef) -> символ, объявленный заранее
+        self._hoisted: set = set()
+        # вызывается для каждого узла выражения с его типом (semantic/annotate.py)
+        self._record: Optional[Callable[[Node, Type], None]] = None
+        self._stmt: Dict[type, Callable] = {
+            Block: self._block, Decl: self._decl, Assign: self._assign, If: self._if, For: self._for,
+            FuncDef: self._funcdef, CallStmt: self._call_stmt, PrintStmt: self._print, ReadStmt: self._read,
+            Return: self._return, ExprStmt: self._expr_stmt, StructDecl: self._struct, EnumDecl: self._enum,
+        }
+        self._combine: Dict[type, Callable] = {
+            BinOp: self._binop, UnOp: self._unop, IndexExpr: self._index,
+            FieldAccessExpr: self._field, CallExpr: self._call,
+        }
+
+    # --- диагностика ---
+
+    def _report(self, severity: str, message: str, node: Optional[Node]) -> None:
+        pos = self.positions.get(node.id) if node is not None else None
+        if pos is None and self.anchor is not None:
+            pos = self.positions.get(self.anchor.id)
+        line, col = (pos[0], pos[1]) if pos is not None else (0, 0)
+        self.diagnostics.append(Diagnostic(severity, message, line, col, node.id if node is not None else 0))
+
+    def error(self, message: str, node: Optional[Node]) -> None:
+        self._report("error", message, node)
+
+    def warning(self, message: str, node: Optional[Node]) -> None:
+        self._report("warning", message, node)
+
+    # --- вход ---
+
+    def check(self, program: Program) -> List[Diagnostic]:
+        self._hoist(program.stmts)
+        work: List[tuple] = [("s", s) for s in reversed(program.stmts)]
+        self._run(work)
+        # устойчивая сортировка: при равных позициях — порядок обхода
+        self.diagnostics.sort(key=lambda d: (d.line, d.col))
+        return self.diagnostics
+
+    def _run(self, work: List[tuple]) -> None:
+        while work:
+            item = work.pop()
+            tag = item[0]
+            if tag == "s":
+                node = item[1]
+                handler = self._stmt.get(type(node))
+                if handler is not None:
+                    self.anchor = node
+                    handler(node, work)
+            elif tag == "push":
+                self.values.push()
+                self.tags.push()
+            elif tag == "pop":
+                self.values.pop()
+                self.tags.pop()
+            elif tag == "endfunc":
+                self.functions.pop()
+                self.values.pop()
+                self.tags.pop()
+
+    # --- объявления ---
+
+    def _hoist(self, stmts: List[Node]) -> None:
+        for s in stmts:
+            if isinstance(s, (StructDecl, EnumDecl)):
+                self.anchor = s
+                self._declare_tag(s)
+        for s in stmts:
+            if isinstance(s, StructDecl):
+                self.anchor = s
+                self._struct_fields(s)
+        for s in stmts:
+            if isinstance(s, FuncDef):
+                self.anchor = s
+                self._declared[id(s)] = self._declare_func(s)
+        self._hoisted = {id(s) for s in stmts if isinstance(s, (StructDecl, EnumDecl))}
+
+    def _declare_tag(self, node: Union[StructDecl, EnumDecl]) -> None:
+        kind = "struct" if isinstance(node, StructDecl) else "enum"
+        info = StructInfo(node.name, node, {}) if kind == "struct" else EnumInfo(node.name, node)
+        if self.tags.declare(node.name, info) is not None:
+            self.error(f"'{node.name}' is already declared as a struct or enum in this scope", node)
+            return
+        if kind == "struct":
+            self.structs[struct_type(node.name, node.id)] = info
+            return
+        t = enum_type(node.name, node.id)
+        seen = set()
+        for member in node.members:
+            if member in seen:
+                self.error(f"enum {node.name} lists '{member}' twice", node)
+                continue
+            seen.add(member)
+            if self.values.declare(member, Symbol(member, "enum_member", t, node)) is not None:
+                self.error(f"'{member}' is already declared in this scope", node)
+
+    def _struct_fields(self, node: StructDecl) -> None:
+        info = self.tags.lookup_local(node.name)
+        if not isinstance(info, StructInfo) or info.node is not node:
+            return
+        own = struct_type(node.name, node.id)
+        for f in node.fields:
+            t = self.resolve(f.type_spec, f)
+            if f.name in info.fields:
+                self.error(f"struct {node.name} declares field '{f.name}' twice", f)
+            elif t is own:
+                self.error(f"struct {node.name} cannot contain itself (field '{f.name}')", f)
+            else:
+                info.fields[f.name] = t
+
+    def _declare_func(self, node: FuncDef) -> Symbol:
+        params = tuple(self.resolve(p.type_spec, node) for p in node.params)
+        ret = VOID if node.is_proc else self.resolve(node.ret_type, node)
+        sym = Symbol(node.name, "func", ret, node, params)
+        if self.values.declare(node.name, sym) is not None:
+            self.error(f"'{node.name}' is already declared in this scope", node)
+        return sym
+
+    def resolve(self, spec: Optional[TypeSpec], where: Node) -> Type:
+        if isinstance(spec, BaseType):
+            return _BASE[spec.kind]
+        if isinstance(spec, ArrayType):
+            base = self.resolve(spec.base, where)
+            return ERROR if base is ERROR else array_of(base, spec.dims)
+        if isinstance(spec, NamedStructType):
+            info = self.tags.lookup(spec.name)
+            if info is None:
+                self.error(f"unknown struct '{spec.name}'", where)
+                return ERROR
+            if isinstance(info, EnumInfo):
+                self.error(f"'{spec.name}' is an enum, not a struct", where)
+                return ERROR
+            return struct_type(spec.name, info.node.id)
+        return ERROR
+
+    # --- операторы ---
+
+    def _block(self, node: Block, work: List[tuple]) -> None:
+        self.values.push()
+        self.tags.push()
+        work.append(("pop",))
+        work.extend(("s", s) for s in reversed(node.stmts))
+
+    def _decl(self, node: Decl, work: List[tuple]) -> None:
+        t = self.resolve(node.type_spec, node)
+        if node.init is not None:
+            it = self.value(node.init)
+            if not assignable(t, it):
+                self.error(f"cannot initialize '{node.name}' of type {t} with a value of type {it}", node)
+        sym = Symbol(node.name, "var", t, node, sized=t.kind != "array" or node.init is not None)
+        if self.values.declare(node.name, sym) is not None:
+            self.error(f"'{node.name}' is already declared in this scope", node)
+
+    def _assign(self, node: Assign, work: List[tuple]) -> None:
+        rt = self.value(node.expr)
+        lv = node.lvalue
+        if isinstance(lv, Ident):
+            sym = self.values.lookup(lv.name)
+            if sym is None:
+                self.error(f"'{lv.name}' is not declared", lv)
+                return
+            if sym.kind == "func":
+                self.error(f"cannot assign to function '{lv.name}'", lv)
+                return
+            if sym.kind == "enum_member":
+                self.error(f"cannot assign to enum member '{lv.name}'", lv)
+                return
+            lt = sym.type
+            sym.sized = True
+        else:
+            lt = self.value(lv)
+        if not assignable(lt, rt):
+            self.error(f"cannot assign a value of type {rt} to {lt}", node)
+
+    def _if(self, node: If, work: List[tuple]) -> None:
+        self._expect_bool(self.value(node.cond), node.cond, "if condition")
+        for branch in (node.else_branch, node.then_branch):
+            if branch is not None:
+                work.append(("pop",))
+                work.append(("s", branch))
+                work.append(("push",))
+
+    def _for(self, node: For, work: List[tuple]) -> None:
+        self.values.push()
+        self.tags.push()
+        work.append(("pop",))
+        if node.init is not None:
+            self._stmt[type(node.init)](node.init, work)
+        if node.cond is not None:
+            self._expect_bool(self.value(node.cond), node.cond, "for condition")
+        if node.step is not None:
+            work.append(("s", node.step))
+        work.append(("s", node.body))
+
+    def _funcdef(self, node: FuncDef, work: List[tuple]) -> None:
+        sym = self._declared.pop(id(node), None)
+        if sym is None:
+            sym = self._declare_func(node)
+        self.values.push()
+        self.tags.push()
+        for p, t in zip(node.params, sym.params):
+            if self.values.declare(p.name, Symbol(p.name, "param", t, p)) is not None:
+                self.error(f"parameter '{p.name}' of '{node.name}' is declared twice", node)
+        self.functions.append(sym)
+        work.append(("endfunc",))
+        # тело и параметры — одна область
+        work.extend(("s", s) for s in reversed(node.body.stmts))
+
+    def _call_stmt(self, node: CallStmt, work: List[tuple]) -> None:
+        args = [self.value(a) for a in node.args]
+        self._check_call(node.name, args, node)
+
+    def _print(self, node: PrintStmt, work: List[tuple]) -> None:
+        t = self.value(node.expr)
+        if t is not ERROR and not t.is_scalar:
+            self.error(f"cannot print a value of type {t}", node.expr)
+
+    def _read(self, node: ReadStmt, work: List[tuple]) -> None:
+        sym = self.values.lookup(node.name)
+        if sym is None:
+            self.error(f"'{node.name}' is not declared", node)
+        elif sym.kind not in ("var", "param"):
+            self.error(f"read() needs a variable, '{node.name}' is a {sym.kind.replace('_', ' ')}", node)
+        elif sym.type not in (INT, REAL, BOOL, ERROR):
+            self.error(f"cannot read a value of type {sym.type}", node)
+
+    def _return(self, node: Return, work: List[tuple]) -> None:
+        t = self.value(node.expr) if node.expr is not None else None
+        if not self.functions:
+            self.error("return outside a function", node)
+            return
+        fn = self.functions[-1]
+        if fn.type is VOID:
+            if t is not None:
+                self.error(f"procedure '{fn.name}' cannot return a value", node)
+        elif t is None:
+            self.error(f"func '{fn.name}' must return a value of type {fn.type}", node)
+        elif not assignable(fn.type, t):
+            self.error(f"func '{fn.name}' returns {fn.type}, not {t}", node)
+
+    def _expr_stmt(self, node: ExprStmt, work: List[tuple]) -> None:
+        self.expr(node.expr)    # вызов процедуры как оператор — без значения, это нормально
+
+    def _struct(self, node: StructDecl, work: List[tuple]) -> None:
+        if id(node) not in self._hoisted:
+            self._declare_tag(node)
+            self._struct_fields(node)
+
+    def _enum(self, node: EnumDecl, work: List[tuple]) -> None:
+        if id(node) not in self._hoisted:
+            self._declare_tag(node)
+
+    # --- выражения ---
+
+    def value(self, node: Node) -> Type:
+        """Тип выражения, которое должно давать значение."""
+        t = self.expr(node)
+        if t is VOID:
+            self.error("procedure call used as a value", node)
+            return ERROR
+        return t
+
+    def expr(self, root: Node) -> Type:
+        """Тип выражения: обход в обратном порядке со стеком значений, без рекурсии."""
+        stack: List[Tuple[Node, bool]] = [(root, False)]
+        out: List[Type] = []
+        record = self._record
+        while stack:
+            node, ready = stack.pop()
+            cls = type(node)
+            if cls is Literal:
+                t = _literal_type(node.value)
+            elif cls is Ident:
+                t = self._ident(node)
+            else:
+                kids = _EXPR_KIDS[cls](node)
+                if not ready:
+                    stack.append((node, True))
+                    stack.extend((k, False) for k in reversed(kids))
+                    continue
+                n = len(kids)
+                args = out[len(out) - n:] if n else []
+                if n:
+                    del out[len(out) - n:]
+                t = self._combine[cls](node, args)
+            out.append(t)
+            if record is not None:
+                record(node, t)
+        return out[0]
+
+    def _expect_bool(self, t: Type, node: Node, what: str) -> None:
+        if t is not BOOL and t is not ERROR:
+            self.error(f"{what} must be bool, not {t}", node)
+
+    def _ident(self, node: Ident) -> Type:
+        sym = self.values.lookup(node.name)
+        if sym is None:
+            self.error(f"'{node.name}' is not declared", node)
+            return ERROR
+        if sym.kind == "func":
+            self.error(f"function '{node.name}' used as a value (call it)", node)
+            return ERROR
+        return sym.type
+
+    def _operands(self, node: Node, types: List[Type]) -> bool:
+        """False, если тип уже не вычислить: ошибка раньше или значение процедуры."""
+        ok = True
+        for t in types:
+            if t is VOID:
+                self.error("procedure call used as a value", node)
+                ok = False
+            elif t is ERROR:
+                ok = False
+        return ok
+
+    def _binop(self, node: BinOp, args: List[Type]) -> Type:
+        if not self._operands(node, args):
+            return ERROR
+        l, r = args
+        op = node.op
+        if op in (OpKind.AND, OpKind.OR):
+            if l is BOOL and r is BOOL:
+                return BOOL
+        elif op in _ARITH or op in _ORDER:
+            if _numeric(l) and _numeric(r):
+                if op in _ORDER:
+                    return BOOL
+                if op is OpKind.DIV and isinstance(node.right, Literal) and node.right.value == 0 \
+                        and not isinstance(node.right.value, bool):
+                    self.warning("division by zero", node)
+                return REAL if REAL in (l, r) else INT
+        elif (_numeric(l) and _numeric(r)) or l is r and l.kind in ("bool", "enum"):
+            return BOOL
+        self.error(f"operator {_OP_TEXT[op]} cannot be applied to {l} and {r}", node)
+        return ERROR
+
+    def _unop(self, node: UnOp, args: List[Type]) -> Type:
+        if not self._operands(node, args):
+            return ERROR
+        t = args[0]
+        if node.op is OpKind.NOT and t is BOOL:
+            return BOOL
+        if node.op is OpKind.NEG and _numeric(t):
+            return REAL if t is REAL else INT
+        self.error(f"operator {_OP_TEXT[node.op]} cannot be applied to {t}", node)
+        return ERROR
+
+    def _index(self, node: IndexExpr, args: List[Type]) -> Type:
+        base, index = args
+        if index is VOID or (index is not ERROR and not (index is INT or index.kind == "enum")):
+            self.error(f"array index must be int, not {index}", node.index)
+        if not self._operands(node, [base]):
+            return ERROR
+        if base.kind != "array":
+            self.error(f"cannot index a value of type {base}", node)
+            return ERROR
+        if isinstance(node.base, Ident):
+            sym = self.values.lookup(node.base.name)
+            if sym is not None and not sym.sized:
+                self.warning(f"array '{sym.name}' is indexed but never given a value "
+                             f"(declared without initializer; arrays have no size)", node.base)
+                sym.sized = True        # одно предупреждение на переменную
+        return base.elem
+
+    def _field(self, node: FieldAccessExpr, args: List[Type]) -> Type:
+        if not self._operands(node, args):
+            return ERROR
+        base = args[0]
+        info = self.structs.get(base) if base.kind == "struct" else None
+        if info is None:
+            self.error(f"cannot access field '{node.field}' of a value of type {base}", node)
+            return ERROR
+        t = info.fields.get(node.field)
+        if t is None:
+            self.error(f"struct {info.name} has no field '{node.field}'", node)
+            return ERROR
+        return t
+
+    def _call(self, node: CallExpr, args: List[Type]) -> Type:
+        return self._check_call(node.callee, args, node)
+
+    def _check_call(self, name: str, args: List[Type], node: Node) -> Type:
+        sym = self.values.lookup(name)
+        if sym is None:
+            self.error(f"function '{name}' is not declared", node)
+            return ERROR
+        if sym.kind != "func":
+            self.error(f"'{name}' is not a function", node)
+            return ERROR
+        if len(args) != len(sym.params):
+            self.error(f"{name}() takes {len(sym.params)} argument(s), got {len(args)}", node)
+        else:
+            for k, (want, got) in enumerate(zip(sym.params, args), 1):
+                if got is VOID:
+                    self.error(f"argument {k} of {name}(): procedure call used as a value", node)
+                elif not assignable(want, got):
+                    self.error(f"argument {k} of {name}() must be {want}, not {got}", node)
+        return sym.type
+
+
+def _literal_type(value) -> Type:
+    if isinstance(value, bool):
+        return BOOL
+    if isinstance(value, int):
+        return INT
+    if isinstance(value, float):
+        return REAL
+    return ERROR
+
+
+def _numeric(t: Type) -> bool:
+    return t is INT or t is REAL or t.kind == "enum"
+
+
+def check(program: Program, positions: Optional[Positions] = None) -> List[Diagnostic]:
+    """Все диагностики программы, отсортированные по позиции."""
+    return Checker(positions).check(program)
+
+
+def check_source(src: str, dataflow: bool = False) -> List[Diagnostic]:
+    """Разбор с позициями и проверка; LexError/ParseError пробрасываются.
+
+    dataflow: добавить предупреждения semantic.dataflow (чтение до присваивания,
+    мёртвые записи, неиспользуемые переменные).
+    """
+    from lexer import Lexer
+    from parser.parser import Parser
+    parser = Parser(Lexer(src).scan_all(), track_positions=True)
+    program = parser.parse()
+    diagnostics = check(program, parser.positions)
+    if dataflow:
+        from semantic.dataflow import analyze
+        diagnostics.extend(analyze(program, parser.positions))
+        diagnostics.sort(key=lambda d: (d.line, d.col))
+    return diagnostics
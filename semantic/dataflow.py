@@ -0,0 +1,205 @@
+"""
+Bitset dataflow over the CFGs of cfg.py: definite assignment and liveness.
+
+    diagnostics = analyze(program, parser.positions)    # warnings, sorted by position
+
+The solvers are generic: per block a `gen` and a `kill` mask, a boundary
+value and a meet (`&` for "on every path", `|` for "on some path"); a
+worklist in block order (forward) or reverse block order (backward)
+iterates until nothing changes.  A set of variables is a Python int, so
+a transfer function is `gen | (x & ~kill)` whatever the number of
+variables, and a block is revisited only when its input changed: in
+practice a few passes over the blocks, as many as the loops are nested.
+
+Clients:
+
+  definite assignment   forward, must: a variable is assigned when every
+                        path to here assigns it.  Reading an int/real/bool
+                        variable that was declared without initializer and
+                        may not be assigned yet is reported (once per
+                        variable).  Arrays and structs count as assigned
+                        when declared: their elements are filled one by one.
+  liveness              backward, may: a variable is live when some path
+                        from here reads it before assigning it.  An
+                        assignment (`x = ...`, an initializer, `read(x)`)
+                        to a variable that is not live after it is a dead
+                        store; a variable that is never read is reported
+                        once at its declaration instead (not for globals,
+                        which functions may read, nor for parameters; a
+                        local that a nested function can see counts as read
+                        by every call after that function's declaration).
+"""
+from __future__ import annotations
+from collections import deque
+from typing import List, Optional, Tuple
+
+from parser.ast import Node, Program, ReadStmt
+from semantic.cfg import CFG, build_cfgs
+from semantic.checker import Diagnostic, Positions
+
+
+def solve_forward(cfg: CFG, gen: List[int], kill: List[int], boundary: int, must: bool) -> List[int]:
+    """IN каждого блока; OUT = gen | (IN & ~kill), IN входа = boundary."""
+    blocks = cfg.blocks
+    top = cfg.all_vars if must else 0
+    outs = [top] * len(blocks)
+    ins = [top] * len(blocks)
+    queued = [True] * len(blocks)
+    work = deque(range(len(blocks)))
+    while work:
+        b = work.popleft()
+        queued[b] = False
+        block = blocks[b]
+        if b == cfg.entry:
+            x = boundary
+        elif must:
+            x = top
+            for p in block.preds:
+                x &= outs[p]
+        else:
+            x = 0
+            for p in block.preds:
+                x |= outs[p]
+        ins[b] = x
+        out = gen[b] | (x & ~kill[b])
+        if out != outs[b]:
+            outs[b] = out
+            for s in block.succs:
+                if not queued[s]:
+                    queued[s] = True
+                    work.append(s)
+    return ins
+
+
+def solve_backward(cfg: CFG, gen: List[int], kill: List[int], boundary: int, must: bool) -> List[int]:
+    """OUT каждого блока; IN = gen | (OUT & ~kill), OUT выхода = boundary."""
+    blocks = cfg.blocks
+    top = cfg.all_vars if must else 0
+    ins = [top] * len(blocks)
+    outs = [top] * len(blocks)
+    queued = [True] * len(blocks)
+    work = deque(range(len(blocks) - 1, -1, -1))
+    while work:
+        b = work.popleft()
+        queued[b] = False
+        block = blocks[b]
+        if b == cfg.exit:
+            x = boundary
+        elif must:
+            x = top
+            for s in block.succs:
+                x &= ins[s]
+        else:
+            x = 0
+            for s in block.succs:
+                x |= ins[s]
+        outs[b] = x
+        new = gen[b] | (x & ~kill[b])
+        if new != ins[b]:
+            ins[b] = new
+            for p in block.preds:
+                if not queued[p]:
+                    queued[p] = True
+                    work.append(p)
+    return outs
+
+
+# --- клиенты ---
+
+def unassigned_reads(cfg: CFG) -> List[Tuple[int, Node]]:
+    """(переменная, Ident) — первое чтение каждой переменной, которая может быть не присвоена."""
+    gen, kill = [], []
+    for block in cfg.blocks:
+        g = k = 0
+        for item in block.items:
+            # объявление без значения (unset) входит и в defs: оно сильнее
+            d = (item.defs | item.call_defs) & ~item.unset
+            g = (g & ~item.unset) | d
+            k = (k & ~d) | item.unset
+        gen.append(g)
+        kill.append(k)
+    ins = solve_forward(cfg, gen, kill, cfg.all_vars, must=True)
+    found: List[Tuple[int, Node]] = []
+    reported = 0
+    for block, state in zip(cfg.blocks, ins):
+        for item in block.items:
+            for index, ident in item.uses:
+                bit = 1 << index
+                if not state & bit and not reported & bit and cfg.vars[index].scalar:
+                    reported |= bit
+                    found.append((index, ident))
+            state = (state | item.defs | item.call_defs) & ~item.unset
+    return found
+
+
+def live_out(cfg: CFG) -> List[int]:
+    gen, kill = [], []
+    for block in cfg.blocks:
+        g = k = 0
+        for item in reversed(block.items):
+            g = (g & ~item.defs) | item.use_mask | item.call_uses
+            k |= item.defs
+        gen.append(g)
+        kill.append(k)
+    return solve_backward(cfg, gen, kill, 0, must=False)
+
+
+def dead_stores(cfg: CFG) -> List[Tuple[int, Node]]:
+    """(переменная, оператор) — присваивания, значение которых никто не прочитает."""
+    found: List[Tuple[int, Node]] = []
+    for block, live in zip(cfg.blocks, live_out(cfg)):
+        for item in reversed(block.items):
+            if item.store >= 0 and not live >> item.store & 1:
+                found.append((item.store, item.node))
+            live = (live & ~item.defs) | item.use_mask | item.call_uses
+    found.reverse()
+    return found
+
+
+def unread_vars(cfg: CFG) -> List[int]:
+    read = 0
+    for block in cfg.blocks:
+        for item in block.items:
+            read |= item.use_mask | item.call_uses
+    return [v.index for v in cfg.vars if not read >> v.index & 1]
+
+
+def analyze_cfg(cfg: CFG, positions: Optional[Positions] = None) -> List[Diagnostic]:
+    positions = positions if positions is not None else {}
+    out: List[Diagnostic] = []
+
+    def warn(message: str, node: Node) -> None:
+        pos = positions.get(node.id, (0, 0))
+        out.append(Diagnostic("warning", message, pos[0], pos[1], node.id))
+
+    for index, ident in unassigned_reads(cfg):
+        warn(f"'{ident.name}' may be used before it is assigned", ident)
+    stores = dead_stores(cfg)
+    stored = {index for index, _ in stores}
+    unused = set()
+    for index in unread_vars(cfg):
+        var = cfg.vars[index]
+        if var.kind != "local":
+            continue
+        unused.add(index)
+        # у непрочитанной переменной мёртвы все записи, включая инициализатор
+        what = "assigned but never used" if index in stored else "declared but never used"
+        warn(f"variable '{var.name}' is {what}", var.node)
+    for index, node in stores:
+        if index in unused:
+            continue
+        name = cfg.vars[index].name
+        if isinstance(node, ReadStmt):
+            warn(f"value read into '{name}' is never used", node)
+        else:
+            warn(f"value assigned to '{name}' is never used", node)
+    return out
+
+
+def analyze(program: Program, positions: Optional[Positions] = None) -> List[Diagnostic]:
+    """Все предупреждения обоих анализов по всем функциям, по позиции."""
+    out: List[Diagnostic] = []
+    for cfg in build_cfgs(program):
+        out.extend(analyze_cfg(cfg, positions))
+    out.sort(key=lambda d: (d.line, d.col))
+    return out
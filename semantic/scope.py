@@ -0,0 +1,55 @@
+"""
+Scoped symbol table with O(1) lookups.
+
+Instead of a chain of per-scope dicts (a lookup walks the chain, O(depth)),
+every name maps to a stack of its visible bindings, innermost last, and
+every scope remembers which names it bound.  `lookup` reads the top of one
+stack; `pop` removes exactly the bindings the closing scope made.
+"""
+from __future__ import annotations
+from typing import Dict, Generic, List, Optional, Tuple, TypeVar
+
+V = TypeVar("V")
+
+
+class ScopedTable(Generic[V]):
+    def __init__(self) -> None:
+        # имя -> [(глубина области, значение), ...]
+        self._bindings: Dict[str, List[Tuple[int, V]]] = {}
+        self._scopes: List[List[str]] = [[]]
+
+    @property
+    def depth(self) -> int:
+        return len(self._scopes)
+
+    def push(self) -> None:
+        self._scopes.append([])
+
+    def pop(self) -> None:
+        for name in self._scopes.pop():
+            stack = self._bindings[name]
+            stack.pop()
+            if not stack:
+                del self._bindings[name]
+
+    def declare(self, name: str, value: V) -> Optional[V]:
+        """Объявить в текущей области; если имя там уже есть — вернуть прежнее значение."""
+        stack = self._bindings.get(name)
+        if stack is None:
+            stack = self._bindings[name] = []
+        elif stack[-1][0] == len(self._scopes):
+            return stack[-1][1]
+        stack.append((len(self._scopes), value))
+        self._scopes[-1].append(name)
+        return None
+
+    def lookup(self, name: str) -> Optional[V]:
+        stack = self._bindings.get(name)
+        return stack[-1][1] if stack else None
+
+    def lookup_local(self, name: str) -> Optional[V]:
+        """Только текущая область."""
+        stack = self._bindings.get(name)
+        if stack and stack[-1][0] == len(self._scopes):
+            return stack[-1][1]
+        return None
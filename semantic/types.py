@@ -0,0 +1,80 @@
+"""
+Resolved types of the semantic checker.
+
+Types are interned: there is one object per distinct type, so they are
+compared with `is` and can be used as dict keys for free.  Build them only
+through the constructors below (`array_of`, `struct_type`, `enum_type`).
+A struct or enum type is identified by its declaration, not its name: a
+nested `struct S` that shadows an outer one is a different type that only
+prints the same.
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+
+@dataclass(frozen=True, eq=False)
+class Type:
+    kind: str                       # int real bool struct enum array void error
+    name: str = ""                  # struct/enum
+    elem: Optional["Type"] = None   # array: тип элемента (может быть массивом)
+    decl: int = 0                   # struct/enum: id узла объявления
+
+    def __str__(self) -> str:
+        if self.kind == "array":
+            return f"{self.elem}[]"
+        if self.kind in ("struct", "enum"):
+            return f"{self.kind} {self.name}"
+        return self.kind
+
+    @property
+    def is_numeric(self) -> bool:
+        return self.kind in ("int", "real")
+
+    @property
+    def is_scalar(self) -> bool:
+        return self.kind in ("int", "real", "bool", "enum")
+
+
+INT = Type("int")
+REAL = Type("real")
+BOOL = Type("bool")
+VOID = Type("void")      # результат вызова процедуры
+ERROR = Type("error")    # уже сообщённая ошибка: дальше не ругаемся
+
+_ARRAYS: Dict[int, Type] = {}
+_NAMED: Dict[Tuple[str, str, int], Type] = {}
+
+
+def array_of(elem: Type, dims: int = 1) -> Type:
+    t = elem
+    for _ in range(dims):
+        a = _ARRAYS.get(id(t))
+        if a is None:
+            a = _ARRAYS[id(t)] = Type("array", elem=t)
+        t = a
+    return t
+
+
+def struct_type(name: str, decl: int) -> Type:
+    """Тип структуры, объявленной узлом с id decl (имя — только для вывода)."""
+    t = _NAMED.get(("struct", name, decl))
+    if t is None:
+        t = _NAMED[("struct", name, decl)] = Type("struct", name, decl=decl)
+    return t
+
+
+def enum_type(name: str, decl: int) -> Type:
+    t = _NAMED.get(("enum", name, decl))
+    if t is None:
+        t = _NAMED[("enum", name, decl)] = Type("enum", name, decl=decl)
+    return t
+
+
+def assignable(dst: Type, src: Type) -> bool:
+    """Можно ли значение типа src записать в место типа dst (int -> real, enum -> int)."""
+    if dst is src or dst is ERROR or src is ERROR:
+        return True
+    if dst is REAL and src is INT:
+        return True
+    return dst is INT and src.kind == "enum"
@@ -0,0 +1,7 @@
+from .collect import Definition, Reference, collect, collect_source
+from .index import SymbolIndex, IndexStats, DEFAULT_DB
+
+__all__ = [
+    "Definition", "Reference", "collect", "collect_source",
+    "SymbolIndex", "IndexStats", "DEFAULT_DB",
+]
@@ -0,0 +1,95 @@
+"""
+Command line for the symbol index.
+
+    python -m symbols [--db PATH] index [--jobs N] PATH...   files, dirs (all *.txt below) or globs
+    python -m symbols [--db PATH] defs NAME [--kind KIND]
+    python -m symbols [--db PATH] refs NAME [--kind KIND]
+    python -m symbols [--db PATH] files NAME [--kind KIND]   files that define NAME
+    python -m symbols [--db PATH] errors                     files that failed to parse
+
+Results are printed as `path:line:col: kind name [in container]`, paths
+relative to the current directory.  Lookups exit 1 when nothing matches.
+`index` drops files that disappeared from disk and prints a summary to
+stderr; `errors` lists the messages of the files that failed.
+"""
+from __future__ import annotations
+import argparse
+import os
+import sys
+from typing import List
+
+from symbols.index import DEFAULT_DB, SymbolIndex
+
+DEF_KINDS = ("func", "proc", "struct", "field", "enum", "var")
+REF_KINDS = ("call", "ident", "field")
+
+
+def _expand(paths: List[str]) -> List[str]:
+    from main.batch import expand_paths
+    files: List[str] = []
+    for p in paths:
+        if os.path.isdir(p):
+            for root, dirs, names in os.walk(p):
+                dirs.sort()
+                files.extend(os.path.join(root, n) for n in sorted(names) if n.endswith(".txt"))
+        else:
+            matched, unmatched = expand_paths([p])
+            files.extend(matched)
+            for pattern in unmatched:
+                print(f"[symbols] no files match {pattern}", file=sys.stderr)
+    # каталог и файл в нём, два пересекающихся шаблона: каждый файл один раз
+    seen = set()
+    unique = []
+    for f in files:
+        key = os.path.abspath(f)
+        if key not in seen:
+            seen.add(key)
+            unique.append(f)
+    return unique
+
+
+def _show(path: str) -> str:
+    rel = os.path.relpath(path)
+    return path if rel.startswith("..") else rel
+
+
+def _print(items) -> int:
+    for it in items:
+        where = f" in {it.container}" if it.container else ""
+        print(f"{_show(it.path)}:{it.line}:{it.col}: {it.kind} {it.name}{where}")
+    return 0 if items else 1
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m symbols", description="Cross-file symbol index")
+    ap.add_argument("--db", default=DEFAULT_DB, help=f"index file (default {DEFAULT_DB})")
+    sub = ap.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("index", help="(re)index changed files")
+    p.add_argument("paths", nargs="+")
+    p.add_argument("--jobs", type=int, default=1, help="worker processes for parsing; 0 = all CPUs")
+    for name, kinds in (("defs", DEF_KINDS), ("refs", REF_KINDS), ("files", DEF_KINDS)):
+        p = sub.add_parser(name)
+        p.add_argument("name")
+        p.add_argument("--kind", choices=kinds)
+    sub.add_parser("errors")
+    args = ap.parse_args(argv)
+
+    with SymbolIndex(args.db) as idx:
+        if args.command == "index":
+            stats = idx.update(_expand(args.paths), jobs=args.jobs)
+            stats.removed += idx.prune()
+            print(f"[symbols] {stats}", file=sys.stderr)
+            return 0
+        if args.command == "defs":
+            return _print(idx.definitions(args.name, args.kind))
+        if args.command == "refs":
+            return _print(idx.references(args.name, args.kind))
+        if args.command == "files":
+            found = idx.files_defining(args.name, args.kind)
+            for path in found:
+                print(_show(path))
+            return 0 if found else 1
+        errors = idx.errors()
+        for path, error in errors:
+            print(f"{_show(path)}: {error}")
+        return 0
@@ -0,0 +1,108 @@
+"""
+Definitions and references of one Program.
+
+Definitions: func/proc (FuncDef), struct (StructDecl), field (FieldDecl),
+enum (EnumDecl), var (Decl).  References: call (CallExpr, CallStmt),
+ident (Ident, the target of `read`), field (FieldAccessExpr).
+
+Positions come from `Parser(..., track_positions=True)`: a definition is
+placed at the start of its statement, a reference at its name (for a
+field access, the field name after the dot; for `read(x)`, the `x`, found
+in `tokens` when they are passed).  A node without a recorded
+position (a `Decl` in a `for` header) gets the position of the nearest
+enclosing node that has one.  `container` is the enclosing function or
+struct, "" at top level.
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from lexer.tokens import Token
+from parser.ast import (
+    Node, FuncDef, StructDecl, FieldDecl, EnumDecl, Decl,
+    CallExpr, CallStmt, Ident, ReadStmt, FieldAccessExpr,
+)
+
+Positions = Dict[int, Tuple[int, int, int, int]]
+
+
+@dataclass(frozen=True)
+class Definition:
+    name: str
+    kind: str
+    line: int
+    col: int
+    end_line: int
+    end_col: int
+    container: str
+    path: str = ""     # заполняется при выборке из индекса
+
+
+@dataclass(frozen=True)
+class Reference:
+    name: str
+    kind: str
+    line: int
+    col: int
+    container: str
+    path: str = ""
+
+
+def collect(program: Node, positions: Positions,
+            tokens: Optional[List[Token]] = None) -> Tuple[List[Definition], List[Reference]]:
+    defs: List[Definition] = []
+    refs: List[Reference] = []
+    starts: Optional[Dict[Tuple[int, int], int]] = None    # (строка, столбец) токена -> индекс
+    unknown = (1, 1, 1, 1)
+    # (узел, контейнер, позиция ближайшего предка с позицией); без рекурсии
+    stack: List[Tuple[Node, str, Tuple[int, int, int, int]]] = [(program, "", unknown)]
+    while stack:
+        node, container, outer = stack.pop()
+        pos = positions.get(node.id, outer)
+        line, col, end_line, end_col = pos
+        inner = container
+        if isinstance(node, FuncDef):
+            defs.append(Definition(node.name, "proc" if node.is_proc else "func", line, col, end_line, end_col,
+                                   container))
+            inner = node.name
+        elif isinstance(node, StructDecl):
+            defs.append(Definition(node.name, "struct", line, col, end_line, end_col, container))
+            inner = node.name
+        elif isinstance(node, FieldDecl):
+            defs.append(Definition(node.name, "field", line, col, end_line, end_col, container))
+        elif isinstance(node, EnumDecl):
+            defs.append(Definition(node.name, "enum", line, col, end_line, end_col, container))
+        elif isinstance(node, Decl):
+            defs.append(Definition(node.name, "var", line, col, end_line, end_col, container))
+        elif isinstance(node, (CallExpr, CallStmt)):
+            refs.append(Reference(node.callee if isinstance(node, CallExpr) else node.name, "call", line, col,
+                                  container))
+        elif isinstance(node, Ident):
+            refs.append(Reference(node.name, "ident", line, col, container))
+        elif isinstance(node, ReadStmt):
+            # позиция оператора — у `read`; имя — через два токена: read ( x )
+            if tokens is not None:
+                if starts is None:
+                    starts = {(t.line, t.col): i for i, t in enumerate(tokens)}
+                i = starts.get((line, col))
+                if i is not None and i + 2 < len(tokens):
+                    line, col = tokens[i + 2].line, tokens[i + 2].col
+            refs.append(Reference(node.name, "ident", line, col, container))
+        elif isinstance(node, FieldAccessExpr):
+            # позиция узла — от начала базы; имя поля стоит в конце
+            refs.append(Reference(node.field, "field", end_line, end_col - len(node.field), container))
+        for child in reversed(list(node.children())):
+            stack.append((child, inner, pos))
+    return defs, refs
+
+
+def collect_source(src: str) -> Tuple[List[Definition], List[Reference]]:
+    """Разобрать текст и собрать символы; LexError/ParseError пробрасываются."""
+    from lexer import Lexer
+    from parser.ast import _reset_ids
+    from parser.parser import Parser
+    _reset_ids()
+    tokens = Lexer(src).scan_all()
+    parser = Parser(tokens, track_positions=True)
+    program = parser.parse()
+    return collect(program, parser.positions, tokens)
@@ -0,0 +1,227 @@
+"""
+Persistent cross-file symbol index in SQLite.
+
+    with SymbolIndex("symbols.db") as idx:
+        idx.update(paths)                    # only changed files are parsed
+        idx.references("zadatak", kind="call")
+        idx.files_defining("Point", kind="struct")
+
+Every file row keeps (mtime, size) and the SHA-256 of its bytes.  On
+update a file whose stat is unchanged is skipped without reading it; a
+file whose bytes hash the same only gets its stat refreshed; everything
+else is parsed again (optionally in worker processes) and its rows are
+replaced in one transaction.  A file that fails to lex/parse (or is
+nested too deeply for the recursive parser) keeps its error text and no
+symbols.  A file listed twice is indexed once.  Lookups go through indexes on the symbol name,
+so they cost a B-tree search plus the rows returned.
+"""
+from __future__ import annotations
+import hashlib
+import os
+import sqlite3
+import time
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Tuple
+
+from symbols.collect import Definition, Reference
+
+DEFAULT_DB = ".minilang-symbols.db"
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    sha256 BLOB NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS defs (
+    file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    name TEXT NOT NULL, kind TEXT NOT NULL,
+    line INTEGER NOT NULL, col INTEGER NOT NULL, end_line INTEGER NOT NULL, end_col INTEGER NOT NULL,
+    container TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS refs (
+    file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    name TEXT NOT NULL, kind TEXT NOT NULL,
+    line INTEGER NOT NULL, col INTEGER NOT NULL,
+    container TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS defs_name ON defs(name, kind);
+CREATE INDEX IF NOT EXISTS refs_name ON refs(name, kind);
+CREATE INDEX IF NOT EXISTS defs_file ON defs(file_id);
+CREATE INDEX IF NOT EXISTS refs_file ON refs(file_id);
+"""
+
+# (путь, ошибка или None, определения, ссылки)
+_Analysis = Tuple[str, Optional[str], List[Definition], List[Reference]]
+
+
+@dataclass
+class IndexStats:
+    indexed: int = 0
+    unchanged: int = 0
+    failed: int = 0
+    removed: int = 0
+    seconds: float = 0.0
+
+    def __str__(self) -> str:
+        return (f"{self.indexed} indexed, {self.unchanged} unchanged, {self.failed} failed, "
+                f"{self.removed} removed in {self.seconds:.2f}s")
+
+
+def _analyse(task: Tuple[str, bytes]) -> _Analysis:
+    """Разбор одного файла; выполняется и в рабочих процессах."""
+    from lexer import LexError
+    from parser.errors import ParseError
+    from symbols.collect import collect_source
+    path, data = task
+    try:
+        defs, refs = collect_source(data.decode("utf-8"))
+    except (LexError, ParseError, UnicodeDecodeError) as e:
+        return path, str(e), [], []
+    except RecursionError:
+        return path, "nested too deeply to parse", [], []
+    return path, None, defs, refs
+
+
+class SymbolIndex:
+    def __init__(self, db_path: str = DEFAULT_DB) -> None:
+        self.db_path = db_path
+        self.db = sqlite3.connect(db_path)
+        self.db.execute("PRAGMA foreign_keys = ON")
+        self.db.execute("PRAGMA journal_mode = WAL")
+        self.db.execute("PRAGMA synchronous = NORMAL")
+        version = self.db.execute("PRAGMA user_version").fetchone()[0]
+        if version not in (0, SCHEMA_VERSION):
+            # схема поменялась: индекс — это кэш, проще построить заново
+            with self.db:
+                for table in ("refs", "defs", "files"):
+                    self.db.execute(f"DROP TABLE IF EXISTS {table}")
+        with self.db:
+            self.db.executescript(_SCHEMA)
+            self.db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def close(self) -> None:
+        self.db.close()
+
+    def __enter__(self) -> "SymbolIndex":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # --- обновление ---
+
+    def update(self, paths: Iterable[str], jobs: int = 1) -> IndexStats:
+        """Переиндексировать изменившиеся файлы из paths (пропавшие с диска — удалить)."""
+        start = time.perf_counter()
+        stats = IndexStats()
+        known = {row[0]: row[1:] for row in self.db.execute("SELECT path, id, sha256, mtime_ns, size FROM files")}
+        tasks: List[Tuple[str, bytes]] = []
+        stat_only: List[Tuple[int, int, int]] = []
+        new_stat = {}
+        gone: List[str] = []
+        seen = set()
+        for p in paths:
+            path = os.path.abspath(p)
+            if path in seen:
+                continue
+            seen.add(path)
+            try:
+                st = os.stat(path)
+            except OSError:
+                if path in known:
+                    gone.append(path)
+                continue
+            row = known.get(path)
+            if row is not None and row[2] == st.st_mtime_ns and row[3] == st.st_size:
+                stats.unchanged += 1
+                continue
+            try:
+                with open(path, "rb") as f:
+                    data = f.read()
+            except OSError:
+                continue
+            digest = hashlib.sha256(data).digest()
+            if row is not None and row[1] == digest:
+                # touch без правки содержимого: символы те же
+                stat_only.append((st.st_mtime_ns, st.st_size, row[0]))
+                stats.unchanged += 1
+                continue
+            new_stat[path] = (digest, st.st_mtime_ns, st.st_size)
+            tasks.append((path, data))
+
+        with self.db:
+            self.db.executemany("UPDATE files SET mtime_ns = ?, size = ? WHERE id = ?", stat_only)
+            for path in gone:
+                self.db.execute("DELETE FROM files WHERE path = ?", (path,))
+            stats.removed = len(gone)
+            for path, error, defs, refs in self._analyse_all(tasks, jobs):
+                digest, mtime_ns, size = new_stat[path]
+                row = known.get(path)
+                if row is None:
+                    file_id = self.db.execute(
+                        "INSERT INTO files (path, sha256, mtime_ns, size, error) VALUES (?, ?, ?, ?, ?)",
+                        (path, digest, mtime_ns, size, error)).lastrowid
+                else:
+                    file_id = row[0]
+                    self.db.execute("DELETE FROM defs WHERE file_id = ?", (file_id,))
+                    self.db.execute("DELETE FROM refs WHERE file_id = ?", (file_id,))
+                    self.db.execute("UPDATE files SET sha256 = ?, mtime_ns = ?, size = ?, error = ? WHERE id = ?",
+                                    (digest, mtime_ns, size, error, file_id))
+                self.db.executemany(
+                    "INSERT INTO defs VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(file_id, d.name, d.kind, d.line, d.col, d.end_line, d.end_col, d.container) for d in defs])
+                self.db.executemany(
+                    "INSERT INTO refs VALUES (?, ?, ?, ?, ?, ?)",
+                    [(file_id, r.name, r.kind, r.line, r.col, r.container) for r in refs])
+                if error is None:
+                    stats.indexed += 1
+                else:
+                    stats.failed += 1
+        stats.seconds = time.perf_counter() - start
+        return stats
+
+    @staticmethod
+    def _analyse_all(tasks: List[Tuple[str, bytes]], jobs: int):
+        if jobs == 1 or len(tasks) < 2:
+            return map(_analyse, tasks)
+        from concurrent.futures import ProcessPoolExecutor
+        workers = jobs or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(_analyse, tasks, chunksize=max(1, min(64, len(tasks) // (workers * 4)))))
+
+    def prune(self) -> int:
+        """Удалить из индекса файлы, которых больше нет на диске."""
+        gone = [(p,) for (p,) in self.db.execute("SELECT path FROM files") if not os.path.exists(p)]
+        with self.db:
+            self.db.executemany("DELETE FROM files WHERE path = ?", gone)
+        return len(gone)
+
+    # --- запросы ---
+
+    def definitions(self, name: str, kind: Optional[str] = None) -> List[Definition]:
+        sql = ("SELECT d.name, d.kind, d.line, d.col, d.end_line, d.end_col, d.container, f.path "
+               "FROM defs d JOIN files f ON f.id = d.file_id WHERE d.name = ?")
+        return [Definition(*row) for row in self._select(sql, name, kind, "d")]
+
+    def references(self, name: str, kind: Optional[str] = None) -> List[Reference]:
+        sql = ("SELECT r.name, r.kind, r.line, r.col, r.container, f.path "
+               "FROM refs r JOIN files f ON f.id = r.file_id WHERE r.name = ?")
+        return [Reference(*row) for row in self._select(sql, name, kind, "r")]
+
+    def files_defining(self, name: str, kind: Optional[str] = None) -> List[str]:
+        return sorted({d.path for d in self.definitions(name, kind)})
+
+    def errors(self) -> List[Tuple[str, str]]:
+        return list(self.db.execute("SELECT path, error FROM files WHERE error IS NOT NULL ORDER BY path"))
+
+    def _select(self, sql: str, name: str, kind: Optional[str], alias: str):
+        params: Tuple = (name,)
+        if kind is not None:
+            sql += f" AND {alias}.kind = ?"
+            params = (name, kind)
+        return self.db.execute(sql + f" ORDER BY f.path, {alias}.line, {alias}.col", params)
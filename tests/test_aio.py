@@ -0,0 +1,62 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from lexer import LexError
+from parser import parse_many, parse_path, parse_source
+from parser.errors import ParseError
+
+
+def write(tmp_path, name, text):
+    p = tmp_path / name
+    p.write_text(text, encoding="utf-8")
+    return str(p)
+
+
+def test_parse_source_and_errors():
+    async def go():
+        program = await parse_source("int a; print(a);")
+        assert [type(s).__name__ for s in program.stmts] == ["Decl", "PrintStmt"]
+        with pytest.raises(ParseError):
+            await parse_source("int a")
+        with pytest.raises(LexError):
+            await parse_source("int @;")
+    asyncio.run(go())
+
+
+def test_parse_many_as_completed(tmp_path):
+    good = [write(tmp_path, f"g{i}.txt", f"int x{i} = {i};") for i in range(20)]
+    bad = write(tmp_path, "bad.txt", "int a")
+    missing = str(tmp_path / "missing.txt")
+
+    async def go():
+        return [r async for r in parse_many(good + [bad, missing], concurrency=4)]
+    results = {r.path: r for r in asyncio.run(go())}
+    assert len(results) == 22
+    assert all(results[p].ok and results[p].program.stmts[0].name == f"x{i}" for i, p in enumerate(good))
+    assert isinstance(results[bad].error, ParseError)
+    assert isinstance(results[missing].error, OSError)
+
+
+def test_process_executor_matches_thread(tmp_path):
+    path = write(tmp_path, "a.txt", "func int f(int a) { return a * 2; } print(f(3));")
+
+    async def go():
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            return await parse_path(path), await parse_path(path, executor=pool)
+    threaded, processed = asyncio.run(go())
+    assert processed.to_json() == threaded.to_json()
+
+
+def test_timeout_and_early_close(tmp_path):
+    paths = [write(tmp_path, f"f{i}.txt", "int a;") for i in range(50)]
+
+    async def go():
+        with pytest.raises(asyncio.TimeoutError):
+            await parse_path(paths[0], timeout=0)
+        gen = parse_many(paths, concurrency=2)
+        first = await gen.__anext__()
+        await gen.aclose()                # остальные задачи отменены, генератор не висит
+        return first
+    assert asyncio.run(go()).ok
@@ -0,0 +1,60 @@
+from parser.ast import Expr, FieldAccessExpr
+from semantic import annotate_source
+from semantic.types import INT, REAL, BOOL, ERROR, array_of, struct_type
+
+SRC = ("struct Point { int x; real y; struct Line l; }\n"
+       "struct Line { int a; int b; }\n"
+       "struct Point[] pts;\n"
+       "struct Point p;\n"
+       "int i;\n"
+       "p.y = p.x + 2.5;\n"
+       "i = p.l.b;\n"
+       "pts[i].l.a = p.q;\n"
+       "print(pts[0].y > 1);\n")
+
+
+def expressions(node):
+    stack = [node]
+    while stack:
+        n = stack.pop()
+        if isinstance(n, Expr):
+            yield n
+        stack.extend(n.children())
+
+
+def test_struct_layouts():
+    _, ann = annotate_source(SRC)
+    point, line = ann.layouts
+    assert [(f.name, f.index) for f in point.fields] == [("x", 0), ("y", 1), ("l", 2)]
+    assert point.slot("l").type is struct_type("Line", line.node.id)
+    assert line.slot("b").index == 1 and len(line) == 2
+    assert ann.layout_of(struct_type("Point", point.node.id)) is point and point.node.layout is point
+
+
+def test_every_expression_typed_and_fields_resolved():
+    program, ann = annotate_source(SRC)
+    exprs = list(expressions(program))
+    assert all(e.sem_type is not None for e in exprs)
+    assert ann.expressions == len(exprs)
+    by_stmt = program.stmts
+    assert by_stmt[5].lvalue.sem_type is REAL and by_stmt[5].expr.sem_type is REAL
+    assert by_stmt[6].lvalue.sem_type is INT
+    assert by_stmt[8].expr.sem_type is BOOL
+    point = struct_type("Point", ann.layouts[0].node.id)
+    assert by_stmt[7].lvalue.base.base.base.sem_type is array_of(point)
+    slots = [(e.field, e.slot) for e in exprs if isinstance(e, FieldAccessExpr)]
+    assert sorted(slots) == [("a", 0), ("b", 1), ("l", 2), ("l", 2), ("q", -1),
+                             ("x", 0), ("y", 1), ("y", 1)]
+    assert by_stmt[7].expr.sem_type is ERROR
+    assert [d.message for d in ann.diagnostics if d.severity == "error"] == ["struct Point has no field 'q'"]
+
+
+def test_shadowed_struct_gets_its_own_layout():
+    program, ann = annotate_source("struct S { int a; } struct S s;\n"
+                                   "{ struct S { bool b; int a; } struct S t; t.a = s.a; }\n")
+    outer, inner = ann.layouts
+    assert ann.layout_of(struct_type("S", outer.node.id)) is outer
+    assert ann.layout_of(struct_type("S", inner.node.id)) is inner
+    assign = program.stmts[2].stmts[2]
+    assert (assign.lvalue.slot, assign.expr.slot) == (1, 0)
+    assert ann.diagnostics == []
@@ -0,0 +1,73 @@
+from lexer import scan_all
+from parser import parse, diff
+from parser.ast import Assign, Literal, PrintStmt
+
+
+def parse_src(src: str, **kw):
+    return parse(scan_all(src), **kw)
+
+
+def test_struct_hash_ignores_ids():
+    a = parse_src("int x = 1; if (x < 2) { print(x); }")
+    b = parse_src("int x = 1; if (x < 2) { print(x); }")
+    assert a.id != b.id
+    assert a.struct_hash() == b.struct_hash()
+    assert len(a.struct_hash()) == 16
+
+
+def test_struct_hash_distinguishes_literal_types():
+    assert parse_src("1;").struct_hash() != parse_src("true;").struct_hash()
+    assert parse_src("1;").struct_hash() != parse_src("1.0;").struct_hash()
+
+
+def test_identical_programs_have_empty_diff():
+    src = "func int f(int a) { return a * 2; } print(f(3));"
+    d = diff(parse_src(src), parse_src(src))
+    assert not d
+    assert d.changes() == []
+
+
+def test_changed_literal_is_reported_at_its_path():
+    old = parse_src("int a = 1; a = 2; print(a);")
+    new = parse_src("int a = 1; a = 3; print(a);")
+    d = diff(old, new)
+    assert [c.kind for c in d.changes()] == ["changed"]
+    ch = d.changed[0]
+    assert isinstance(ch.old, Literal) and ch.old.value == 2 and ch.new.value == 3
+    assert ch.new_path == "stmts[1].expr"
+
+
+def test_inserted_and_deleted_statements():
+    old = parse_src("int a; print(a); read(a);")
+    new = parse_src("int a; read(a); a = 5;")
+    d = diff(old, new)
+    assert [type(c.old).__name__ for c in d.deleted] == ["PrintStmt"]
+    assert [type(c.new).__name__ for c in d.inserted] == ["Assign"]
+    assert not d.moved
+
+
+def test_reordered_statements_are_moves():
+    old = parse_src("print(1); print(2); print(3);")
+    new = parse_src("print(3); print(1); print(2);")
+    d = diff(old, new)
+    assert not d.inserted and not d.deleted and not d.changed
+    assert len(d.moved) == 1
+    assert isinstance(d.moved[0].new, PrintStmt)
+    assert d.moved[0].old_path == "stmts[2]" and d.moved[0].new_path == "stmts[0]"
+
+
+def test_move_across_blocks():
+    old = parse_src("{ x = 1; y = 2; } { z = 3; }")
+    new = parse_src("{ y = 2; } { z = 3; x = 1; }")
+    d = diff(old, new)
+    assert len(d.moved) == 1 and isinstance(d.moved[0].old, Assign)
+    assert d.moved[0].old_path == "stmts[0].stmts[0]"
+    assert d.moved[0].new_path == "stmts[1].stmts[1]"
+    assert not d.inserted and not d.deleted
+
+
+def test_hashcons_trees_diff_like_plain_ones():
+    old = parse_src("x = i + 1; y = i + 1;", hashcons=True)
+    new = parse_src("x = i + 1; y = i + 2;")
+    d = diff(old, new)
+    assert len(d.changed) == 1 and d.changed[0].new_path == "stmts[1].expr.right"
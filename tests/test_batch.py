@@ -0,0 +1,70 @@
+import io
+import json
+
+from main.batch import expand_paths, run_batch, output_path
+from main.main import main
+
+
+def write(tmp_path, name, text):
+    p = tmp_path / name
+    p.write_text(text, encoding="utf-8")
+    return str(p)
+
+
+def test_expand_paths_globs_and_dedup(tmp_path):
+    a = write(tmp_path, "a.txt", "int a;")
+    b = write(tmp_path, "b.txt", "int b;")
+    files, unmatched = expand_paths([str(tmp_path / "*.txt"), a, str(tmp_path / "*.none")])
+    assert files == [a, b]
+    assert unmatched == [str(tmp_path / "*.none")]
+
+
+def test_combined_ndjson_stream(tmp_path):
+    good = write(tmp_path, "good.txt", "int a; print(a);")
+    bad = write(tmp_path, "bad.txt", "int a")
+    out, err = io.StringIO(), io.StringIO()
+    code = run_batch([good, bad], "json", ids=False, out=out, err=err)
+    assert code == 1
+    first, second = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert first["path"] == good and first["ok"] is True
+    assert first["ast"]["type"] == "Program" and "id" not in first["ast"]
+    assert second == {"path": bad, "ok": False, "error": second["error"]}
+    assert "PARSE ERROR" in second["error"]
+    assert "2 files, 1 ok, 1 failed" in err.getvalue()
+
+
+def test_ids_restart_per_file(tmp_path):
+    a = write(tmp_path, "a.txt", "int a;")
+    b = write(tmp_path, "b.txt", "int b;")
+    out = io.StringIO()
+    assert run_batch([a, b], "json-compact", ids=True, out=out, err=io.StringIO()) == 0
+    first, second = [json.loads(line)["ast"] for line in out.getvalue().splitlines()]
+    assert first["id"] == second["id"]
+
+
+def test_out_dir_and_jobs(tmp_path):
+    paths = [write(tmp_path, f"f{i}.txt", f"int x{i} = {i};") for i in range(4)]
+    out_dir = tmp_path / "out"
+    assert main(paths + ["--json", "--jobs", "2", "--out-dir", str(out_dir)]) == 0
+    for i, p in enumerate(paths):
+        data = json.loads(output_path(str(out_dir), p, "json").read_text(encoding="utf-8"))
+        assert data["stmts"][0]["name"] == f"x{i}"
+
+
+def test_check_mode_summary(tmp_path, capsys):
+    ok = write(tmp_path, "ok.txt", "int a;\n")
+    messy = write(tmp_path, "messy.txt", "int   a;\n")
+    assert main([ok, messy, "--check"]) == 1
+    captured = capsys.readouterr()
+    records = [json.loads(line) for line in captured.out.splitlines()]
+    assert [r["ok"] for r in records] == [True, False]
+    assert f"{messy}:1:5: not formatted" in captured.err
+
+
+def test_semantic_warnings_of_ok_files(tmp_path, capsys):
+    warned = write(tmp_path, "warned.txt", "int x;\nprint(x);\n")
+    clean = write(tmp_path, "clean.txt", "int y = 1;\nprint(y);\n")
+    assert main([warned, clean, "--semantic"]) == 0
+    captured = capsys.readouterr()
+    assert [json.loads(line)["ok"] for line in captured.out.splitlines()] == [True, True]
+    assert f"{warned}:2:7: warning: 'x' may be used before it is assigned" in captured.err
@@ -0,0 +1,82 @@
+import io
+import pathlib
+
+import pytest
+from lexer import scan_all
+from parser import parse, load_binary, loads_binary, dumps_binary, BinaryFormatError
+from parser.ast import Program, Block, PrintStmt, Ident, Literal
+
+EXAMPLES = pathlib.Path(__file__).resolve().parents[1] / "examples"
+
+SRC = """
+enum Color { Red, Green }
+enum Empty { }
+struct P { int x; real[][] ys; struct Q[] qs; }
+func real f(int a, struct P[] ps) { return a * 2.5 + ps[0].ys[a][1]; }
+proc g() { return; }
+int n = -3; bool b = !true && n <= 2 || false;
+for (int i = 0; i < 100000000000; i = i + 1) { if (i == 1) print(f(i, ps)); else { read(i); } }
+x.y = g();
+"""
+
+
+def roundtrip(prog):
+    buf = io.BytesIO()
+    prog.dump_binary(buf)
+    buf.seek(0)
+    return load_binary(buf)
+
+
+def test_roundtrip_preserves_classes_fields_and_ids():
+    prog = parse(scan_all(SRC))
+    back = roundtrip(prog)
+    assert back == prog                     # dataclass eq: все поля, включая id
+    assert back.to_json() == prog.to_json()
+    assert back.pretty() == prog.pretty()
+
+
+def test_examples_roundtrip():
+    for path in sorted(EXAMPLES.glob("valid*.txt")):
+        prog = parse(scan_all(path.read_text(encoding="utf-8")))
+        assert roundtrip(prog).to_json() == prog.to_json(), path.name
+
+
+def test_literal_types_survive():
+    prog = parse(scan_all("1; 1.0; true; false; 0;"))
+    vals = [s.expr.value for s in roundtrip(prog).stmts]
+    assert [type(v) for v in vals] == [int, float, bool, bool, int]
+    assert vals == [1, 1.0, True, False, 0]
+
+
+def test_id_counter_moves_past_loaded_ids():
+    prog = Program(stmts=[])
+    prog.id = 10 ** 9
+    back = loads_binary(dumps_binary(prog))
+    assert back.id == 10 ** 9
+    assert Literal(value=1).id > 10 ** 9
+
+
+def test_deep_tree_roundtrip():
+    node = PrintStmt(expr=Ident(name="x"))
+    for _ in range(20000):
+        node = Block(stmts=[node])
+    prog = Program(stmts=[node])
+    back = loads_binary(dumps_binary(prog))
+    depth = 0
+    cur = back.stmts[0]
+    while isinstance(cur, Block):
+        cur = cur.stmts[0]
+        depth += 1
+    assert depth == 20000 and cur.expr.name == "x"
+
+
+def test_binary_is_smaller_than_json():
+    prog = parse(scan_all(SRC * 20))
+    import json
+    assert len(dumps_binary(prog)) * 3 < len(json.dumps(prog.to_json(), separators=(",", ":")))
+
+
+@pytest.mark.parametrize("data", [b"", b"NOPE", b"MLAST\x63", b"MLAST\x01\x00\x00\x03\x01"])
+def test_malformed_input_raises(data):
+    with pytest.raises(BinaryFormatError):
+        loads_binary(data)
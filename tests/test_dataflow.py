@@ -0,0 +1,81 @@
+import time
+
+from lexer import Lexer
+from parser.ast import _reset_ids
+from parser.parser import Parser
+from semantic import analyze, build_cfgs
+from semantic.dataflow import dead_stores, unassigned_reads
+
+
+def warnings(src):
+    _reset_ids()
+    parser = Parser(Lexer(src).scan_all(), track_positions=True)
+    program = parser.parse()
+    return [str(d) for d in analyze(program, parser.positions)]
+
+
+def test_definite_assignment_and_liveness():
+    src = ("func int f(int n) {\n"
+           "  int x;\n"
+           "  int y;\n"
+           "  int unused;\n"
+           "  int w = 1;\n"
+           "  if (n > 0) { x = 1; y = 1; } else { y = 2; }\n"
+           "  print(x + y);\n"
+           "  w = 2;\n"
+           "  for (int i = 0; i < n; i = i + 1) { int t; print(t); t = i; }\n"
+           "  int k;\n"
+           "  for (int i = 0; i < n; i = i + 1) { k = i; }\n"
+           "  return w + k;\n"
+           "}\n")
+    assert warnings(src) == [
+        "4:3: warning: variable 'unused' is declared but never used",
+        "5:3: warning: value assigned to 'w' is never used",
+        "7:9: warning: 'x' may be used before it is assigned",
+        "9:52: warning: 't' may be used before it is assigned",
+        "9:56: warning: value assigned to 't' is never used",
+        "12:14: warning: 'k' may be used before it is assigned",
+    ]
+
+
+def test_loops_returns_and_calls_are_respected():
+    src = ("int g = 1;\n"
+           "func int get() { return g; }\n"
+           "print(get());\n"
+           "g = 2;\n"                  # прочитает get()
+           "print(get());\n"
+           "func int h(int n) {\n"
+           "  int s = 0;\n"
+           "  for (int i = 0; i < n; i = i + 1) { s = s + i; }\n"
+           "  if (n > 1) { return s; }\n"
+           "  s = 5;\n"
+           "  return 0;\n"
+           "  print(s);\n"             # недостижимо: не считается чтением
+           "}\n")
+    assert warnings(src) == ["10:3: warning: value assigned to 's' is never used"]
+    for src_ok in ("examples/zadatak.txt", "examples/valid_calls_1.txt"):
+        with open(src_ok, encoding="utf-8") as f:
+            assert warnings(f.read()) == []
+
+
+def test_calls_see_locals_of_enclosing_function():
+    # вложенная g читает / присваивает x функции f: вызов g() — чтение и запись x
+    assert warnings("func int f() { int x = 1; func int g() { return x; } return g(); }\n") == []
+    assert warnings("func int f() { int x; func int g() { x = 5; return 0; } print(g()); return x; }\n") == []
+    # до объявления вложенной функции вызовы локальные переменные не трогают
+    assert warnings("func int f() { int y; print(f()); print(y); func int g() { return 0; } return g(); }\n") == [
+        "1:41: warning: 'y' may be used before it is assigned",
+    ]
+
+
+def test_scales_to_big_functions():
+    body = "".join(f"  int v{k} = v{k - 1} + 1;\n  if (v{k} > n) {{ v{k} = 0; }}\n" for k in range(1, 3000))
+    src = "func int big(int n) {\n  int v0 = n;\n" + body + "  return v2999;\n}\n"
+    _reset_ids()
+    program = Parser(Lexer(src).scan_all()).parse()
+    t0 = time.perf_counter()
+    cfgs = build_cfgs(program)
+    cfg = cfgs[1]
+    assert cfg.name == "big" and len(cfg.vars) == 3001
+    assert unassigned_reads(cfg) == [] and dead_stores(cfg) == []
+    assert time.perf_counter() - t0 < 5.0
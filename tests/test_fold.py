@@ -0,0 +1,59 @@
+from lexer import Lexer
+from opt import fold
+from parser.ast import _reset_ids
+from parser.parser import Parser
+from semantic import check
+
+
+def parse(src, **kw):
+    _reset_ids()
+    return Parser(Lexer(src).scan_all(), **kw).parse()
+
+
+def folded_source(src):
+    import io
+    from parser.formatter import format_program
+    program, stats = fold(parse(src))
+    out = io.StringIO()
+    format_program(program, out)
+    return out.getvalue(), stats
+
+
+def test_folds_int_real_bool_with_integer_division():
+    text, stats = folded_source(
+        "int a = 1 + 2 * 3; int b = -7 / 2; int c = 7 / -2; real r = 7 / 2 + 0.5; real s = 1 / 2.0;\n"
+        "bool t = !true || 2 >= 2; bool u = 1 == 1.0; int z = a / 0; bool v = true && t; bool w = false && f(a);\n"
+    )
+    assert text == (
+        "int a = 7;\nint b = -3;\nint c = -3;\nreal r = 3.5;\nreal s = 0.5;\n"
+        "bool t = true;\nbool u = true;\nint z = a / 0;\nbool v = t;\nbool w = false;\n"
+    )
+    assert stats.folded == 13 and stats.simplified == 2
+
+
+def test_drops_dead_branches_and_loops():
+    src = ("int x = 0;\n"
+           "if (1 > 2) { print(1); } else { print(2); }\n"
+           "if (false) print(3);\n"
+           "if (true) int y = 1;\n"
+           "for (int i = 0; 1 < 0; i = i + 1) { print(i); }\n"
+           "for (x = 5; false; x = x + 1) print(x);\n"
+           "for (int j = 0; j < 3; j = j + 1) if (false) print(j);\n")
+    text, stats = folded_source(src)
+    assert text == ("int x = 0;\n{\n  print(2);\n}\n{\n  int y = 1;\n}\nx = 5;\n"
+                    "for (int j = 0; j < 3; j = j + 1) {}\n")
+    assert (stats.ifs_removed, stats.loops_removed) == (4, 2)
+    assert stats.nodes_removed == stats.nodes_before - stats.nodes_after > 0
+
+
+def test_input_untouched_ids_and_positions_kept():
+    src = "int x = 2 * 3;\nfunc int f(int a) {\n  if (true) { return a + 1 * 2; }\n  return 0;\n}\n"
+    parser = Parser(Lexer(src).scan_all(), track_positions=True)
+    _reset_ids()
+    program = parser.parse()
+    before = program.pretty()
+    result, _ = fold(program)
+    assert program.pretty() == before
+    assert result.stmts[0].init.id == program.stmts[0].init.id
+    assert all(node.id in parser.positions for node in result.stmts)
+    assert check(result, parser.positions) == []
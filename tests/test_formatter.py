@@ -0,0 +1,98 @@
+import glob
+import io
+
+import pytest
+
+from lexer import Lexer, scan_all
+from parser import parse, format_source, check_source, format_program
+from parser.ast import Program, If, PrintStmt, Ident, Literal, BinOp, UnOp, OpKind
+from main.main import main
+
+
+def reparse(text):
+    return parse(scan_all(text))
+
+
+def test_examples_roundtrip_and_idempotent():
+    checked = 0
+    for path in sorted(glob.glob("examples/valid*.txt")):
+        src = open(path, encoding="utf-8").read()
+        out = format_source(src)
+        assert reparse(out).struct_hash() == reparse(src).struct_hash(), path
+        assert format_source(out) == out, path
+        assert check_source(out) is None
+        checked += 1
+    assert checked > 0
+
+
+def test_minimal_parentheses():
+    src = "x = ((a + (b * c)) - (d - e)) / (f);\nprint(!(a == b) && (c || d));\ny = (a + b).f[(1)];\n"
+    assert format_source(src) == (
+        "x = (a + b * c - (d - e)) / f;\n"
+        "print(!(a == b) && (c || d));\n"
+        "y = (a + b).f[1];\n"
+    )
+
+
+def test_blocks_and_else():
+    src = "if(a){print(1);}else if(b)print(2);else{}\nfor(int i=0;i<3;i=i+1){x=i;}\nproc p(){}"
+    assert format_source(src) == (
+        "if (a) {\n"
+        "  print(1);\n"
+        "} else if (b)\n"
+        "  print(2);\n"
+        "else {}\n"
+        "for (int i = 0; i < 3; i = i + 1) {\n"
+        "  x = i;\n"
+        "}\n"
+        "proc p() {}\n"
+    )
+
+
+def test_comments_are_kept():
+    src = "// head\nint a = 1;   // why\n\n\n{ /* inner */\n  a = 2;\n  // last\n}\n// tail\n"
+    out = format_source(src)
+    assert out == (
+        "// head\n"
+        "int a = 1; // why\n"
+        "\n"
+        "{ /* inner */\n"
+        "  a = 2;\n"
+        "  // last\n"
+        "}\n"
+        "// tail\n"
+    )
+    lexer = Lexer(src, keep_comments=True)
+    lexer.scan_all()
+    assert [c.text for c in lexer.comments] == ["// head", "// why", "/* inner */", "// last", "// tail"]
+
+
+def test_dangling_else_gets_braces():
+    prog = Program(stmts=[If(cond=Ident(name="a"),
+                             then_branch=If(cond=Ident(name="b"), then_branch=PrintStmt(expr=Literal(value=1))),
+                             else_branch=PrintStmt(expr=Literal(value=2)))])
+    buf = io.StringIO()
+    format_program(prog, buf)
+    outer = reparse(buf.getvalue()).stmts[0]
+    assert outer.else_branch is not None            # else остался у внешнего if
+    assert isinstance(outer.then_branch.stmts[0], If) and outer.then_branch.stmts[0].else_branch is None
+
+
+def test_literals_without_exponent():
+    prog = Program(stmts=[PrintStmt(expr=BinOp(op=OpKind.SUB, left=Literal(value=1e20),
+                                                right=UnOp(op=OpKind.NEG, expr=Literal(value=-2))))])
+    buf = io.StringIO()
+    format_program(prog, buf)
+    assert buf.getvalue() == "print(100000000000000000000.0 - --2);\n"
+
+
+def test_check_reports_first_difference(tmp_path, capsys):
+    assert check_source("int a;\nint  b;\n") == (2, 5)
+    p = tmp_path / "a.txt"
+    p.write_text("int a;\nint  b;\n", encoding="utf-8")
+    assert main([str(p), "--check"]) == 1
+    assert f"{p}:2:5" in capsys.readouterr().err
+    p.write_text(format_source("int a;\nint  b;\n"), encoding="utf-8")
+    assert main([str(p), "--check"]) == 0
+    assert main([str(p), "--format"]) == 0
+    assert capsys.readouterr().out == "int a;\nint b;\n"
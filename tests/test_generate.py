@@ -0,0 +1,64 @@
+import io
+import json
+
+from benchmarks.bench_suite import main as suite_main
+from benchmarks.generate import GenConfig, format_size, generate, parse_size, write_program
+from lexer import scan_all
+from parser import parse
+from parser.ast import Block, CallExpr, EnumDecl, For, FuncDef, If, StructDecl
+
+
+def max_depth(program):
+    nesting = (Block, If, For, FuncDef)
+    best = 0
+    stack = [(program, 0)]
+    while stack:
+        node, d = stack.pop()
+        best = max(best, d)
+        for child in node.children():
+            stack.append((child, d + isinstance(child, nesting)))
+    return best
+
+
+def all_nodes(program):
+    out = []
+    stack = [program]
+    while stack:
+        node = stack.pop()
+        out.append(node)
+        stack.extend(node.children())
+    return out
+
+
+def test_generated_programs_parse_and_follow_the_knobs():
+    for depth, width, density in ((0, 1, 0.0), (3, 4, 0.2), (25, 16, 1.0)):
+        cfg = GenConfig(size=8000, depth=depth, width=width, call_density=density, seed=depth)
+        src = generate(cfg)
+        assert len(src) >= cfg.size
+        prog = parse(scan_all(src))
+        nodes = all_nodes(prog)
+        assert {EnumDecl, StructDecl, FuncDef}.issubset({type(n) for n in nodes})
+        # вызовы функций в выражениях (процедуры вызываются всегда)
+        calls = [n for n in nodes if isinstance(n, CallExpr) and n.callee.startswith("f_")]
+        assert bool(calls) == (density > 0)
+        assert max_depth(prog) >= depth
+
+
+def test_generator_is_deterministic_and_streams():
+    cfg = GenConfig(size=5000, seed=7)
+    buf = io.StringIO()
+    assert write_program(buf, cfg) == len(buf.getvalue())
+    assert buf.getvalue() == generate(cfg)
+    assert generate(GenConfig(size=5000, seed=8)) != buf.getvalue()
+    assert parse_size("64K") == 65536 and parse_size("1.5M") == 1572864 and parse_size("100") == 100
+    assert format_size(parse_size("2G")) == "2G"
+
+
+def test_suite_saves_results(tmp_path, capsys):
+    out = tmp_path / "r.json"
+    assert suite_main(["--sizes", "4K", "--repeat", "1", "--output", str(out)]) == 0
+    doc = json.loads(out.read_text())
+    assert [r["phase"] for r in doc["results"]] == ["lex", "parse", "to_json", "pretty"]
+    assert all(r["seconds"] > 0 and r["peak_mb"] > 0 for r in doc["results"])
+    assert suite_main(["--sizes", "4K", "--repeat", "1", "--phases", "parse", "--compare", str(out)]) == 0
+    assert "vs " in capsys.readouterr().out
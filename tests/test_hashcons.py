@@ -0,0 +1,76 @@
+import gc
+
+from lexer import scan_all
+from parser import parse, Parser, InternTable, unshare
+from parser.ast import Assign, BinOp, Literal, Ident, ExprStmt
+
+
+def parse_src(src: str, **kw):
+    return parse(scan_all(src), **kw)
+
+
+def test_identical_subtrees_are_shared():
+    prog = parse_src("x = i + 1; y = i + 1; z = 0; w = 0;", hashcons=True)
+    a, b, c, d = prog.stmts
+    assert a.expr is b.expr
+    assert a.expr.left is b.expr.left          # Ident(i)
+    assert c.expr is d.expr                    # Literal(0)
+    # сами операторы не разделяются — только выражения
+    assert a is not b
+
+
+def test_default_mode_builds_fresh_nodes():
+    prog = parse_src("x = i + 1; y = i + 1;")
+    a, b = prog.stmts
+    assert a.expr is not b.expr
+    assert a.expr.id != b.expr.id
+
+
+def test_literal_type_is_part_of_key():
+    prog = parse_src("1; 1.0; true;", hashcons=True)
+    vals = [s.expr for s in prog.stmts]
+    assert len({id(v) for v in vals}) == 3
+    assert [type(v.value) for v in vals] == [int, float, bool]
+
+
+def test_json_shape_unchanged_except_ids():
+    src = "int a = (b + 1) * (b + 1); print(f(a, a)[0].x);"
+
+    def strip_ids(obj):
+        if isinstance(obj, dict):
+            return {k: strip_ids(v) for k, v in obj.items() if k != "id"}
+        if isinstance(obj, list):
+            return [strip_ids(v) for v in obj]
+        return obj
+
+    plain = parse_src(src).to_json()
+    shared = parse_src(src, hashcons=True).to_json()
+    assert strip_ids(plain) == strip_ids(shared)
+
+
+def test_shared_table_across_programs():
+    table = InternTable()
+    p1 = Parser(scan_all("a * 2;"), intern_table=table).parse()
+    p2 = Parser(scan_all("b = a * 2;"), intern_table=table).parse()
+    assert p1.stmts[0].expr is p2.stmts[0].expr
+    assert table.hits >= 1
+
+
+def test_unshare_gives_each_occurrence_its_own_id():
+    prog = parse_src("x = i + 1; y = i + 1;", hashcons=True)
+    copy = unshare(prog)
+    a, b = copy.stmts
+    assert isinstance(a, Assign) and isinstance(a.expr, BinOp)
+    assert a.expr is not b.expr
+    ids = [a.expr.id, b.expr.id, a.expr.left.id, b.expr.left.id]
+    assert len(set(ids)) == 4
+    assert copy.to_json()["stmts"][0]["expr"]["op"] == "ADD"
+
+
+def test_table_entries_are_weak():
+    table = InternTable()
+    prog = Parser(scan_all("q + 7;"), intern_table=table).parse()
+    assert len(table) == 3
+    del prog
+    gc.collect()
+    assert len(table) == 0
@@ -0,0 +1,111 @@
+import io
+import json
+import pathlib
+
+import pytest
+from lexer import scan_all
+from parser import parse, dump_json, from_json, dump_ndjson
+from parser.ast import Program, FuncDef, PrintStmt
+
+EXAMPLES = pathlib.Path(__file__).resolve().parents[1] / "examples"
+
+SRC = """
+enum Color { Red, Green }
+struct P { int x; real[] ys; }
+func real f(int a, struct P[] ps) { return a * 2.5 + ps[0].ys[a]; }
+int n = -3; bool b = !true && n <= 2;
+for (int i = 0; i < n; i = i + 1) { if (i == 1) print(f(i, ps)); else { read(i); } }
+return;
+"""
+
+
+def streamed(prog, **kw):
+    buf = io.StringIO()
+    dump_json(prog, buf, **kw)
+    return buf.getvalue()
+
+
+def test_indented_output_matches_json_dumps():
+    prog = parse(scan_all(SRC))
+    assert streamed(prog) == json.dumps(prog.to_json(), ensure_ascii=False, indent=2)
+
+
+def test_examples_match_json_dumps():
+    for path in sorted(EXAMPLES.glob("valid*.txt")):
+        prog = parse(scan_all(path.read_text(encoding="utf-8")))
+        assert streamed(prog) == json.dumps(prog.to_json(), ensure_ascii=False, indent=2), path.name
+
+
+@pytest.mark.parametrize("kw", [
+    {"indent": None},
+    {"indent": None, "separators": (",", ":")},
+    {"indent": 4},
+])
+def test_other_layouts_match_json_dumps(kw):
+    prog = parse(scan_all(SRC))
+    assert streamed(prog, **kw) == json.dumps(prog.to_json(), ensure_ascii=False, **kw)
+
+
+def test_empty_program():
+    prog = parse(scan_all(""))
+    assert json.loads(streamed(prog)) == {"type": "Program", "id": prog.id, "stmts": []}
+
+
+def test_deep_expression_does_not_recurse():
+    prog = parse(scan_all("x = " + " + ".join(["a"] * 5000) + ";"))
+    text = streamed(prog, indent=None)
+    assert text.count('"BinOp"') == 4999
+
+
+# --- from_json / compact / NDJSON ---
+
+
+def test_from_json_rebuilds_identical_tree():
+    prog = parse(scan_all(SRC))
+    back = from_json(json.loads(streamed(prog)))
+    assert back == prog                    # классы, поля и id совпадают
+    assert back.pretty() == prog.pretty()
+
+
+def test_from_json_without_ids_assigns_fresh_ones():
+    prog = parse(scan_all(SRC))
+    obj = json.loads(streamed(prog, indent=None, ids=False))
+    assert "id" not in obj and "id" not in obj["stmts"][0]
+    back = from_json(obj)
+    assert isinstance(back, Program) and isinstance(back.stmts[2], FuncDef)
+    assert back.id != prog.id
+    assert json.loads(streamed(back, ids=False)) == obj
+
+
+def test_from_json_rejects_unknown_types():
+    with pytest.raises(ValueError):
+        from_json({"type": "Bogus"})
+    with pytest.raises(ValueError):
+        from_json({"type": "Print"})
+
+
+def test_ndjson_one_statement_per_line():
+    prog = parse(scan_all("int a = 1; print(a); { a = 2; }"))
+    buf = io.StringIO()
+    dump_ndjson(prog, buf)
+    lines = buf.getvalue().splitlines()
+    assert len(lines) == 3
+    objs = [json.loads(l) for l in lines]
+    assert [o["type"] for o in objs] == ["Decl", "Print", "Block"]
+    assert isinstance(from_json(objs[1]), PrintStmt)
+
+
+def test_cli_output_modes(tmp_path, capsys):
+    from main.main import main
+    src = tmp_path / "p.txt"
+    src.write_text("int a = 1; print(a);", encoding="utf-8")
+
+    assert main([str(src), "--json-compact", "--no-ids"]) == 0
+    out = capsys.readouterr().out
+    assert out.count("\n") == 1 and " " not in out and '"id"' not in out
+
+    assert main([str(src), "--ndjson"]) == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert [json.loads(l)["type"] for l in lines] == ["Decl", "Print"]
+
+    assert main([str(src), "--no-ids"]) == 1
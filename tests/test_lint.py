@@ -0,0 +1,78 @@
+from lexer import Lexer
+from lint import RULES, Linter, Rule, lint_source
+from main.main import main
+from parser import ast
+from parser.parser import Parser
+
+
+SRC = ("enum Empty { }\n"
+       "int x = 1;\n"
+       "func int f(int a, int b) {\n"
+       "  int x = a;\n"
+       "  int t;\n"
+       "  t = 2;\n"
+       "  for (int i = 0; i < 3; i = i + 1) { print(i); }\n"
+       "  return x;\n"
+       "}\n")
+LOOP = "for (int i = 0; i < 2; i = i + 1) { int j = i; }"
+
+
+def parse_only(src):
+    return Parser(Lexer(src).scan_all()).parse()
+
+
+def test_builtin_rules():
+    found = [str(f) for f in lint_source(SRC)]
+    assert found == [
+        "1:1: empty-enum: enum Empty has no members",
+        "3:1: unused-param: parameter 'b' of 'f' is never used",
+        "4:3: shadowed-name: variable 'x' shadows the variable declared in an outer scope (line 2)",
+        "5:3: unread-assignment: variable 't' is assigned but never read",
+        "7:39: print-in-loop: print inside a loop runs on every iteration",
+    ]
+
+
+def test_one_traversal_for_all_rules(monkeypatch):
+    events = []
+
+    class Trace(Rule):
+        name = "trace"
+
+        def enter_For(self, node, ctx):
+            events.append(("enter", "For", ctx.resolve("i") is not None))
+
+        def enter_Decl(self, node, ctx):
+            events.append(("enter", node.name, ctx.resolve(node.name) is not None))
+
+        def exit_Decl(self, node, ctx):
+            events.append(("exit", node.name))
+
+    calls = []
+    original = ast.Node.children
+
+    def counting(self):
+        calls.append(self.id)
+        return original(self)
+
+    monkeypatch.setattr(ast.Node, "children", counting)
+    Linter([Trace]).lint(parse_only(LOOP))
+    one_rule = len(calls)
+    assert len(set(calls)) == one_rule
+    assert events == [("enter", "For", False), ("enter", "i", False), ("exit", "i"),
+                      ("enter", "j", False), ("exit", "j")]
+    # все встроенные правила плюс Trace: обход тот же, узлы посещаются по одному разу
+    del calls[:]
+    Linter(list(RULES.values()) + [Trace]).lint(parse_only(LOOP))
+    assert len(calls) == one_rule
+
+
+def test_cli_lint_mode(tmp_path, capsys):
+    clean = tmp_path / "clean.txt"
+    clean.write_text("int x = 1;\nprint(x);\n", encoding="utf-8")
+    noisy = tmp_path / "noisy.txt"
+    noisy.write_text("for (int i = 0; i < 2; i = i + 1) { print(i); }\n", encoding="utf-8")
+    assert main([str(clean), "--lint"]) == 0
+    assert main([str(clean), str(noisy), "--lint", "--jobs", "2"]) == 1
+    captured = capsys.readouterr()
+    assert f"{noisy}:1:37: print-in-loop:" in captured.err
+    assert "2 files, 1 ok, 1 failed" in captured.err
@@ -0,0 +1,79 @@
+import io
+
+from lexer import Lexer
+from opt import optimize_loops
+from parser.ast import _reset_ids
+from parser.formatter import format_program
+from parser.parser import Parser
+from semantic import check
+
+
+def optimized(src):
+    _reset_ids()
+    program = Parser(Lexer(src).scan_all()).parse()
+    before = program.pretty()
+    result, stats = optimize_loops(program)
+    assert program.pretty() == before
+    assert [d for d in check(result) if d.severity == "error"] == []
+    out = io.StringIO()
+    format_program(result, out)
+    return out.getvalue(), stats
+
+
+def test_hoists_invariants_and_reduces_multiplications():
+    text, stats = optimized(
+        "func int f(int n, real w) {\n"
+        "  int s = 0;\n"
+        "  for (int i = 1; i <= n * 2; i = i + 1) {\n"
+        "    s = s + i * 4 + (n - 1) * (n + 1);\n"
+        "    print(w * 0.5 + i * n);\n"
+        "  }\n"
+        "  return s;\n"
+        "}\n")
+    assert text == (
+        "func int f(int n, real w) {\n"
+        "  int s = 0;\n"
+        "  {\n"
+        "    int _inv1 = n * 2;\n"
+        "    int _iv2 = 4;\n"
+        "    int _inv3 = (n - 1) * (n + 1);\n"
+        "    int _iv4 = 1 * n;\n"
+        "    real _inv5 = w * 0.5;\n"
+        "    for (int i = 1; i <= _inv1; i = i + 1) {\n"
+        "      s = s + _iv2 + _inv3;\n"
+        "      print(_inv5 + _iv4);\n"
+        "      _iv2 = _iv2 + 4;\n"
+        "      _iv4 = _iv4 + n;\n"
+        "    }\n"
+        "  }\n"
+        "  return s;\n"
+        "}\n")
+    assert (stats.loops, stats.induction, stats.optimized, stats.hoisted, stats.reduced) == (1, 1, 1, 3, 2)
+
+
+def test_nested_loops_and_downward_step():
+    text, stats = optimized(
+        "int n = 3;\nint t = 0;\n"
+        "for (int i = 10; i > 0; i = i - 2) {\n"
+        "  for (int j = 0; j < n; j = j + 1) { t = t + j * i + (n + 1) * 2; }\n"
+        "}\n")
+    # (n + 1) * 2 поднимается из обоих циклов; j * i сокращается во внутреннем (i там не меняется)
+    assert text.index("int _inv3 = (n + 1) * 2;") < text.index("for (int i = 10;")
+    assert "int _iv1 = 0;\n      int _inv2 = _inv3;\n      for (int j" in text
+    assert "t = t + _iv1 + _inv2;\n        _iv1 = _iv1 + i;" in text
+    assert (stats.loops, stats.optimized, stats.hoisted, stats.reduced) == (2, 2, 2, 1)
+
+
+def test_leaves_unsafe_loops_alone():
+    text, stats = optimized(
+        "int g = 2;\nint t = 0;\n"
+        "func int bump() { g = g + 1; return g; }\n"
+        # вызов может менять глобальную g
+        "for (int i = 0; i < 5; i = i + 1) { t = t + g * 3 + bump(); }\n"
+        # деление защищено условием, а k меняется в теле
+        "for (int k = 0; k < 5; k = k + 1) { if (t != 0) print(g / t); t = t + k; k = k + 1; print(k * 2); }\n"
+        # глобальная i задана присваиванием, а вызов её меняет
+        "int i = 0;\nfunc int f() { i = i + 5; return 0; }\n"
+        "for (i = 0; i < 10; i = i + 1) { t = t + i * 3 + f(); }\n")
+    assert "_inv" not in text and "_iv" not in text
+    assert stats.optimized == 0 and stats.induction == 1
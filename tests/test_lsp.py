@@ -0,0 +1,109 @@
+import io
+import json
+import random
+
+from lexer import Lexer, LexError
+from lsp.document import Document
+from lsp.server import LanguageServer, read_message, write_message
+from parser.errors import ParseError
+from parser.parser import Parser
+
+SRC = """struct P { int x; real y; }
+enum Color { RED, GREEN }
+func int add(int a, int b) {
+  return a + b;
+}
+if (1 < 2) { print(1); } else { print(2); }
+proc hello() { print(0); }
+"""
+
+
+def full_error(text):
+    try:
+        Parser(Lexer(text).scan_all()).parse()
+    except LexError as e:
+        return "lex", e.message, e.line, e.col
+    except ParseError as e:
+        return "parse", e.message, e.at.line, e.at.col
+    return None
+
+
+def test_incremental_edits_match_full_parse():
+    rng = random.Random(3)
+    doc = Document(SRC)
+    pieces = ["x", ";", "}", "{", "(", "\n", " ", "else ", "int q;", "/*", "*/", '"', "."]
+    for _ in range(400):
+        a = rng.randrange(len(doc.text) + 1)
+        b = min(len(doc.text), a + rng.choice([0, 0, 1, 3]))
+        doc.replace(a, b, rng.choice(pieces) if rng.random() < 0.8 else "")
+        found = doc.first_error()
+        assert (found and found[:4]) == full_error(doc.text)
+        if found is None or found[0] == "parse":
+            expected = [(t.kind, t.lexeme, t.line, t.col) for t in Lexer(doc.text).scan_all()[:-1]]
+            assert [(t.kind, t.lexeme, line, col) for t, line, col in doc.tokens()] == expected
+
+
+def test_apply_change_utf16_positions():
+    doc = Document("/*😀*/ int a;\n")
+    # LSP считает символы в UTF-16: эмодзи занимает две единицы
+    doc.apply_change({"range": {"start": {"line": 0, "character": 11}, "end": {"line": 0, "character": 12}},
+                      "text": "b"})
+    assert doc.text == "/*😀*/ int b;\n"
+    doc.apply_change({"range": {"start": {"line": 0, "character": 12}, "end": {"line": 0, "character": 13}},
+                      "text": ""})
+    [diag] = doc.diagnostics()
+    assert diag["source"] == "minilang-parse"
+    assert diag["range"]["start"] == {"line": 1, "character": 0}
+
+
+def test_symbols():
+    syms = Document(SRC).symbols()
+    assert [(s["name"], s["kind"]) for s in syms] == [("P", 23), ("Color", 10), ("add", 12), ("hello", 12)]
+    assert [f["name"] for f in syms[0]["children"]] == ["x", "y"]
+    assert [m["name"] for m in syms[1]["children"]] == ["RED", "GREEN"]
+    assert syms[2]["detail"] == "func int (int a, int b)"
+    assert syms[2]["range"]["start"] == {"line": 2, "character": 0}
+    assert syms[2]["range"]["end"]["line"] == 4
+
+
+def frame(*msgs):
+    buf = io.BytesIO()
+    for m in msgs:
+        write_message(buf, dict(jsonrpc="2.0", **m))
+    buf.seek(0)
+    return buf
+
+
+def test_protocol_session():
+    uri = "file:///a.ml"
+    rfile = frame(
+        {"id": 1, "method": "initialize", "params": {}},
+        {"method": "initialized", "params": {}},
+        {"method": "textDocument/didOpen",
+         "params": {"textDocument": {"uri": uri, "languageId": "minilang", "version": 1, "text": "int a"}}},
+        {"method": "textDocument/didChange",
+         "params": {"textDocument": {"uri": uri, "version": 2},
+                    "contentChanges": [{"range": {"start": {"line": 0, "character": 5},
+                                                  "end": {"line": 0, "character": 5}}, "text": ";"}]}},
+        {"id": 2, "method": "textDocument/documentSymbol", "params": {"textDocument": {"uri": uri}}},
+        {"id": 3, "method": "textDocument/hover", "params": {}},
+        {"id": 4, "method": "shutdown"},
+        {"method": "exit"},
+    )
+    wfile = io.BytesIO()
+    assert LanguageServer(rfile, wfile, debounce=0).run() == 0
+    wfile.seek(0)
+    out = []
+    while True:
+        msg = read_message(wfile)
+        if msg is None:
+            break
+        out.append(msg)
+    assert out[0]["result"]["capabilities"]["textDocumentSync"]["change"] == 2
+    opened, changed = out[1]["params"], out[2]["params"]
+    assert opened["version"] == 1 and opened["diagnostics"][0]["message"] == "Expected ';' after declaration"
+    assert changed["version"] == 2 and changed["diagnostics"] == []
+    assert out[3] == {"jsonrpc": "2.0", "id": 2, "result": []}
+    assert out[4]["error"]["code"] == -32601
+    assert out[5] == {"jsonrpc": "2.0", "id": 4, "result": None}
+    assert json.loads(json.dumps(out))        # всё сериализуемо
@@ -0,0 +1,33 @@
+import io
+
+from lexer import scan_all
+from parser import parse
+from parser.ast import Program, Block, PrintStmt, Ident
+
+
+def test_pretty_layout():
+    prog = parse(scan_all("int[] a; if (x) { print(-x); }"))
+    lines = prog.pretty().splitlines()
+    names = [l.strip().split("#")[0] for l in lines]
+    assert names == ["Program", "Decl", "BaseType", "If", "Ident", "Block", "Print", "UnOp", "Ident"]
+    # тип массива печатается внутри строки Decl, с собственным отступом
+    assert lines[1].startswith("  Decl#") and "ArrayType#" in lines[1]
+    assert lines[6].startswith("      Print#")
+
+
+def test_write_pretty_streams_same_text():
+    prog = parse(scan_all("func int f(int a) { return a + 1; } print(f(2));"))
+    buf = io.StringIO()
+    prog.write_pretty(buf)
+    assert buf.getvalue() == prog.pretty()
+    assert prog.pretty(2).startswith("    Program#")
+
+
+def test_deep_tree_does_not_recurse():
+    node = PrintStmt(expr=Ident(name="x"))
+    for _ in range(5000):
+        node = Block(stmts=[node])
+    text = Program(stmts=[node]).pretty()
+    assert text.count("\n") == 5003
+    last = text.splitlines()[-1]
+    assert last.startswith("  " * 5002 + "Ident#") and last.endswith("(x)")
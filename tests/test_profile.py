@@ -0,0 +1,39 @@
+import io
+
+from lexer import scan_all
+from main.main import main
+from parser import Parser, Profile, ProfilingParser
+
+SRC = "int a;\na = 1 + 2;\nf(a);\n{ print(a); }\n"
+
+
+def test_profiled_parse_matches_and_counts():
+    tokens = scan_all(SRC)
+    profile = Profile()
+    program = ProfilingParser(tokens, profile=profile).parse()
+    assert program.struct_hash() == Parser(tokens).parse().struct_hash()
+    rules = profile.rules
+    assert rules["parse"].calls == 1 and rules["parse_stmt"].calls == 5
+    assert rules["parse_block"].calls == 1 and rules["parse_print"].calls == 1
+    # `f(a);` — пробуем присваивание, откатываемся на 4 токена
+    assert rules["_parse_stmt"].backtracks == 1 and rules["_parse_stmt"].rewound_tokens == 4
+    assert sum(r.tokens for r in rules.values()) == len(tokens) - 1 + 4   # без EOF, с повторным чтением
+    assert rules["parse_add"].failed_matches > 0
+    assert abs(rules["parse"].inclusive - sum(r.exclusive for r in rules.values())) < 1e-3
+    assert profile.sorted_rules("calls")[0].calls >= rules["parse_expr"].calls
+
+
+def test_collapsed_stacks_and_cli(capsys):
+    profile = Profile()
+    ProfilingParser(scan_all(SRC), profile=profile).parse()
+    buf = io.StringIO()
+    profile.write_collapsed(buf)
+    for line in buf.getvalue().splitlines():
+        path, weight = line.rsplit(" ", 1)
+        assert path.split(";")[0] == "parse" and int(weight) > 0
+
+    assert main(["examples/valid_calls_2.txt", "examples/valid01_basics.txt", "--profile"]) == 0
+    out = capsys.readouterr().out
+    assert out.splitlines()[0].split()[:3] == ["rule", "calls", "errors"]
+    assert main(["examples/syn_err01_missing_semicolon.txt", "--profile=json"]) == 1
+    assert '"errors": 1' in capsys.readouterr().out
@@ -0,0 +1,77 @@
+import pytest
+from lexer import scan_all
+from parser import parse
+from parser.ast import CallExpr, For, FuncDef, Ident, BinOp
+
+SRC = """
+func int f(int n) {
+  int s = 0;
+  for (int i = 0; i < n; i = i + 1) {
+    s = s + foo(i) + bar(i);
+  }
+  return foo(s);
+}
+proc p() {
+  for (int j = 0; j < 3; j = j + 1) { print(foo(j)); }
+}
+print(foo(1));
+"""
+
+
+def prog():
+    return parse(scan_all(SRC))
+
+
+def test_index_groups_nodes_by_class_with_parents():
+    p = prog()
+    idx = p.index()
+    assert p.index() is idx                     # кэшируется
+    funcs = idx.of_type(FuncDef)
+    assert [f.name for f in funcs] == ["f", "p"]
+    assert len(idx.of_type("For")) == 2
+    calls = idx.of_type(CallExpr)
+    assert [c.callee for c in calls] == ["foo", "bar", "foo", "foo", "foo"]
+    assert idx.parent(funcs[0]) is p
+    assert idx.ancestors(calls[0])[-1] is p
+
+
+def test_descendant_and_child_selectors():
+    idx = prog().index()
+    assert len(idx.select("FuncDef CallExpr[callee=foo]")) == 3
+    assert len(idx.select("FuncDef For CallExpr[callee=foo]")) == 2
+    # тело функции прозрачно для '>': For — ребёнок и Block, и FuncDef
+    assert len(idx.select("FuncDef > For CallExpr[callee=foo]")) == 2
+    assert idx.select("FuncDef > For") == idx.select("FuncDef > Block > For") == idx.of_type(For)
+    assert idx.select("FuncDef > Assign") == []        # s = s + ... — в теле цикла, не функции
+    assert len(idx.select("For > Block > Assign")) == 1
+    assert [c.callee for c in idx.select("For CallExpr")] == ["foo", "bar", "foo"]
+
+
+def test_attribute_filters():
+    idx = prog().index()
+    assert [f.name for f in idx.select("FuncDef[is_proc=true]")] == ["p"]
+    adds = idx.select("BinOp[op=ADD]")
+    assert adds and all(isinstance(b, BinOp) for b in adds)
+    assert len(idx.select("Assign > Ident[name=s]")) == 1
+    assert len(idx.select("* > Ident[name=i]")) >= 1
+
+
+def test_repeated_queries_are_cached():
+    idx = prog().index()
+    first = idx.select("For CallExpr")
+    first.clear()
+    assert len(idx.select("For CallExpr")) == 3
+    assert "For CallExpr" in idx._cache
+
+
+def test_bad_selectors_raise():
+    idx = prog().index()
+    for bad in ("", "Nope", "> For", "For >", "For[callee"):
+        with pytest.raises(ValueError):
+            idx.select(bad)
+
+
+def test_hashcons_shared_nodes_indexed_once():
+    p = parse(scan_all("x = a + 1; y = a + 1;"), hashcons=True)
+    idx = p.index()
+    assert [i.name for i in idx.of_type(Ident)] == ["x", "a", "y"]
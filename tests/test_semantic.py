@@ -0,0 +1,100 @@
+import glob
+
+from benchmarks.generate import GenConfig, generate
+from main.main import main
+from semantic import check_source
+
+
+def errors(src):
+    return [d.message for d in check_source(src) if d.severity == "error"]
+
+
+def test_zadatak_return_type_and_unsized_array(capsys):
+    assert main(["examples/zadatak.txt", "--semantic"]) == 1
+    err = capsys.readouterr().err.splitlines()
+    assert err == [
+        "examples/zadatak.txt:7:7: warning: array 'niz' is indexed but never given a value "
+        "(declared without initializer; arrays have no size)",
+        "examples/zadatak.txt:11:3: error: func 'zadatak' returns int, not int[]",
+    ]
+
+
+def test_valid_examples_and_generated_programs_have_no_errors():
+    for path in sorted(glob.glob("examples/valid*.txt")):
+        with open(path, encoding="utf-8") as f:
+            assert errors(f.read()) == [], path
+    assert errors(generate(GenConfig(size=32 * 1024, seed=3))) == []
+
+
+def test_scopes_and_hoisting():
+    src = """
+    func int twice(int x) { return half(x) * 4; }
+    func int half(int x) { return x / 2; }
+    struct A { struct B b; }
+    struct B { real w; }
+    int x = 1;
+    { real x = 2.5; x = x * 2; }
+    for (int i = 0; i < 3; i = i + 1) { print(i); }
+    """
+    assert errors(src) == []
+    assert errors("{ int y; } y = 1;") == ["'y' is not declared"]
+    assert errors("for (int i = 0; i < 3; i = i + 1) {} print(i);") == ["'i' is not declared"]
+    assert errors("int a; { int a; } int a;") == ["'a' is already declared in this scope"]
+    assert errors("func int f(int p) { int p; return p; }") == ["'p' is already declared in this scope"]
+
+
+def test_shadowed_struct_and_enum_are_distinct_types():
+    src = """
+    struct S { int a; }
+    enum E { One }
+    struct S s;
+    func int f() {
+      struct S { bool b; }
+      enum E { Two }
+      struct S inner;
+      inner.b = true;
+      s.a = 1;
+      int k = Two;
+      return s.a + k;
+    }
+    s.a = 2;
+    """
+    assert errors(src) == []
+    assert errors("struct S { int a; } struct S s; { struct S { int a; } struct S t; t = s; }") == [
+        "cannot assign a value of type struct S to struct S",
+    ]
+
+
+def test_type_errors_are_all_reported():
+    src = """
+    enum Color { RED, GREEN }
+    struct P { int x; real w; }
+    struct P p;
+    int n = RED;
+    bool b = 1;
+    func int f(int a, real r) { return a; }
+    proc show(struct P v) { return 1; }
+    if (n) print(n);
+    p.z = 1;
+    n = f(1);
+    n = f(true, 2);
+    n = show(p) + 1;
+    RED = 1;
+    print(p);
+    return;
+    n = f + 1;
+    real ok = n / 2 + p.w;
+    """
+    assert errors(src) == [
+        "cannot initialize 'b' of type bool with a value of type int",
+        "procedure 'show' cannot return a value",
+        "if condition must be bool, not int",
+        "struct P has no field 'z'",
+        "f() takes 2 argument(s), got 1",
+        "argument 1 of f() must be int, not bool",
+        "procedure call used as a value",
+        "cannot assign to enum member 'RED'",
+        "cannot print a value of type struct P",
+        "return outside a function",
+        "function 'f' used as a value (call it)",
+    ]
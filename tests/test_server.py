@@ -0,0 +1,94 @@
+import json
+import socket
+import threading
+
+import pytest
+
+from main.server import ParseService, serve
+
+
+def rpc(service, method, **params):
+    line, _ = service.handle_line(json.dumps({"jsonrpc": "2.0", "id": 7, "method": method, "params": params}).encode())
+    return json.loads(line)
+
+
+def test_parse_check_lex():
+    service = ParseService()
+    resp = rpc(service, "parse", source="int a; print(a);")
+    assert resp["id"] == 7
+    assert resp["result"]["ok"] is True and resp["result"]["ast"]["type"] == "Program"
+    assert "id" not in rpc(service, "parse", source="int a; print(a);", ids=False)["result"]["ast"]
+    assert rpc(service, "check", source="int a")["result"] == {
+        "ok": False,
+        "diagnostics": [{"severity": "error", "source": "parse", "message": "Expected ';' after declaration",
+                         "line": 1, "col": 6}],
+    }
+    lexed = rpc(service, "lex", source="a @")["result"]
+    assert lexed["ok"] is False and lexed["diagnostics"][0]["source"] == "lex"
+
+
+def test_cache_by_content_hash(tmp_path):
+    service = ParseService(cache_size=2)
+    p = tmp_path / "a.txt"
+    p.write_text("int a;", encoding="utf-8")
+    first = rpc(service, "parse", path=str(p))["result"]
+    assert rpc(service, "parse", source="int a;")["result"] == first   # тот же текст — попадание
+    assert service.cache.hits == 1 and service.cache.misses == 1
+    rpc(service, "check", source="int b;")
+    rpc(service, "check", source="int c;")
+    assert len(service.cache.entries) == 2                              # LRU вытеснил самый старый
+
+
+def test_ast_encoded_only_when_asked(monkeypatch):
+    import main.server as server
+    encoded = []
+    dump_json = server.dump_json
+    monkeypatch.setattr(server, "dump_json", lambda *a, **kw: (encoded.append(kw["ids"]), dump_json(*a, **kw)))
+    service = ParseService()
+    assert rpc(service, "check", source="int a;")["result"]["ok"] is True
+    assert encoded == []
+    first = rpc(service, "parse", source="int a;")["result"]
+    assert rpc(service, "parse", source="int a;")["result"] == first
+    assert "id" not in rpc(service, "parse", source="int a;", ids=False)["result"]["ast"]
+    assert encoded == [True, False]
+    entry, = service.cache.entries.values()
+    assert sorted(entry.ast) == [False, True]
+    assert (service.cache.hits, service.cache.misses) == (1, 3)
+
+
+def test_errors():
+    service = ParseService()
+    assert rpc(service, "nope")["error"]["code"] == -32601
+    assert rpc(service, "parse")["error"]["code"] == -32602
+    line, _ = service.handle_line(b"{not json")
+    assert json.loads(line)["error"]["code"] == -32700
+
+
+def test_hostile_inputs_get_a_reply(tmp_path, monkeypatch):
+    service = ParseService()
+    p = tmp_path / "latin1.txt"
+    p.write_bytes(b"int \xe9;")
+    assert rpc(service, "parse", path=str(p))["error"]["code"] == -32602
+    deep = rpc(service, "parse", source="(" * 3000)["result"]
+    assert deep["ok"] is False and deep["diagnostics"][0]["message"] == "expression is nested too deeply"
+
+    def broken(method, params):
+        raise KeyError("boom")
+    monkeypatch.setattr(service, "call", broken)
+    assert rpc(service, "stats")["error"]["code"] == -32603
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="needs Unix sockets")
+def test_socket_roundtrip(tmp_path):
+    from main.client import Client
+    sock_path = str(tmp_path / "ml.sock")
+    ready = threading.Event()
+    thread = threading.Thread(target=serve, args=(sock_path,), kwargs={"ready": ready}, daemon=True)
+    thread.start()
+    assert ready.wait(5)
+    with Client(sock_path, timeout=5) as c:
+        assert c.call("parse", source="int a;")["ok"] is True
+        assert c.call("stats")["misses"] == 1
+        c.call("shutdown")
+    thread.join(5)
+    assert not thread.is_alive()
@@ -0,0 +1,55 @@
+import io
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import parser
+from main.main import run_file
+
+ROOT = Path(__file__).resolve().parents[1]
+EXAMPLE = "examples/valid01_basics.txt"
+
+
+def loaded_after(args):
+    code = ("import sys; from main.main import main; main(%r); "
+            "sys.stderr.write(' '.join(sorted(sys.modules)))" % (args,))
+    proc = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return set(proc.stderr.split())
+
+
+def test_default_mode_skips_heavy_imports():
+    mods = loaded_after([EXAMPLE])
+    for name in ("json", "decimal", "struct", "hashlib", "multiprocessing", "parser.json_io", "parser.formatter"):
+        assert name not in mods
+    assert "json" in loaded_after([EXAMPLE, "--json"])
+
+
+def test_lazy_package_attributes():
+    assert parser.dump_json.__module__ == "parser.json_io"
+    assert {"dump_json", "format_source", "AstIndex"} <= set(dir(parser))
+    with pytest.raises(AttributeError):
+        parser.no_such_name
+
+
+def test_zipapp_runs_precompiled(tmp_path):
+    sys.path.insert(0, str(ROOT / "scripts"))
+    try:
+        from build_zipapp import build
+    finally:
+        sys.path.pop(0)
+    pyz = build(tmp_path / "minilang.pyz")
+    proc = subprocess.run([sys.executable, str(pyz), EXAMPLE, "--json"], cwd=ROOT,
+                          capture_output=True, text=True, check=True)
+    out = io.StringIO()
+    assert run_file(str(ROOT / EXAMPLE), "json", out=out) == 0
+    assert proc.stdout == out.getvalue()
+    proc = subprocess.run([sys.executable, str(pyz), "examples/zadatak.txt", "--semantic"], cwd=ROOT,
+                          capture_output=True, text=True)
+    assert proc.returncode == 1
+    assert "examples/zadatak.txt:11:3: error: func 'zadatak' returns int, not int[]" in proc.stderr
+    proc = subprocess.run([sys.executable, str(pyz), "examples/zadatak.txt", "--lint"], cwd=ROOT,
+                          capture_output=True, text=True)
+    assert proc.returncode == 1
+    assert "examples/zadatak.txt:6:7: print-in-loop:" in proc.stderr
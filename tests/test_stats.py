@@ -0,0 +1,36 @@
+import json
+
+from main.main import main
+
+EXAMPLE = "examples/valid_call_field_index_mix.txt"
+
+
+def test_stats_json_on_stderr_and_same_output(capsys):
+    assert main([EXAMPLE, "--json"]) == 0
+    plain = capsys.readouterr().out
+    assert main([EXAMPLE, "--json", "--stats=json"]) == 0
+    captured = capsys.readouterr()
+    assert captured.out == plain
+    stats = json.loads(captured.err)
+    assert [p["name"] for p in stats["phases"]] == ["read", "scan_all", "parse", "to_json", "output"]
+    assert all(p["wall_ms"] >= 0 and p["cpu_ms"] >= 0 for p in stats["phases"])
+    assert stats["tokens"]["total"] == 64 and stats["tokens"]["by_kind"]["IDENT"] == 16
+    assert stats["nodes"]["by_class"]["FieldAccessExpr"] == 4 and stats["nodes"]["by_class"]["Program"] == 1
+    assert stats["nodes"]["max_depth"] == 6
+    assert stats["peak_traced_bytes"] > 0 and stats["error"] is None
+
+
+def test_stats_text_and_errors(tmp_path, capsys):
+    assert main([EXAMPLE, "--stats"]) == 0
+    err = capsys.readouterr().err
+    assert "pretty" in err and "nodes: 37, max depth 6" in err and "peak traced memory" in err
+
+    bad = tmp_path / "bad.txt"
+    bad.write_text("int a;\nint b = a @ 1;\n", encoding="utf-8")
+    assert main([str(bad), "--stats=json"]) == 1
+    stats = json.loads(capsys.readouterr().err.splitlines()[-1])
+    assert "Unknown character" in stats["error"]
+    assert [p["name"] for p in stats["phases"]] == ["read", "scan_all"]
+
+    assert main([EXAMPLE, "--tokens", "--stats"]) == 1
+    assert main([EXAMPLE, "--stats=yaml"]) == 1
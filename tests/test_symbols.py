@@ -0,0 +1,87 @@
+import os
+
+from symbols import SymbolIndex, collect_source
+from symbols.cli import main as cli_main
+
+SRC_A = """struct Point { int x; int y; }
+func int area(struct Point p) {
+  return p.x * p.y;
+}
+"""
+
+SRC_B = """proc show(int v) {
+  print(area(q));
+}
+area(q);
+"""
+
+
+def test_collect_positions_and_containers():
+    defs, refs = collect_source(SRC_A)
+    assert [(d.name, d.kind, d.line, d.col, d.container) for d in defs] == [
+        ("Point", "struct", 1, 1, ""), ("x", "field", 1, 16, "Point"), ("y", "field", 1, 23, "Point"),
+        ("area", "func", 2, 1, ""),
+    ]
+    fields = [(r.name, r.line, r.col, r.container) for r in refs if r.kind == "field"]
+    assert fields == [("x", 3, 12, "area"), ("y", 3, 18, "area")]
+    assert ("p", "ident", 3, 10) in [(r.name, r.kind, r.line, r.col) for r in refs]
+    _, refs = collect_source("int n;\nread( n );\n")
+    assert [(r.name, r.line, r.col) for r in refs] == [("n", 2, 7)]
+
+
+def test_index_is_incremental(tmp_path):
+    a, b = tmp_path / "a.txt", tmp_path / "b.txt"
+    a.write_text(SRC_A, encoding="utf-8")
+    b.write_text(SRC_B, encoding="utf-8")
+    with SymbolIndex(str(tmp_path / "idx.db")) as idx:
+        stats = idx.update([str(a), str(b)])
+        assert (stats.indexed, stats.unchanged, stats.failed) == (2, 0, 0)
+        assert idx.files_defining("Point", "struct") == [str(a)]
+        calls = idx.references("area", kind="call")
+        assert [(os.path.basename(r.path), r.line, r.col, r.container) for r in calls] == [
+            ("b.txt", 2, 9, "show"), ("b.txt", 4, 1, ""),
+        ]
+
+        # touch без изменений и повторный вызов ничего не разбирают
+        st = os.stat(b)
+        os.utime(b, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        assert idx.update([str(a), str(b)]).indexed == 0
+
+        b.write_text("area(q;\n", encoding="utf-8")
+        stats = idx.update([str(a), str(b)])
+        assert (stats.indexed, stats.failed) == (0, 1)
+        assert idx.references("area") == []
+        assert [os.path.basename(p) for p, _ in idx.errors()] == ["b.txt"]
+
+        a.unlink()
+        assert idx.update([str(a), str(b)]).removed == 1
+        assert idx.definitions("Point") == []
+
+    # индекс переживает переоткрытие
+    with SymbolIndex(str(tmp_path / "idx.db")) as idx:
+        assert idx.update([str(b)]).unchanged == 1
+
+
+def test_cli(tmp_path, capsys):
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "a.txt").write_text(SRC_A, encoding="utf-8")
+    db = str(tmp_path / "idx.db")
+    assert cli_main(["--db", db, "index", str(tmp_path / "src")]) == 0
+    assert "1 indexed" in capsys.readouterr().err
+    assert cli_main(["--db", db, "defs", "x", "--kind", "field"]) == 0
+    assert capsys.readouterr().out.strip().endswith("a.txt:1:16: field x in Point")
+    assert cli_main(["--db", db, "refs", "missing"]) == 1
+
+
+def test_duplicates_and_deep_nesting(tmp_path, capsys):
+    (tmp_path / "src").mkdir()
+    a = tmp_path / "src" / "a.txt"
+    a.write_text(SRC_A, encoding="utf-8")
+    (tmp_path / "src" / "deep.txt").write_text("print(" + "(" * 3000 + ");\n", encoding="utf-8")
+    db = str(tmp_path / "idx.db")
+    cli_main(["--db", db, "index", str(tmp_path / "src"), str(a)])
+    assert "1 indexed, 0 unchanged, 1 failed" in capsys.readouterr().err
+    assert cli_main(["--db", db, "errors"]) == 0
+    assert "deep.txt" in capsys.readouterr().out
+    with SymbolIndex(db) as idx:
+        assert idx.update([str(a), str(a)]).unchanged == 1
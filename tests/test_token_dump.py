@@ -0,0 +1,65 @@
+import io
+
+import pytest
+
+from lexer import Lexer, TokenKind
+from lexer.token_dump import (
+    dump_tokens_ndjson, dump_tokens_binary, read_tokens_binary, token_stats, RECORD,
+)
+from main.main import main
+
+
+SRC = "int a;\na = 2.5 + x1;\nprint(a != true);\n"
+
+
+def test_tokens_carry_offsets():
+    for tok in Lexer(SRC).tokens():
+        assert SRC[tok.offset:tok.offset + len(tok.lexeme)] == tok.lexeme
+    assert Lexer(SRC).scan_all() == list(Lexer(SRC).tokens())
+
+
+def test_ndjson_one_object_per_token():
+    import json
+    buf = io.StringIO()
+    n = dump_tokens_ndjson(Lexer(SRC).tokens(), buf)
+    lines = buf.getvalue().splitlines()
+    assert n == len(lines) == len(Lexer(SRC).scan_all())
+    first = json.loads(lines[0])
+    assert first == {"kind": "KW_INT", "lexeme": "int", "line": 1, "col": 1, "offset": 0, "length": 3}
+    real = json.loads(lines[5])
+    assert real["kind"] == "REAL" and real["value"] == 2.5
+    assert json.loads(lines[-1])["kind"] == "EOF"
+
+
+def test_binary_roundtrip():
+    buf = io.BytesIO()
+    n = dump_tokens_binary(Lexer(SRC).tokens(), buf)
+    data = buf.getvalue()
+    assert len(data) == 6 + n * RECORD.size
+    decoded = list(read_tokens_binary(data))
+    expected = [(t.kind, t.offset, len(t.lexeme), t.line, t.col) for t in Lexer(SRC).scan_all()]
+    assert decoded == expected
+    with pytest.raises(ValueError):
+        list(read_tokens_binary(b"XXXXX" + data[5:]))
+
+
+def test_token_stats():
+    stats = token_stats(Lexer(SRC).tokens())
+    assert stats[TokenKind.SEMI] == 3
+    assert stats[TokenKind.EOF] == 1
+    assert sum(stats.values()) == len(Lexer(SRC).scan_all())
+
+
+def test_cli_tokens_mode_skips_parser(tmp_path, capsys):
+    p = tmp_path / "bad_syntax.txt"
+    p.write_text("int int ;", encoding="utf-8")    # не разбирается, но лексически верно
+    assert main([str(p), "--tokens-stats"]) == 0
+    out = capsys.readouterr().out
+    assert "KW_INT" in out and "TOTAL" in out
+
+
+def test_cli_tokens_lex_error(tmp_path, capsys):
+    p = tmp_path / "bad.txt"
+    p.write_text("int a @", encoding="utf-8")
+    assert main([str(p), "--tokens"]) == 1
+    assert "Unknown character" in capsys.readouterr().err
@@ -0,0 +1,70 @@
+import io
+import json
+import os
+
+from main.watch import Watcher, _Inotify
+
+
+def records(out):
+    lines = [json.loads(line) for line in out.getvalue().splitlines()]
+    out.seek(0)
+    out.truncate()
+    return lines
+
+
+def test_only_changed_files_are_reprocessed(tmp_path):
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "a.txt").write_text("int a;", encoding="utf-8")
+    (tmp_path / "sub" / "b.txt").write_text("int b", encoding="utf-8")
+    (tmp_path / "notes.md").write_text("not a source", encoding="utf-8")
+    out, err = io.StringIO(), io.StringIO()
+    w = Watcher(str(tmp_path), "json-compact", ids=False, out=out, err=err)
+
+    w.process(*w.refresh())
+    first = records(out)
+    assert sorted((os.path.basename(r["path"]), r["ok"]) for r in first) == [("a.txt", True), ("b.txt", False)]
+    assert "2 files, 1 failing" in err.getvalue()
+
+    # нет изменений и «touch» без изменения содержимого — ничего не разбирается
+    assert w.refresh() == ([], [])
+    a = tmp_path / "a.txt"
+    st = os.stat(a)
+    os.utime(a, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert w.refresh() == ([], [])
+
+    (tmp_path / "sub" / "b.txt").write_text("int b;", encoding="utf-8")
+    changed, removed = w.refresh()
+    assert changed == [str(tmp_path / "sub" / "b.txt")] and removed == []
+    w.process(changed, removed)
+    [rec] = records(out)
+    assert rec["ok"] is True and rec["ast"]["stmts"][0]["name"] == "b"
+    assert w.results[str(a)][1] is True           # результат a.txt остался в памяти
+
+    a.unlink()
+    changed, removed = w.refresh([str(a)])       # путь из события inotify
+    assert (changed, removed) == ([], [str(a)])
+    w.process(changed, removed)
+    assert records(out) == [{"path": str(a), "removed": True}]
+    assert len(w.results) == 1
+
+
+def test_out_dir_inside_root_is_ignored(tmp_path):
+    (tmp_path / "a.txt").write_text("int a;", encoding="utf-8")
+    out_dir = tmp_path / "out"
+    w = Watcher(str(tmp_path), "pretty", out_dir=str(out_dir), out=io.StringIO(), err=io.StringIO())
+    w.process(*w.refresh())
+    assert (out_dir / "a.txt.ast.txt").exists()
+    assert w.refresh() == ([], [])
+
+
+def test_inotify_reports_changed_paths(tmp_path):
+    notify = _Inotify.create(str(tmp_path))
+    if notify is None:
+        return                                   # не Linux: остаётся опрос
+    try:
+        (tmp_path / "a.txt").write_text("int a;", encoding="utf-8")
+        paths = notify.wait(2.0)
+        assert paths == {str(tmp_path / "a.txt")}
+        assert notify.wait(0.01) == set()
+    finally:
+        notify.close()